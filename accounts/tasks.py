@@ -2,9 +2,10 @@ import logging
 from datetime import timedelta
 
 from celery import shared_task
-from django.db import close_old_connections, connection, transaction
+from django.db import close_old_connections, connection
 from django.utils import timezone
 
+from tenants.jobs import run_per_tenant
 from tenants.models import Client
 
 from .models import CustomUser
@@ -13,7 +14,7 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task
-def auto_purge_deleted_users():
+def auto_purge_deleted_users(dry_run=False):
     """
     Finds users soft-deleted more than 7 days ago and permanently deletes them.
     Also drops their associated tenant schemas.
@@ -35,32 +36,52 @@ def auto_purge_deleted_users():
             logger.info("No expired soft-deleted users to purge.")
             return "No expired users found."
 
-        purged_count = 0
-        for user in expired_users:
-            try:
-                tenant = Client.objects.filter(owner=user).first()
-                schema_name = tenant.schema_name if tenant else None
+        owners = dict(
+            Client.objects.filter(owner__in=expired_users).values_list(
+                "schema_name", "owner_id"
+            )
+        )
+
+        def purge(schema_name, dry_run=False):
+            # Only the schema; each owner is deleted once, after the fan-out.
+            if dry_run:
+                logger.info(f"Would drop schema {schema_name}")
+                return schema_name
 
-                with transaction.atomic():
-                    if schema_name:
-                        # Drop the tenant schema
-                        with connection.cursor() as cursor:
-                            cursor.execute(
-                                f'DROP SCHEMA IF EXISTS "{schema_name}" CASCADE;'
-                            )
-                        logger.info(f"Dropped schema {schema_name} for user {user.email}")
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP SCHEMA IF EXISTS "{schema_name}" CASCADE;')
+            logger.info(f"Dropped schema {schema_name}")
+            return schema_name
 
-                    # Permanently delete the user record from the database
-                    user_email = user.email
-                    user.delete()
-                    purged_count += 1
-                    logger.info(f"Permanently deleted user: {user_email}")
+        # Schema drops run a few at a time; one stuck tenant no longer
+        # blocks the rest and transient failures are retried.
+        report = run_per_tenant(
+            purge,
+            schemas=list(owners),
+            name="auto_purge_deleted_users",
+            max_workers=2,
+            enter_schema=False,
+            dry_run=dry_run,
+        )
+        for result in report.failed:
+            logger.error(f"Failed to purge schema {result.schema_name}: {result.error}")
 
-            except Exception as e:
-                logger.error(f"Failed to purge user {user.id}: {str(e)}")
-            finally:
-                close_old_connections()
+        # Users with a schema left are kept, and retried on the next run;
+        # users without a store have no schema to drop.
+        dropped = {result.schema_name for result in report.succeeded}
+        remaining_owners = {
+            owner_id
+            for schema_name, owner_id in owners.items()
+            if schema_name not in dropped
+        }
+        purgeable = expired_users.exclude(id__in=remaining_owners)
+        purged_count = purgeable.count()
+        if not dry_run:
+            purgeable.delete()
+            logger.info(f"Permanently deleted {purged_count} users.")
 
+        if dry_run:
+            return f"Would purge {purged_count} soft-deleted users."
         return f"Purged {purged_count} soft-deleted users."
     finally:
         close_old_connections()
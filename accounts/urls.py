@@ -12,6 +12,7 @@ from .views import (
     EnablePasalbizView,
     InvitationCreateView,
     PasswordChangeView,
+    ProvisioningStatusView,
     RefreshFreshAccessTokenView,
     RequestPasswordResetAPIView,
     ResendEmailVerificationView,
@@ -32,6 +33,11 @@ from .views import (
 
 urlpatterns = [
     path("signup/", CustomSignupView.as_view(), name="signup"),
+    path(
+        "signup/status/<int:pk>/",
+        ProvisioningStatusView.as_view(),
+        name="signup-status",
+    ),
     path("verify-email/", CustomVerifyEmailView.as_view(), name="verify-email"),
     path("change-password/", PasswordChangeView.as_view(), name="change-password"),
     path(
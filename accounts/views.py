@@ -1,6 +1,6 @@
 import json
 import os
-from datetime import date, timedelta
+from datetime import timedelta
 from uuid import uuid4
 
 import resend
@@ -17,10 +17,11 @@ from allauth.account.utils import (
 )
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.db import close_old_connections, connection, transaction
+from django.db import IntegrityError, close_old_connections, connection, transaction
 from django.db.models import Q
 from django.http import Http404
 from django.template.loader import render_to_string
+from django.urls import reverse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.utils.encoding import force_bytes, force_str
@@ -38,7 +39,6 @@ from rest_framework.views import APIView
 
 from accounts.utils import generate_fresh_tokens, log_user_activity
 from blog.views import CustomPagination
-from pricing.models import Pricing
 from sales_crm.utils.error_handler import (
     ErrorCode,
     bad_request,
@@ -46,7 +46,8 @@ from sales_crm.utils.error_handler import (
     not_found,
     server_error,
 )
-from tenants.models import Client, Domain
+from tenants.models import Client, TenantProvisioning
+from tenants.tasks import provision_tenant_task
 
 from .filters import UserFilter
 from .models import CustomUser, Invitation, StoreProfile
@@ -64,12 +65,34 @@ load_dotenv()
 # Create your views here.
 resend.api_key = os.getenv("RESEND_API_KEY")
 
-backend_url = os.getenv("BACKEND_URL")
 frontendUrl = os.getenv("FRONTEND_URL")
 token_generator = PasswordResetTokenGenerator()
 User = get_user_model()
 
 
+def store_name_taken(store_slug):
+    """A store name is taken by a tenant or by a signup still provisioning."""
+    return (
+        Client.objects.filter(schema_name=store_slug).exists()
+        or TenantProvisioning.objects.filter(schema_name=store_slug)
+        .exclude(status=TenantProvisioning.STATUS_FAILED)
+        .exists()
+    )
+
+
+def store_name_conflict(error):
+    """Whether ``error`` is another live job holding the same store name."""
+    return TenantProvisioning.ACTIVE_SCHEMA_CONSTRAINT in str(error)
+
+
+def store_name_taken_response(store_name):
+    return bad_request(
+        message=f"Store name '{store_name}' is already taken. "
+        "Please choose a different one.",
+        params={"store_name": store_name},
+    )
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class CustomSignupView(APIView):
     def post(self, request, *args, **kwargs):
@@ -110,7 +133,7 @@ class CustomSignupView(APIView):
         # Validate unique store_name schema
         if store_name:
             store_slug = slugify(store_name)
-            if Client.objects.filter(schema_name=store_slug).exists():
+            if store_name_taken(store_slug):
                 return duplicate_entry(
                     message=f"Store name '{store_name}' is already taken. Please choose a different one.",
                     params={"store_name": store_name},
@@ -121,6 +144,7 @@ class CustomSignupView(APIView):
                     params={"store_name": store_name},
                 )
 
+        provisioning = None
         try:
             with transaction.atomic():
                 # Create user instance (not saved yet)
@@ -153,18 +177,6 @@ class CustomSignupView(APIView):
                     user.role = "owner" if created else "viewer"
                     user.save()
 
-                    free_plan = Pricing.objects.filter(plan_type="free").first()
-                    paid_until = date.today() + timedelta(days=30)
-
-                    tenant = Client.objects.create(
-                        schema_name=storeName,
-                        name=storeName,
-                        owner=user,
-                        is_template_account=is_template_account,
-                        pricing_plan=free_plan,
-                        paid_until=paid_until,
-                    )
-
                     EmailAddress.objects.create(
                         email=user.email,
                         user=user,
@@ -172,44 +184,34 @@ class CustomSignupView(APIView):
                         verified=True,
                     )
 
-                    Domain.objects.create(
-                        domain=f"{storeName}.{backend_url}",
-                        tenant=tenant,
-                        is_primary=True,
-                    )
-
-                    # Initialise singletons for the new tenant schema
-                    from sms.models import SMSSetting  # noqa: PLC0415
-
-                    with schema_context(storeName):
-                        SMSSetting.objects.get_or_create(pk=1)
-
-                    # For template accounts, assign a premium plan with no expiration
+                    # For template accounts, skip onboarding
                     if is_template_account:
                         user.is_onboarding_complete = True
                         user.save()
-                        premium_plan = Pricing.objects.filter(
-                            plan_type="premium"
-                        ).first()
-                        if premium_plan:
-                            tenant.pricing_plan = premium_plan
-                            tenant.paid_until = None
-                            tenant.save()
-
-            # Send verification email (outside atomic? no, only if success)
-            email_address = EmailAddress.objects.filter(
-                user=user, email=user.email
-            ).first()
-            if not email_address or not email_address.verified:
-                try:
-                    send_email_confirmation(request, user)
-                except Exception:
-                    # If email fails, do we rollback user?
-                    # Probably yes, return error.
-                    # So keep inside atomic or handle explicitly.
-                    # Use strict requirement: "if any fail, do not create user"
-                    # But email sending is external.
-                    pass
+
+                    # Schema, domain and plan are created by a background
+                    # job so the request does not wait on migrations.
+                    provisioning = TenantProvisioning.objects.create(
+                        owner=user,
+                        store_name=store_name,
+                        schema_name=storeName,
+                        is_template_account=bool(is_template_account),
+                    )
+                    transaction.on_commit(
+                        lambda: provision_tenant_task.delay(provisioning.id)
+                    )
+
+            # Store signups get their email from the provisioning job.
+            if provisioning is None:
+                email_address = EmailAddress.objects.filter(
+                    user=user, email=user.email
+                ).first()
+                if not email_address or not email_address.verified:
+                    try:
+                        send_email_confirmation(request, user)
+                    except Exception:
+                        # Email is external; the signup itself succeeded.
+                        pass
 
             # Log activity: Signup
             log_user_activity(
@@ -219,6 +221,9 @@ class CustomSignupView(APIView):
                 metadata={"store_name": store_name, "email": email},
             )
 
+            # Issued before the tenant exists, so without its domain and
+            # client claims; the status endpoint returns complete tokens
+            # once provisioning is ready.
             tokens = generate_fresh_tokens(user)
 
             # Return success response
@@ -231,10 +236,23 @@ class CustomSignupView(APIView):
                     "role": user.role,
                     "access": tokens["access"],
                     "refresh": tokens["refresh"],
+                    "provisioning": (
+                        ProvisioningStatusView.serialize(request, provisioning)
+                        if provisioning
+                        else None
+                    ),
                 },
                 status=status.HTTP_201_CREATED,
             )
 
+        except IntegrityError as e:
+            # A concurrent signup claimed the store name after the check.
+            if store_name_conflict(e):
+                return store_name_taken_response(store_name)
+            return server_error(
+                message="An unexpected error occurred during signup",
+                params={"error": str(e)},
+            )
         except Exception as e:
             # Transaction will be rolled back
             return server_error(
@@ -243,6 +261,91 @@ class CustomSignupView(APIView):
             )
 
 
+class ProvisioningStatusView(APIView):
+    """
+    Poll the background job that creates a store after signup.
+
+    The first response after the job is ready carries fresh ``access`` and
+    ``refresh`` tokens with the tenant's claims, replacing the ones issued
+    at signup; later polls do not, and the client refreshes as usual. A
+    failed job is queued again with a POST unless its store name has been
+    taken since.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @staticmethod
+    def serialize(request, provisioning):
+        domain = None
+        if provisioning.tenant_id:
+            primary = provisioning.tenant.get_primary_domain()
+            domain = primary.domain if primary else None
+
+        return {
+            "id": provisioning.id,
+            "status": provisioning.status,
+            "store_name": provisioning.store_name,
+            "schema_name": provisioning.schema_name,
+            "domain": domain,
+            "error": provisioning.error,
+            "status_url": request.build_absolute_uri(
+                reverse("signup-status", args=[provisioning.id])
+            ),
+        }
+
+    def get(self, request, pk):
+        provisioning = (
+            TenantProvisioning.objects.select_related("tenant")
+            .filter(pk=pk, owner=request.user)
+            .first()
+        )
+        if not provisioning:
+            return not_found("Provisioning job not found")
+
+        data = self.serialize(request, provisioning)
+        if provisioning.status == TenantProvisioning.STATUS_READY:
+            # Only one poll wins the claim, however many race for it.
+            issued = TenantProvisioning.objects.filter(
+                pk=pk, tokens_issued_at__isnull=True
+            ).update(tokens_issued_at=timezone.now())
+            if issued:
+                data.update(generate_fresh_tokens(request.user))
+        return Response(data)
+
+    def post(self, request, pk):
+        provisioning = TenantProvisioning.objects.filter(
+            pk=pk, owner=request.user
+        ).first()
+        if not provisioning:
+            return not_found("Provisioning job not found")
+        if provisioning.status != TenantProvisioning.STATUS_FAILED:
+            return bad_request("Only failed provisioning jobs can be retried")
+        if store_name_taken(provisioning.schema_name):
+            return store_name_taken_response(provisioning.store_name)
+
+        try:
+            with transaction.atomic():
+                retried = TenantProvisioning.objects.filter(
+                    pk=pk, status=TenantProvisioning.STATUS_FAILED
+                ).update(
+                    status=TenantProvisioning.STATUS_PENDING,
+                    error=None,
+                    updated_at=timezone.now(),
+                )
+        except IntegrityError as e:
+            if store_name_conflict(e):
+                return store_name_taken_response(provisioning.store_name)
+            raise
+        if not retried:
+            return bad_request("Only failed provisioning jobs can be retried")
+
+        provision_tenant_task.delay(pk)
+        provisioning = TenantProvisioning.objects.select_related("tenant").get(pk=pk)
+        return Response(
+            self.serialize(request, provisioning), status=status.HTTP_202_ACCEPTED
+        )
+
+
 class CustomVerifyEmailView(APIView):
     """
     Verify email using the key sent in email.
@@ -833,7 +936,7 @@ class CheckStoreNameExistsAPIView(APIView):
                 status=status.HTTP_200_OK,
             )
 
-        exists = Client.objects.filter(schema_name=store_slug).exists()
+        exists = store_name_taken(store_slug)
         return Response(
             {
                 "exists": exists,
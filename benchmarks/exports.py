@@ -0,0 +1,247 @@
+"""
+Benchmark: product spreadsheet export, in-memory workbook vs streaming.
+
+Builds catalogs of N products (every fourth one with three variants)
+inside a tenant schema, then exports them three ways and reports the
+Python heap peak (tracemalloc) and wall time of each:
+
+  legacy  - model instances with prefetches, one openpyxl cell object per
+            value, workbook saved to a BytesIO (the old view)
+  xlsx    - sales_crm.exports: keyset chunks of values() rows into a
+            write-only workbook, streamed from a temporary file
+  csv     - the same rows streamed as CSV
+
+With ``--asgi`` the streaming exports are also requested from
+``ProductExcelExportView`` through Django's ASGI handler, the way Daphne
+serves them, and the time to the first body byte is reported. Their
+peak covers the whole response path, not just the row generator. Those
+requests run on their own connection, so their catalog is committed and
+deleted afterwards; authentication of the view is switched off.
+
+The streaming peaks should stay flat as N grows; the legacy one grows
+with it. All other rows are created inside a transaction that is rolled
+back, but use a scratch tenant schema anyway.
+
+Usage:
+    python benchmarks/exports.py --schema bench --sizes 1000 10000 50000
+    python benchmarks/exports.py --schema bench --sizes 50000 --asgi
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sales_crm.settings")
+django.setup()
+
+from django.core.handlers.asgi import ASGIHandler
+from django.db import transaction
+from django.urls import reverse
+from django_tenants.utils import get_public_schema_name, schema_context
+from openpyxl import Workbook
+
+from product.exports import (
+    EXPORT_COLUMN_WIDTHS,
+    EXPORT_HEADERS,
+    product_export_rows,
+)
+from product.models import Product, ProductVariant
+from product.views import PRODUCT_LIST_QS, ProductExcelExportView
+from sales_crm.exports import CSV, XLSX, export_response
+from tenants.models import Domain
+
+VARIANTS_PER_PRODUCT = 3
+
+
+class _Rollback(Exception):
+    pass
+
+
+def build_catalog(size):
+    products = [
+        Product(
+            name=f"bench product {i}",
+            slug=f"bench-product-{i}",
+            description="A product description of a realistic length. " * 4,
+            price=Decimal(i % 5000) + Decimal("0.99"),
+            stock=i % 100,
+            meta_title=f"Bench product {i}",
+        )
+        for i in range(size)
+    ]
+    Product.objects.bulk_create(products, batch_size=5000)
+    ProductVariant.objects.bulk_create(
+        [
+            ProductVariant(product=product, price=Decimal(i + 1), stock=i)
+            for product in products[::4]
+            for i in range(VARIANTS_PER_PRODUCT)
+        ],
+        batch_size=5000,
+    )
+
+
+def legacy_export():
+    wb = Workbook()
+    ws = wb.active
+    for col, header in enumerate(EXPORT_HEADERS, 1):
+        ws.cell(row=1, column=col, value=header)
+
+    current_row = 2
+    for product in PRODUCT_LIST_QS.prefetch_related(
+        "compositions__metric", "productoption_set"
+    ):
+        variants = list(product.variants.all()) or [None]
+        for i, variant in enumerate(variants):
+            row = [""] * len(EXPORT_HEADERS)
+            if i == 0:
+                row[:3] = [product.name, product.description, float(product.price)]
+                row[5] = product.stock
+                row[-2:] = [product.meta_title, product.meta_description]
+            if variant is not None:
+                row[25] = float(variant.price) if variant.price else 0.0
+                row[26] = variant.stock
+            for col, value in enumerate(row, 1):
+                ws.cell(row=current_row, column=col, value=value)
+            current_row += 1
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.tell(), None
+
+
+def streaming_export(fmt):
+    response = export_response(
+        fmt,
+        "bench",
+        EXPORT_HEADERS,
+        product_export_rows(Product.objects.all()),
+        title="Products",
+        column_widths=EXPORT_COLUMN_WIDTHS,
+    )
+    return sum(len(chunk) for chunk in response.streaming_content), None
+
+
+def asgi_export(fmt, host):
+    """GET the export view through the ASGI handler; (size, first byte s)."""
+    path = reverse("product-export")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": f"export_format={fmt}".encode(),
+        "headers": [(b"host", host.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": (host, 80),
+    }
+    started = time.perf_counter()
+    received = {"size": 0, "first_byte": None}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            if message["status"] != 200:
+                raise RuntimeError(f"Export returned {message['status']}")
+        elif message.get("body"):
+            if received["first_byte"] is None:
+                received["first_byte"] = time.perf_counter() - started
+            received["size"] += len(message["body"])
+
+    asyncio.run(ASGIHandler()(scope, receive, send))
+    return received["size"], received["first_byte"]
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size, first_byte = func(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": elapsed,
+        "first_byte": first_byte,
+        "peak_mb": peak / 1024 / 1024,
+        "file_mb": size / 1024 / 1024,
+    }
+
+
+def storefront_host(schema_name):
+    with schema_context(get_public_schema_name()):
+        domain = Domain.objects.filter(
+            tenant__schema_name=schema_name, is_primary=True
+        ).first()
+    if domain is None:
+        raise SystemExit(f"Schema {schema_name} has no primary domain")
+    return domain.domain
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--schema", required=True, help="Scratch tenant schema")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument(
+        "--skip-legacy", action="store_true", help="Only time the streaming paths"
+    )
+    parser.add_argument(
+        "--asgi", action="store_true", help="Also serve the view through ASGI"
+    )
+    args = parser.parse_args()
+
+    if args.asgi:
+        host = storefront_host(args.schema)
+        ProductExcelExportView.authentication_classes = []
+        ProductExcelExportView.permission_classes = []
+
+    print(
+        f"{'products':>9}{'method':>10}{'seconds':>9}{'first byte':>12}"
+        f"{'peak MB':>10}{'file MB':>9}"
+    )
+    with schema_context(args.schema):
+        for size in args.sizes:
+            results = []
+            try:
+                with transaction.atomic():
+                    Product.objects.all().delete()
+                    build_catalog(size)
+                    if not args.skip_legacy:
+                        results.append(("legacy", measure(legacy_export)))
+                    results.append(("xlsx", measure(streaming_export, XLSX)))
+                    results.append(("csv", measure(streaming_export, CSV)))
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+            if args.asgi:
+                Product.objects.all().delete()
+                build_catalog(size)
+                try:
+                    results.append(("asgi-xlsx", measure(asgi_export, XLSX, host)))
+                    results.append(("asgi-csv", measure(asgi_export, CSV, host)))
+                finally:
+                    Product.objects.all().delete()
+
+            for name, r in results:
+                first_byte = r["first_byte"]
+                first_byte = f"{first_byte:.2f}" if first_byte is not None else "-"
+                print(
+                    f"{size:>9}{name:>10}{r['seconds']:>9.2f}{first_byte:>12}"
+                    f"{r['peak_mb']:>10.1f}{r['file_mb']:>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
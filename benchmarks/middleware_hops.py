@@ -0,0 +1,151 @@
+"""
+Benchmark: thread hops and latency of the async tenant/subscription stack.
+
+Compares the legacy chain of sync_to_async calls against the single-hop
+path in sales_crm.middleware under concurrent ASGI-style load. Tenant
+resolution is stubbed to a warm cache hit so the numbers isolate the cost
+of the hops themselves.
+
+Usage:
+    python benchmarks/middleware_hops.py --requests 2000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sales_crm.settings")
+django.setup()
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from django.test import RequestFactory
+
+import sales_crm.middleware as middleware
+from sales_crm.middleware import CustomDomainTenantMiddleware, SubscriptionMiddleware
+from tenants.models import Client
+
+HOPS = {"count": 0}
+
+
+def counting_sync_to_async(func, *args, **kwargs):
+    HOPS["count"] += 1
+    return sync_to_async(func, *args, **kwargs)
+
+
+class LegacyTenantMiddleware(CustomDomainTenantMiddleware):
+    """The pre-refactor __acall__: one hop per connection operation."""
+
+    async def __acall__(self, request):
+        await counting_sync_to_async(connection.set_schema_to_public)()
+
+        path = request.path.lower()
+
+        if path.startswith(("/static", "/media")):
+            await counting_sync_to_async(self.set_public_tenant)(request)
+            return await self.get_response(request)
+
+        try:
+            tenant = await counting_sync_to_async(self.resolve_tenant)(request)
+            await counting_sync_to_async(connection.set_tenant)(tenant)
+            request.tenant = tenant
+        except (ObjectDoesNotExist, Client.DoesNotExist):
+            await counting_sync_to_async(self.set_public_tenant)(request)
+            if self.requires_tenant(path):
+                return JsonResponse({"detail": "Tenant could not be resolved"}, status=400)
+
+        try:
+            return await self.get_response(request)
+        finally:
+            await counting_sync_to_async(connection.set_schema_to_public)()
+
+
+class LegacySubscriptionMiddleware(SubscriptionMiddleware):
+    async def __acall__(self, request):
+        blocked = await counting_sync_to_async(self._check_subscription)(request)
+        if blocked:
+            return blocked
+        return await self.get_response(request)
+
+
+async def view(request):
+    return HttpResponse("ok")
+
+
+def build_stack(tenant_cls, subscription_cls):
+    return tenant_cls(subscription_cls(view))
+
+
+async def run(stack, total, concurrency):
+    factory = RequestFactory()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            request = factory.get("/api/product/", HTTP_HOST="bench.nepdora.com")
+            started = time.perf_counter()
+            # Django's ASGIHandler wraps every request in its own context.
+            async with ThreadSensitiveContext():
+                await stack(request)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    HOPS["count"] = 0
+    await asyncio.gather(*(one() for _ in range(total)))
+    latencies.sort()
+    return {
+        "hops_per_request": HOPS["count"] / total,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    tenant = Client(id=1, name="bench", schema_name="bench")
+
+    with (
+        patch.object(CustomDomainTenantMiddleware, "resolve_tenant", lambda self, r: tenant),
+        patch.object(SubscriptionMiddleware, "is_subscription_active", lambda t: True),
+        patch.object(middleware, "sync_to_async", counting_sync_to_async),
+    ):
+        results = {
+            "legacy": asyncio.run(
+                run(
+                    build_stack(LegacyTenantMiddleware, LegacySubscriptionMiddleware),
+                    args.requests,
+                    args.concurrency,
+                )
+            ),
+            "single-hop": asyncio.run(
+                run(
+                    build_stack(CustomDomainTenantMiddleware, SubscriptionMiddleware),
+                    args.requests,
+                    args.concurrency,
+                )
+            ),
+        }
+
+    print(f"{'stack':<12}{'hops/req':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        print(
+            f"{name:<12}{r['hops_per_request']:>10.1f}"
+            f"{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
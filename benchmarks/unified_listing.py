@@ -0,0 +1,176 @@
+"""
+Benchmark: variant-mode storefront listing, Python merge vs SQL UNION ALL.
+
+Builds catalogs of N items (half standalone products, half variants of
+products with four variants each) inside a tenant schema, then times one
+page of the listing both ways:
+
+  legacy  - load every variant and standalone product, sorted(chain(...))
+            in Python, plus three max-price aggregates
+  union   - product.listing.UnifiedListing + listing_price_range
+
+All rows are created inside a transaction that is rolled back, but use a
+scratch tenant schema anyway.
+
+Usage:
+    python benchmarks/unified_listing.py --schema bench --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+from itertools import chain
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sales_crm.settings")
+django.setup()
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from django_tenants.utils import schema_context
+
+from product.listing import FINAL_PRICE_ANNOTATION, UnifiedListing, listing_price_range
+from product.models import Product, ProductVariant
+from product.pricing import recompute_prices
+from product.views import PRODUCT_VARIANT_QS, STANDALONE_PRODUCT_QS
+
+PAGE_SIZE = 10
+VARIANTS_PER_PRODUCT = 4
+
+
+class _Rollback(Exception):
+    pass
+
+
+def build_catalog(size):
+    standalone = size // 2
+    parents = (size - standalone) // VARIANTS_PER_PRODUCT
+
+    products = [
+        Product(
+            name=f"bench product {i}",
+            slug=f"bench-product-{i}",
+            price=Decimal(i % 5000) + Decimal("0.99"),
+            is_popular=i % 7 == 0,
+        )
+        for i in range(standalone + parents)
+    ]
+    Product.objects.bulk_create(products, batch_size=5000)
+
+    variants = [
+        ProductVariant(product=parent, price=Decimal((i * 13) % 5000))
+        for parent in products[standalone:]
+        for i in range(VARIANTS_PER_PRODUCT)
+    ]
+    ProductVariant.objects.bulk_create(variants, batch_size=5000)
+    # bulk_create skips save(), so fill the stored price columns directly.
+    recompute_prices()
+    return standalone + len(variants)
+
+
+def legacy_page(page):
+    combined = sorted(
+        chain(PRODUCT_VARIANT_QS, STANDALONE_PRODUCT_QS),
+        key=lambda obj: obj.created_at,
+        reverse=True,
+    )
+    max_price = max(
+        float(ProductVariant.objects.aggregate(m=Max("price"))["m"] or 0.0),
+        float(
+            Product.objects
+            .filter(variants__isnull=True)
+            .annotate(computed_final_price=FINAL_PRICE_ANNOTATION)
+            .aggregate(m=Max("computed_final_price"))["m"]
+            or 0.0
+        ),
+        float(
+            Product.objects.filter(
+                variants__isnull=False, variants__price__isnull=True
+            ).aggregate(m=Max("price"))["m"]
+            or 0.0
+        ),
+    )
+    start = (page - 1) * PAGE_SIZE
+    return len(combined), combined[start : start + PAGE_SIZE], max_price
+
+
+def union_page(page):
+    combined = UnifiedListing(
+        PRODUCT_VARIANT_QS,
+        STANDALONE_PRODUCT_QS,
+        ordering="-created_at",
+    )
+    _, max_price = listing_price_range(
+        ProductVariant.objects.all(),
+        Product.objects.filter(variants__isnull=True),
+    )
+    start = (page - 1) * PAGE_SIZE
+    return combined.count(), combined[start : start + PAGE_SIZE], max_price
+
+
+def measure(func, page, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(page)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as ctx:
+        count, rows, max_price = func(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "count": count,
+        "ids": [(type(obj).__name__, obj.pk) for obj in rows],
+        "max_price": max_price,
+        "queries": len(ctx.captured_queries),
+        "p50_ms": statistics.median(timings),
+        "peak_mb": peak / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--schema", required=True, help="Scratch tenant schema")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'items':>8}{'method':>8}{'queries':>9}{'p50 ms':>11}"
+        f"{'peak MB':>10}{'same page':>11}"
+    )
+    with schema_context(args.schema):
+        for size in args.sizes:
+            try:
+                with transaction.atomic():
+                    Product.objects.all().delete()
+                    items = build_catalog(size)
+                    legacy = measure(legacy_page, args.page, args.repeat)
+                    union = measure(union_page, args.page, args.repeat)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+            same = legacy["ids"] == union["ids"] and legacy["count"] == union["count"]
+            for name, r in (("legacy", legacy), ("union", union)):
+                print(
+                    f"{items:>8}{name:>8}{r['queries']:>9}{r['p50_ms']:>11.1f}"
+                    f"{r['peak_mb']:>10.1f}{'yes' if same else 'NO':>11}"
+                )
+
+
+if __name__ == "__main__":
+    main()
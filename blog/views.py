@@ -8,6 +8,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from sales_crm.authentication import TenantJWTAuthentication
+from sales_crm.response_cache import CachedResponseMixin, ConditionalGetMixin
 
 from .filters import BlogCategoryFilterSet, BlogFilterSet
 from .models import Blog, BlogCategory, Tags
@@ -25,7 +26,9 @@ class CustomPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class BlogCategoryListCreateView(generics.ListCreateAPIView):
+class BlogCategoryListCreateView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView
+):
     queryset = BlogCategory.objects.only(
         "id", "name", "slug", "thumbnail_image", "created_at", "updated_at"
     ).order_by("name")
@@ -46,7 +49,9 @@ class BlogCategoryListCreateView(generics.ListCreateAPIView):
         return super().get_permissions()
 
 
-class BlogCategoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class BlogCategoryRetrieveUpdateDestroyView(
+    ConditionalGetMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = BlogCategory.objects.only(
         "id", "name", "slug", "thumbnail_image", "created_at", "updated_at"
     )
@@ -64,7 +69,9 @@ class BlogCategoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVie
         return super().get_permissions()
 
 
-class BlogListCreateView(generics.ListCreateAPIView):
+class BlogListCreateView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView
+):
     queryset = (
         Blog.objects.select_related("category")
         .prefetch_related(
@@ -108,7 +115,9 @@ class BlogListCreateView(generics.ListCreateAPIView):
         return super().get_permissions()
 
 
-class BlogRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class BlogRetrieveUpdateDestroyView(
+    ConditionalGetMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = (
         Blog.objects.select_related("category")
         .prefetch_related(
@@ -148,13 +157,17 @@ class BlogRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         return super().get_permissions()
 
 
-class TagsListCreateView(generics.ListCreateAPIView):
+class TagsListCreateView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView
+):
     queryset = Tags.objects.only("id", "name", "slug", "created_at", "updated_at")
     serializer_class = TagsSerializer
     pagination_class = CustomPagination
 
 
-class TagsRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class TagsRetrieveUpdateDestroyView(
+    ConditionalGetMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = Tags.objects.only("id", "name", "slug", "created_at", "updated_at")
     serializer_class = TagsSerializer
     lookup_field = "slug"
@@ -170,7 +183,7 @@ class TagsRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         return super().get_permissions()
 
 
-class RecentBlogsView(generics.ListAPIView):
+class RecentBlogsView(ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
     queryset = (
         Blog.objects.select_related("category")
         .prefetch_related(
@@ -0,0 +1,38 @@
+"""Rows of the contact spreadsheet export (``ContactExcelExportView``)."""
+
+from sales_crm.exports import iter_values
+
+EXPORT_HEADERS = [
+    "Name",
+    "Phone Number",
+    "Email",
+    "Message",
+    "Is Read",
+    "Created At",
+]
+
+EXPORT_COLUMN_WIDTHS = {"A": 25, "B": 16, "C": 30, "D": 50, "E": 9, "F": 21}
+
+CONTACT_FIELDS = (
+    "name",
+    "phone_number",
+    "email",
+    "message",
+    "is_read",
+    "created_at",
+)
+
+
+def contact_export_rows(queryset, on_chunk=None):
+    """Spreadsheet rows for the contacts of ``queryset``, in its order."""
+    for chunk in iter_values(queryset, CONTACT_FIELDS, on_chunk=on_chunk):
+        for contact in chunk:
+            created_at = contact["created_at"]
+            yield [
+                contact["name"],
+                contact["phone_number"],
+                contact["email"],
+                contact["message"],
+                "Yes" if contact["is_read"] else "No",
+                created_at.strftime("%Y-%m-%d %H:%M:%S") if created_at else "",
+            ]
@@ -0,0 +1,38 @@
+"""Rows of the customer spreadsheet export (``CustomerExcelExportView``)."""
+
+from sales_crm.exports import iter_values
+
+EXPORT_HEADERS = [
+    "First Name",
+    "Last Name",
+    "Email",
+    "Phone",
+    "Address",
+    "Created At",
+]
+
+EXPORT_COLUMN_WIDTHS = {"A": 20, "B": 20, "C": 30, "D": 16, "E": 35, "F": 21}
+
+CUSTOMER_FIELDS = (
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "address",
+    "created_at",
+)
+
+
+def customer_export_rows(queryset, on_chunk=None):
+    """Spreadsheet rows for the customers of ``queryset``, in its order."""
+    for chunk in iter_values(queryset, CUSTOMER_FIELDS, on_chunk=on_chunk):
+        for customer in chunk:
+            created_at = customer["created_at"]
+            yield [
+                customer["first_name"],
+                customer["last_name"],
+                customer["email"],
+                customer["phone"],
+                customer["address"],
+                created_at.strftime("%Y-%m-%d %H:%M:%S") if created_at else "",
+            ]
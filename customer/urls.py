@@ -3,6 +3,7 @@ from django.urls import path
 from .views import (
     ChangePasswordView,
     CustomerDetailView,
+    CustomerExcelExportView,
     CustomerLoginView,
     CustomerOrderSummaryView,
     CustomerRegisterView,
@@ -20,6 +21,9 @@ urlpatterns = [
     path(
         "customer/register/", CustomerRegisterView.as_view(), name="customer-register"
     ),
+    path(
+        "customer-export/", CustomerExcelExportView.as_view(), name="customer-export"
+    ),
     path("customer/login/", CustomerLoginView.as_view(), name="customer-login"),
     path(
         "customer/change-password/",
@@ -1,17 +1,28 @@
 from customer.authentication import CustomerJWTAuthentication
 
+# Attribute on the Django HttpRequest holding the customer once resolved.
+CUSTOMER_ATTR = "_customer_context"
+
 
 def get_customer_from_request(request):
     """
     Returns Customer instance from JWT token if present.
     Returns None if no token is provided.
     Raises AuthenticationFailed if token is present but invalid.
+
+    The token is decoded (and the customer loaded) once per request;
+    serializers call this for every product on a page.
     """
+    # DRF's Request wraps the HttpRequest; cache on the one both share.
+    http_request = getattr(request, "_request", request)
+    if CUSTOMER_ATTR in http_request.__dict__:
+        return http_request.__dict__[CUSTOMER_ATTR]
+
     auth = CustomerJWTAuthentication()
     try:
         user_auth_tuple = auth.authenticate(request)
-        if user_auth_tuple is None:
-            return None
-        return user_auth_tuple[0]
+        customer = None if user_auth_tuple is None else user_auth_tuple[0]
     except Exception:
-        return None
+        customer = None
+    setattr(http_request, CUSTOMER_ATTR, customer)
+    return customer
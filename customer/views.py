@@ -1,5 +1,6 @@
 from django.db.models import Sum
 from django.template.loader import render_to_string
+from django.utils import timezone
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from rest_framework import filters, generics, status
@@ -10,10 +11,12 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from order.models import Order
 from sales_crm.authentication import TenantJWTAuthentication
+from sales_crm.exports import export_format, export_response
 from sales_crm.pagination import CustomPagination
 from sales_crm.utils.email_service import send_resend_email
 
 from .authentication import CustomerJWTAuthentication
+from .exports import EXPORT_COLUMN_WIDTHS, EXPORT_HEADERS, customer_export_rows
 from .models import Customer
 from .serializers import (
     ChangePasswordSerializer,
@@ -306,3 +309,24 @@ class CustomerOrderSummaryView(APIView):
             },
             status=status.HTTP_200_OK,
         )
+
+
+class CustomerExcelExportView(generics.ListAPIView):
+    queryset = Customer.objects.all().order_by("-created_at")
+    serializer_class = CustomerRegisterSerializer
+    search_fields = ["first_name", "last_name", "email", "phone"]
+    filter_backends = [filters.SearchFilter]
+    authentication_classes = [TenantJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        filename = f"customers_export_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
+        return export_response(
+            export_format(request),
+            filename,
+            EXPORT_HEADERS,
+            customer_export_rows(queryset),
+            title="Customers",
+            column_widths=EXPORT_COLUMN_WIDTHS,
+        )
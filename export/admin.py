@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import ExportJob
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "export_format", "status", "processed", "created_at")
+    list_filter = ("kind", "status")
+    readonly_fields = ("fingerprint",)
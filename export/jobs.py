@@ -0,0 +1,264 @@
+"""
+Spreadsheet exports run by a Celery worker instead of the request.
+
+``request_export`` records an ``ExportJob`` for an export kind, format and
+the query parameters of that kind's export view, and queues
+``export.tasks.run_export_job``. The worker rebuilds the view's filtered
+queryset from the stored parameters, writes the rows with the streaming
+writers of ``sales_crm.exports`` to a temporary file and saves it to
+private storage; ``processed`` is updated after every chunk of source
+records so clients can poll for progress.
+
+Requests are deduplicated by a fingerprint of kind, format and
+parameters: an identical job that is still running, or that finished
+within ``EXPORT_REUSE_WINDOW``, is returned instead of starting another.
+"""
+
+import hashlib
+import json
+import logging
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+from typing import NamedTuple
+
+from django.core.files import File
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.request import Request
+
+from sales_crm.exports import CSV, write_csv, write_xlsx
+
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+EXPORT_REUSE_WINDOW = timedelta(minutes=15)
+# Pending or running jobs older than this have lost their worker.
+EXPORT_STALE_AFTER = timedelta(hours=1)
+EXPORT_RETENTION = timedelta(days=7)
+
+# Query parameters that do not change which rows are exported.
+IGNORED_PARAMS = {"export_format", "format", "page", "page_size", "cursor"}
+
+
+class ExportKind(NamedTuple):
+    view: str  # export view whose filters apply
+    exports: str  # module with EXPORT_HEADERS and EXPORT_COLUMN_WIDTHS
+    rows: str  # row builder in that module
+    title: str
+    filename: str
+
+
+EXPORT_KINDS = {
+    "product": ExportKind(
+        "product.views.ProductExcelExportView",
+        "product.exports",
+        "product_export_rows",
+        "Products",
+        "products_export",
+    ),
+    "order": ExportKind(
+        "order.views.OrderExcelExportView",
+        "order.exports",
+        "order_export_rows",
+        "Orders",
+        "orders_export",
+    ),
+    "customer": ExportKind(
+        "customer.views.CustomerExcelExportView",
+        "customer.exports",
+        "customer_export_rows",
+        "Customers",
+        "customers_export",
+    ),
+    "contact": ExportKind(
+        "contact.views.ContactExcelExportView",
+        "contact.exports",
+        "contact_export_rows",
+        "Contacts",
+        "contacts_export",
+    ),
+}
+
+
+# =====================================================
+# REQUESTS
+# =====================================================
+
+
+def normalize_params(params):
+    """``{name: [values]}`` with sorted names, minus paging and format."""
+    normalized = {}
+    for name in sorted(params):
+        if name in IGNORED_PARAMS:
+            continue
+        values = params[name]
+        if not isinstance(values, (list, tuple)):
+            values = [values]
+        values = [str(value) for value in values if value not in (None, "")]
+        if values:
+            normalized[name] = values
+    return normalized
+
+
+def export_fingerprint(kind, export_format, params):
+    payload = json.dumps(
+        [kind, export_format, normalize_params(params)],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def request_export(kind, export_format, filters=None, refresh=False):
+    """
+    The job producing this export and whether it was just created.
+
+    Reuses a running identical job, or one completed within
+    ``EXPORT_REUSE_WINDOW`` unless ``refresh`` is set.
+    """
+    params = normalize_params(filters or {})
+    fingerprint = export_fingerprint(kind, export_format, params)
+    now = timezone.now()
+    identical = ExportJob.objects.filter(fingerprint=fingerprint)
+
+    reusable = Q(
+        status__in=ExportJob.ACTIVE_STATUSES,
+        created_at__gte=now - EXPORT_STALE_AFTER,
+    )
+    if not refresh:
+        reusable |= Q(
+            status="completed", finished_at__gte=now - EXPORT_REUSE_WINDOW
+        )
+    job = identical.filter(reusable).order_by("-created_at").first()
+    if job is not None:
+        return job, False
+
+    # Free the fingerprint held by jobs whose worker is gone; a fresh one
+    # here was created by a concurrent request, and the insert below fails.
+    identical.filter(
+        status__in=ExportJob.ACTIVE_STATUSES,
+        created_at__lt=now - EXPORT_STALE_AFTER,
+    ).update(status="failed", error="Timed out.", finished_at=now)
+    try:
+        with transaction.atomic():
+            job = ExportJob.objects.create(
+                kind=kind,
+                export_format=export_format,
+                params=params,
+                fingerprint=fingerprint,
+            )
+    except IntegrityError:
+        # An identical request created its job first.
+        job = identical.filter(status__in=ExportJob.ACTIVE_STATUSES).first()
+        if job is not None:
+            return job, False
+        raise
+
+    from .tasks import run_export_job
+
+    schema_name = connection.schema_name
+    transaction.on_commit(lambda: run_export_job.delay(schema_name, job.pk))
+    return job, True
+
+
+# =====================================================
+# WORKER
+# =====================================================
+
+
+def export_queryset(view_class, params):
+    """The queryset ``view_class`` exports for the query ``params``."""
+    http_request = HttpRequest()
+    http_request.method = "GET"
+    http_request.GET = QueryDict(mutable=True)
+    for name, values in params.items():
+        http_request.GET.setlist(name, values)
+    view = view_class(
+        request=Request(http_request), args=(), kwargs={}, format_kwarg=None
+    )
+    return view.filter_queryset(view.get_queryset())
+
+
+def _write(job, kind, fileobj, on_chunk):
+    exports = import_module(kind.exports)
+    queryset = export_queryset(import_string(kind.view), job.params)
+    job.total = queryset.count()
+    ExportJob.objects.filter(pk=job.pk).update(total=job.total)
+
+    rows = getattr(exports, kind.rows)(queryset, on_chunk=on_chunk)
+    if job.export_format == CSV:
+        write_csv(fileobj, exports.EXPORT_HEADERS, rows)
+    else:
+        write_xlsx(
+            fileobj,
+            exports.EXPORT_HEADERS,
+            rows,
+            kind.title,
+            getattr(exports, "EXPORT_COLUMN_WIDTHS", None),
+        )
+
+
+def run_export(job_id):
+    """Produce the file of a pending job in the current schema."""
+    claimed = ExportJob.objects.filter(pk=job_id, status="pending").update(
+        status="running", started_at=timezone.now()
+    )
+    if not claimed:
+        return f"Export job {job_id} is not pending."
+
+    job = ExportJob.objects.get(pk=job_id)
+    kind = EXPORT_KINDS[job.kind]
+
+    def on_chunk(count):
+        job.processed += count
+        ExportJob.objects.filter(pk=job.pk).update(processed=job.processed)
+
+    try:
+        with tempfile.TemporaryFile() as fileobj:
+            _write(job, kind, fileobj, on_chunk)
+            fileobj.seek(0)
+            stamp = timezone.now().strftime("%Y%m%d_%H%M%S")
+            job.file.save(
+                f"{kind.filename}_{stamp}.{job.export_format}",
+                File(fileobj),
+                save=False,
+            )
+    except Exception as e:
+        logger.exception(f"Export job {job.pk} failed")
+        ExportJob.objects.filter(pk=job.pk).update(
+            status="failed", error=str(e), finished_at=timezone.now()
+        )
+        return f"Export job {job.pk} failed: {e}"
+
+    # A job taken for stale meanwhile stays failed; its file goes.
+    completed = ExportJob.objects.filter(pk=job.pk, status="running").update(
+        status="completed",
+        file=job.file.name,
+        processed=job.processed,
+        finished_at=timezone.now(),
+    )
+    if not completed:
+        job.file.delete(save=False)
+        return f"Export job {job.pk} timed out before it finished."
+    return f"Exported {job.processed} of {job.total} {job.kind} record(s)."
+
+
+def purge_expired_exports(schema_name=None, dry_run=False):
+    """Delete jobs, and their files, older than ``EXPORT_RETENTION``."""
+    expired = ExportJob.objects.filter(
+        created_at__lt=timezone.now() - EXPORT_RETENTION
+    )
+    if dry_run:
+        return expired.count()
+    deleted = 0
+    for job in expired.only("id", "file"):
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        deleted += 1
+    return deleted
@@ -0,0 +1,79 @@
+from django.db import connection, models
+
+from sales_crm.utils.s3bucket import PrivateMediaStorage
+
+
+def export_upload_to(instance, filename):
+    return f"exports/{connection.schema_name}/{filename}"
+
+
+class ExportJob(models.Model):
+    """A spreadsheet export produced by a worker (see ``export.jobs``)."""
+
+    KIND_CHOICES = (
+        ("product", "Products"),
+        ("order", "Orders"),
+        ("customer", "Customers"),
+        ("contact", "Contacts"),
+    )
+    FORMAT_CHOICES = (
+        ("xlsx", "XLSX"),
+        ("csv", "CSV"),
+    )
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    )
+    ACTIVE_STATUSES = ("pending", "running")
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    export_format = models.CharField(
+        max_length=4, choices=FORMAT_CHOICES, default="xlsx"
+    )
+    # Query parameters of the export view, as {name: [values]}.
+    params = models.JSONField(default=dict, blank=True)
+    fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    # Source records (products, orders, ...) written so far, out of total.
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    file = models.FileField(
+        upload_to=export_upload_to,
+        storage=PrivateMediaStorage(),
+        null=True,
+        blank=True,
+    )
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["fingerprint", "-created_at"], name="export_job_fp_created_idx"
+            ),
+        ]
+        constraints = [
+            # Identical requests share one job while it runs.
+            models.UniqueConstraint(
+                fields=["fingerprint"],
+                condition=models.Q(status__in=["pending", "running"]),
+                name="export_job_one_active_per_fingerprint",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} export #{self.pk} ({self.status})"
+
+    @property
+    def progress(self):
+        """Percentage done, or None before the total is known."""
+        if self.status == "completed":
+            return 100
+        if not self.total:
+            return None
+        return min(99, self.processed * 100 // self.total)
@@ -0,0 +1,45 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import ExportJob
+
+
+class ExportJobRequestSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=ExportJob.KIND_CHOICES)
+    export_format = serializers.ChoiceField(
+        choices=ExportJob.FORMAT_CHOICES, default="xlsx"
+    )
+    # Query parameters of the kind's export view, e.g. {"status": "paid"}.
+    filters = serializers.DictField(required=False, default=dict)
+    refresh = serializers.BooleanField(required=False, default=False)
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.IntegerField(read_only=True, allow_null=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id",
+            "kind",
+            "export_format",
+            "params",
+            "status",
+            "processed",
+            "total",
+            "progress",
+            "download_url",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != "completed":
+            return None
+        url = reverse("export-job-download", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,43 @@
+import logging
+
+from celery import shared_task
+from django.db import close_old_connections
+from django_tenants.utils import schema_context
+
+from tenants.jobs import run_per_tenant
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def run_export_job(schema_name, job_id):
+    """Write the file of one tenant's export job."""
+    from .jobs import run_export
+
+    close_old_connections()
+    try:
+        with schema_context(schema_name):
+            return run_export(job_id)
+    finally:
+        close_old_connections()
+
+
+@shared_task
+def purge_expired_exports():
+    """Delete every tenant's export jobs and files past their retention."""
+    from .jobs import purge_expired_exports as purge
+
+    close_old_connections()
+    try:
+        report = run_per_tenant(purge, name="purge_expired_exports")
+        for result in report.failed:
+            logger.error(
+                f"Failed to purge exports for {result.schema_name}: {result.error}"
+            )
+        deleted = sum(result.result or 0 for result in report.succeeded)
+        return (
+            f"Purged {deleted} export job(s) from "
+            f"{len(report.succeeded)} tenant(s), {len(report.failed)} failed."
+        )
+    finally:
+        close_old_connections()
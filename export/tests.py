@@ -0,0 +1,193 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.files.storage import InMemoryStorage
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+
+from export import jobs
+from export.jobs import export_fingerprint, normalize_params, request_export
+from export.models import ExportJob
+
+
+class ExportFingerprintTests(SimpleTestCase):
+    def test_paging_and_format_params_are_ignored(self):
+        self.assertEqual(
+            normalize_params(
+                {"status": "paid", "page": "3", "cursor": "", "export_format": "csv"}
+            ),
+            {"status": ["paid"]},
+        )
+
+    def test_empty_values_are_dropped(self):
+        self.assertEqual(normalize_params({"search": "", "status": [None]}), {})
+
+    def test_identical_requests_share_a_fingerprint(self):
+        self.assertEqual(
+            export_fingerprint("order", "xlsx", {"status": "paid", "search": "ram"}),
+            export_fingerprint(
+                "order", "xlsx", {"search": ["ram"], "status": ["paid"]}
+            ),
+        )
+
+    def test_kind_format_and_filters_change_the_fingerprint(self):
+        paid = {"status": "paid"}
+        base = export_fingerprint("order", "xlsx", paid)
+        self.assertNotEqual(base, export_fingerprint("product", "xlsx", paid))
+        self.assertNotEqual(base, export_fingerprint("order", "csv", paid))
+        self.assertNotEqual(
+            base, export_fingerprint("order", "xlsx", {"status": "new"})
+        )
+
+
+class ExportJobProgressTests(SimpleTestCase):
+    def test_unknown_until_counted(self):
+        self.assertIsNone(ExportJob(status="running").progress)
+
+    def test_percentage_of_records_written(self):
+        job = ExportJob(status="running", processed=250, total=1000)
+        self.assertEqual(job.progress, 25)
+
+    def test_completed_is_done(self):
+        job = ExportJob(status="completed", processed=0, total=0)
+        self.assertEqual(job.progress, 100)
+
+
+class RequestExportTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = "Exports"
+
+    def setUp(self):
+        patcher = patch("export.tasks.run_export_job.delay")
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return request_export("order", "csv", {"status": "paid"}, **kwargs)
+
+    def test_new_request_queues_its_job(self):
+        job, created = self.request()
+
+        self.assertTrue(created)
+        self.assertEqual(job.status, "pending")
+        self.delay.assert_called_once_with(connection.schema_name, job.pk)
+
+    def test_identical_request_reuses_the_active_job(self):
+        job, _ = self.request()
+        again, created = request_export(
+            "order", "csv", {"status": ["paid"], "page": "2"}
+        )
+
+        self.assertFalse(created)
+        self.assertEqual(again.pk, job.pk)
+        self.delay.assert_called_once()
+
+    def test_recent_completed_job_is_reused_unless_refreshed(self):
+        job, _ = self.request()
+        ExportJob.objects.filter(pk=job.pk).update(
+            status="completed", finished_at=timezone.now()
+        )
+
+        reused, created = self.request()
+        self.assertFalse(created)
+        self.assertEqual(reused.pk, job.pk)
+
+        fresh, created = self.request(refresh=True)
+        self.assertTrue(created)
+        self.assertNotEqual(fresh.pk, job.pk)
+
+    def test_stale_active_job_is_failed_and_replaced(self):
+        job, _ = self.request()
+        ExportJob.objects.filter(pk=job.pk).update(
+            status="running",
+            created_at=timezone.now() - jobs.EXPORT_STALE_AFTER - timedelta(1),
+        )
+
+        _, created = self.request()
+
+        self.assertTrue(created)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error, "Timed out.")
+        self.assertIsNotNone(job.finished_at)
+
+    def test_concurrent_identical_request_gets_the_job_created_first(self):
+        first, _ = self.request()
+        lookup = QuerySet.first
+        calls = []
+
+        def miss_once(queryset):
+            # The lookup ran before the other request's insert committed.
+            calls.append(queryset)
+            return None if len(calls) == 1 else lookup(queryset)
+
+        with patch.object(QuerySet, "first", autospec=True, side_effect=miss_once):
+            job, created = self.request()
+
+        self.assertFalse(created)
+        self.assertEqual(job.pk, first.pk)
+        self.assertEqual(ExportJob.objects.count(), 1)
+        self.delay.assert_called_once()
+
+
+class RunExportTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = "Export worker"
+
+    def setUp(self):
+        self.storage = InMemoryStorage()
+        patcher = patch.object(
+            ExportJob._meta.get_field("file"), "storage", self.storage
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.job = ExportJob.objects.create(
+            kind="order", export_format="csv", fingerprint="f" * 64
+        )
+        self.folder = f"exports/{connection.schema_name}"
+
+    def run_with(self, during_write=None):
+        def fake_write(job, kind, fileobj, on_chunk):
+            job.total = 2
+            fileobj.write(b"Order,Status\r\n")
+            on_chunk(2)
+            if during_write:
+                during_write()
+
+        with patch.object(jobs, "_write", side_effect=fake_write):
+            result = jobs.run_export(self.job.pk)
+        self.job.refresh_from_db()
+        return result
+
+    def test_finished_job_is_completed_with_its_file(self):
+        self.run_with()
+
+        self.assertEqual(self.job.status, "completed")
+        self.assertEqual(self.job.processed, 2)
+        self.assertIsNotNone(self.job.finished_at)
+        with self.job.file.open("rb") as saved:
+            self.assertEqual(saved.read(), b"Order,Status\r\n")
+
+    def test_job_taken_for_stale_mid_run_stays_failed_and_drops_its_file(self):
+        def expire():
+            ExportJob.objects.filter(pk=self.job.pk).update(
+                status="failed", error="Timed out."
+            )
+
+        result = self.run_with(during_write=expire)
+
+        self.assertIn("timed out", result)
+        self.assertEqual(self.job.status, "failed")
+        self.assertFalse(self.job.file)
+        self.assertEqual(self.storage.listdir(self.folder), ([], []))
+
+    def test_only_pending_jobs_are_run(self):
+        ExportJob.objects.filter(pk=self.job.pk).update(status="running")
+
+        self.assertIn("not pending", self.run_with())
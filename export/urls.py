@@ -0,0 +1,17 @@
+from django.urls import path
+
+from .views import ExportJobDownloadView, ExportJobListCreateView, ExportJobRetrieveView
+
+urlpatterns = [
+    path("export-jobs/", ExportJobListCreateView.as_view(), name="export-jobs"),
+    path(
+        "export-jobs/<int:pk>/",
+        ExportJobRetrieveView.as_view(),
+        name="export-job-detail",
+    ),
+    path(
+        "export-jobs/<int:pk>/download/",
+        ExportJobDownloadView.as_view(),
+        name="export-job-download",
+    ),
+]
@@ -0,0 +1,58 @@
+from django.http import HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from sales_crm.authentication import TenantJWTAuthentication
+from sales_crm.pagination import CustomPagination
+
+from .jobs import request_export
+from .models import ExportJob
+from .serializers import ExportJobRequestSerializer, ExportJobSerializer
+
+
+class ExportJobListCreateView(generics.ListCreateAPIView):
+    """
+    GET lists export jobs; POST starts one, or returns the identical job
+    already running or recently finished (200 instead of 202).
+    """
+
+    queryset = ExportJob.objects.all()
+    serializer_class = ExportJobSerializer
+    pagination_class = CustomPagination
+    authentication_classes = [TenantJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        serializer = ExportJobRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job, created = request_export(**serializer.validated_data)
+        return Response(
+            self.get_serializer(job).data,
+            status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK,
+        )
+
+
+class ExportJobRetrieveView(generics.RetrieveAPIView):
+    queryset = ExportJob.objects.all()
+    serializer_class = ExportJobSerializer
+    authentication_classes = [TenantJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+
+class ExportJobDownloadView(APIView):
+    """Redirect to a short-lived signed URL of the finished file."""
+
+    authentication_classes = [TenantJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(ExportJob, pk=pk)
+        if job.status != "completed" or not job.file:
+            return Response(
+                {"detail": "Export is not ready.", "status": job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return HttpResponseRedirect(job.file.url)
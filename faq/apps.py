@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class FaqConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'faq'
+
+    def ready(self):
+        from sales_crm.response_cache import track_content_changes
+
+        track_content_changes(self)
@@ -4,6 +4,11 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from sales_crm.response_cache import (
+    CachedResponseMixin,
+    schedule_content_version_bump,
+)
+
 from .models import FAQ, FAQCategory
 from .serializers import (
     BulkCreateFAQSerializer,
@@ -14,12 +19,14 @@ from .serializers import (
 # Create your views here.
 
 
-class FAQCategoryListCreateView(generics.ListCreateAPIView):
+class FAQCategoryListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     queryset = FAQCategory.objects.only("id", "name")
     serializer_class = FAQCategorySerializer
 
 
-class FAQCategoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class FAQCategoryRetrieveUpdateDestroyView(
+    CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = FAQCategory.objects.only("id", "name")
     serializer_class = FAQCategorySerializer
 
@@ -34,7 +41,7 @@ class FAQFilterSet(filters.FilterSet):
         }
 
 
-class FAQListCreateView(generics.ListCreateAPIView):
+class FAQListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     queryset = FAQ.objects.select_related("category").only(
         "id", "question", "answer", "category__id", "category__name"
     )
@@ -43,7 +50,9 @@ class FAQListCreateView(generics.ListCreateAPIView):
     filterset_class = FAQFilterSet
 
 
-class FAQRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class FAQRetrieveUpdateDestroyView(
+    CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = FAQ.objects.select_related("category").only(
         "id", "question", "answer", "category__id", "category__name"
     )
@@ -66,6 +75,8 @@ class BulkCreateFAQView(APIView):
 
         new_faqs = [FAQ(**item) for item in faqs_data]
         created_faqs = FAQ.objects.bulk_create(new_faqs, ignore_conflicts=False)
+        # bulk_create sends no post_save, so invalidate cached FAQ responses here.
+        schedule_content_version_bump("faq")
 
         # Re-fetch with select_related so the serializer has category data
         created_ids = [faq.pk for faq in created_faqs]
@@ -1,4 +1,5 @@
 import os
+import sys
 
 import django
 
@@ -7,13 +8,6 @@ django.setup()
 
 from django.core.management import call_command
 
-from tenants.models import Client
-
-schemas = Client.objects.values_list("schema_name", flat=True)
-
-for schema in schemas:
-    print("Migrating:", schema)
-    try:
-        call_command("migrate_schemas", schema_name=schema)
-    except Exception as e:
-        print("FAILED:", schema, e)
+# Parallel, resumable replacement for the old one-schema-at-a-time loop.
+# Extra arguments are passed through, e.g. --workers 8 --resume.
+call_command("migrate_tenants", *sys.argv[1:])
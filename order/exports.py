@@ -0,0 +1,199 @@
+"""
+Rows of the order spreadsheet export (``OrderExcelExportView``).
+
+One row per order item; the order's own columns are filled on its first
+item's row only. Orders are read in chunks with ``iter_values`` and the
+items of each chunk come from one ``values()`` query, so no model
+instances are built.
+"""
+
+from collections import defaultdict
+
+from product.models import ProductVariant
+from sales_crm.exports import iter_values
+
+from .models import Order, OrderItem
+
+EXPORT_HEADERS = [
+    "Order Number",
+    "Customer Name",
+    "Customer Email",
+    "Customer Phone",
+    "City",
+    "Address",
+    "Shipping Address",
+    "Payment Type",
+    "Status",
+    "Total Amount",
+    "Delivery Charge",
+    "Is Paid",
+    "Transaction ID",
+    "Note",
+    "Created At",
+    "Product Name",
+    "Variant",
+    "Quantity",
+    "Unit Price",
+    "Item Total",
+]
+
+# Leading columns describing the order rather than the item.
+ORDER_COLUMN_COUNT = 15
+
+# Write-only sheets cannot be sized to their contents after the fact.
+EXPORT_COLUMN_WIDTHS = {
+    "A": 18,
+    "B": 25,
+    "C": 30,
+    "D": 16,
+    "E": 15,
+    "F": 35,
+    "G": 35,
+    "H": 18,
+    "I": 12,
+    "J": 14,
+    "K": 16,
+    "L": 9,
+    "M": 25,
+    "N": 30,
+    "O": 21,
+    "P": 30,
+    "Q": 35,
+    "R": 10,
+    "S": 12,
+    "T": 12,
+}
+
+ORDER_FIELDS = (
+    "id",
+    "order_number",
+    "customer_id",
+    "customer__first_name",
+    "customer__last_name",
+    "customer__email",
+    "customer__phone",
+    "customer__address",
+    "customer_name",
+    "customer_email",
+    "customer_phone",
+    "customer_address",
+    "city",
+    "shipping_address",
+    "payment_type",
+    "status",
+    "total_amount",
+    "delivery_charge",
+    "is_paid",
+    "transaction_id",
+    "note",
+    "created_at",
+)
+
+PAYMENT_TYPES = dict(Order.PAYMENT_TYPE)
+STATUSES = dict(Order.ORDER_STATUS)
+
+
+def _items(order_ids):
+    items = defaultdict(list)
+    for item in (
+        OrderItem.objects
+        .filter(order_id__in=order_ids)
+        .order_by("id")
+        .values(
+            "order_id",
+            "quantity",
+            "price",
+            "product_id",
+            "product__name",
+            "variant_id",
+            "variant__product__name",
+        )
+    ):
+        items[item["order_id"]].append(item)
+    return items
+
+
+def _variant_values(items):
+    """``{variant id: "Black, XL"}`` for the variants among ``items``."""
+    variant_ids = {item["variant_id"] for item in items if item["variant_id"]}
+    values = defaultdict(list)
+    through = ProductVariant.option_values.through
+    for row in (
+        through.objects
+        .filter(productvariant_id__in=variant_ids)
+        .order_by("id")
+        .values("productvariant_id", "productoptionvalue__value")
+    ):
+        values[row["productvariant_id"]].append(row["productoptionvalue__value"])
+    return {pk: ", ".join(str(v) for v in vals) for pk, vals in values.items()}
+
+
+def _order_columns(order):
+    if order["customer_id"]:
+        name = f"{order['customer__first_name']} {order['customer__last_name']}"
+        email = order["customer__email"]
+        phone = order["customer__phone"]
+        address = order["customer__address"]
+    else:
+        name = order["customer_name"]
+        email = order["customer_email"]
+        phone = order["customer_phone"]
+        address = order["customer_address"]
+
+    created_at = order["created_at"]
+    return [
+        order["order_number"],
+        name,
+        email,
+        phone,
+        order["city"],
+        address,
+        order["shipping_address"],
+        PAYMENT_TYPES.get(order["payment_type"], order["payment_type"]),
+        STATUSES.get(order["status"], order["status"]),
+        float(order["total_amount"]),
+        float(order["delivery_charge"]) if order["delivery_charge"] else 0.0,
+        "Yes" if order["is_paid"] else "No",
+        order["transaction_id"],
+        order["note"],
+        created_at.strftime("%Y-%m-%d %H:%M:%S") if created_at else "",
+    ]
+
+
+def _item_columns(item, variant_values):
+    if item["product_id"]:
+        product_name = item["product__name"]
+    elif item["variant_id"]:
+        product_name = item["variant__product__name"]
+    else:
+        product_name = "Unknown"
+
+    variant = ""
+    if item["variant_id"]:
+        variant = (
+            f"{item['variant__product__name']} "
+            f"({variant_values.get(item['variant_id'], '')})"
+        )
+    return [
+        product_name,
+        variant,
+        item["quantity"],
+        float(item["price"]),
+        float(item["price"] * item["quantity"]),
+    ]
+
+
+def order_export_rows(queryset, on_chunk=None):
+    """Spreadsheet rows for the orders of ``queryset``, in its order."""
+    for chunk in iter_values(queryset, ORDER_FIELDS, on_chunk=on_chunk):
+        items = _items([order["id"] for order in chunk])
+        variant_values = _variant_values(
+            [item for order_items in items.values() for item in order_items]
+        )
+        for order in chunk:
+            for i, item in enumerate(items.get(order["id"], ())):
+                order_columns = (
+                    _order_columns(order) if i == 0 else [""] * ORDER_COLUMN_COUNT
+                )
+                yield order_columns + _item_columns(item, variant_values)
+
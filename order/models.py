@@ -133,14 +133,17 @@ class Order(models.Model):
         return f"ORD-{hashed}"
 
     def deduct_stock(self):
+        from product.catalog import schedule_catalog_version_bump
         from product.models import ProductVariant
 
+        changed = False
         for item in self.items.all():
             if item.variant:
                 if item.variant.product.track_stock and item.variant.stock is not None:
                     ProductVariant.objects.filter(pk=item.variant.pk).update(
                         stock=models.F("stock") - item.quantity
                     )
+                    changed = True
             elif (
                 item.product
                 and item.product.track_stock
@@ -149,16 +152,25 @@ class Order(models.Model):
                 Product.objects.filter(pk=item.product.pk).update(
                     stock=models.F("stock") - item.quantity
                 )
+                changed = True
+
+        # update() sends no signals; listings show stock, so cached catalog
+        # responses and their ETags must move on.
+        if changed:
+            schedule_catalog_version_bump()
 
     def return_stock(self):
+        from product.catalog import schedule_catalog_version_bump
         from product.models import ProductVariant
 
+        changed = False
         for item in self.items.all():
             if item.variant:
                 if item.variant.product.track_stock and item.variant.stock is not None:
                     ProductVariant.objects.filter(pk=item.variant.pk).update(
                         stock=models.F("stock") + item.quantity
                     )
+                    changed = True
             elif (
                 item.product
                 and item.product.track_stock
@@ -167,6 +179,12 @@ class Order(models.Model):
                 Product.objects.filter(pk=item.product.pk).update(
                     stock=models.F("stock") + item.quantity
                 )
+                changed = True
+
+        # update() sends no signals; listings show stock, so cached catalog
+        # responses and their ETags must move on.
+        if changed:
+            schedule_catalog_version_bump()
 
 
 class OrderItem(models.Model):
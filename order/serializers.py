@@ -10,6 +10,7 @@ from customer.models import Customer
 from customer.serializers import CustomerSerializer
 from customer.utils import get_customer_from_request
 from product.models import Product, ProductVariant
+from product.offers import resolve_offers
 from product.serializers import OfferSerializer, ProductOnlySerializer
 from promo_code.models import PromoCode
 from sms.utils import send_sms_test
@@ -319,6 +320,9 @@ class OrderSerializer(serializers.ModelSerializer):
             calculated_offer_discount = Decimal("0.00")
             offer_contributions = {}
 
+            # One offer-index lookup for every line instead of per access.
+            resolve_offers(item.get("variant") or item.get("product") for item in items)
+
             for item in items:
                 product = item.get("product")
                 variant = item.get("variant")
@@ -1,3 +1,55 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import override_settings
+from django_tenants.test.cases import TenantTestCase
+from rest_framework.test import APIRequestFactory
+
+from order.models import Order, OrderItem
+from product.models import Product
+from product.views import ProductListCreateView
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class StockChangeCacheTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = "Stock changes"
+
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(
+            name="Ring", price=Decimal("100.00"), stock=5
+        )
+        self.order = Order.objects.create(
+            customer_name="Asha Rai", total_amount=Decimal("200.00")
+        )
+        OrderItem.objects.create(
+            order=self.order, product=self.product, quantity=2, price=Decimal("100")
+        )
+        self.view = ProductListCreateView.as_view()
+        self.factory = APIRequestFactory()
+
+    def revalidate(self, etag):
+        return self.view(self.factory.get("/products/", HTTP_IF_NONE_MATCH=etag))
+
+    def test_placing_and_cancelling_an_order_changes_the_product_list_etag(self):
+        first = self.view(self.factory.get("/products/"))
+        self.assertEqual(self.revalidate(first["ETag"]).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.deduct_stock()
+        placed = self.revalidate(first["ETag"])
+
+        self.assertEqual(placed.status_code, 200)
+        self.assertNotEqual(placed["ETag"], first["ETag"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.return_stock()
+        cancelled = self.revalidate(placed["ETag"])
+
+        self.assertEqual(cancelled.status_code, 200)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 5)
@@ -1,15 +1,11 @@
-import io
 import logging
 import os
 
 from django.db.models import Prefetch, Sum
-from django.http import FileResponse
 from django.utils import timezone
 from django_filters import rest_framework as django_filters
 from dotenv import load_dotenv
-from openpyxl import Workbook
 from rest_framework import filters, generics, status
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -18,8 +14,11 @@ from customer.authentication import CustomerJWTAuthentication
 from customer.utils import get_customer_from_request
 from logistics.models import Logistics
 from sales_crm.authentication import TenantJWTAuthentication
+from sales_crm.exports import export_format, export_response
+from sales_crm.pagination import KeysetPagination
 from sales_crm.utils.s3bucket import PublicMediaStorage
 
+from .exports import EXPORT_COLUMN_WIDTHS, EXPORT_HEADERS, order_export_rows
 from .models import Order, OrderItem, OrderItemImage
 from .serializers import AdminOrderSerializer, OrderListSerializer, OrderSerializer
 from .utils import send_order_to_dash
@@ -48,12 +47,6 @@ load_dotenv()
 DASH_BASE_URL = os.getenv("DASH_BASE_URL")
 
 
-class CustomPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = "page_size"
-    max_page_size = 100
-
-
 class OrderFilter(django_filters.FilterSet):
     status = django_filters.CharFilter(field_name="status", lookup_expr="icontains")
     date_from = django_filters.DateFilter(field_name="created_at", lookup_expr="gte")
@@ -82,7 +75,7 @@ class OrderFilter(django_filters.FilterSet):
 class OrderListCreateAPIView(generics.ListCreateAPIView):
     queryset = ORDER_OPTIMIZED_QS
     serializer_class = OrderSerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     authentication_classes = [CustomerJWTAuthentication]
     filter_backends = [
         filters.SearchFilter,
@@ -102,7 +95,7 @@ class OrderListCreateAPIView(generics.ListCreateAPIView):
 class AdminOrderListAPIView(generics.ListCreateAPIView):
     queryset = ORDER_OPTIMIZED_QS
     serializer_class = AdminOrderSerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     filter_backends = [
         filters.SearchFilter,
         filters.OrderingFilter,
@@ -123,7 +116,7 @@ class AdminOrderListAPIView(generics.ListCreateAPIView):
 class MyOrderListAPIView(generics.ListAPIView):
     queryset = ORDER_OPTIMIZED_QS
     serializer_class = OrderListSerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     authentication_classes = [CustomerJWTAuthentication]
     filter_backends = [
         filters.SearchFilter,
@@ -260,124 +253,14 @@ class OrderExcelExportView(generics.ListAPIView):
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Orders"
-
-        headers = [
-            "Order Number",
-            "Customer Name",
-            "Customer Email",
-            "Customer Phone",
-            "City",
-            "Address",
-            "Shipping Address",
-            "Payment Type",
-            "Status",
-            "Total Amount",
-            "Delivery Charge",
-            "Is Paid",
-            "Transaction ID",
-            "Note",
-            "Created At",
-            "Product Name",
-            "Variant",
-            "Quantity",
-            "Unit Price",
-            "Item Total",
-        ]
-
-        for col, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col, value=header)
-
-        current_row = 2
-        for order in queryset:
-            # Prefer Customer model details if available
-            if order.customer:
-                name = f"{order.customer.first_name} {order.customer.last_name}"
-                email = order.customer.email
-                phone = order.customer.phone
-                address = order.customer.address
-            else:
-                name = order.customer_name
-                email = order.customer_email
-                phone = order.customer_phone
-                address = order.customer_address
-
-            # Base order info
-            base_order_info = [
-                order.order_number,
-                name,
-                email,
-                phone,
-                order.city,
-                address,
-                order.shipping_address,
-                order.get_payment_type_display(),
-                order.get_status_display(),
-                float(order.total_amount),
-                float(order.delivery_charge) if order.delivery_charge else 0.0,
-                "Yes" if order.is_paid else "No",
-                order.transaction_id,
-                order.note,
-                (
-                    order.created_at.strftime("%Y-%m-%d %H:%M:%S")
-                    if order.created_at
-                    else ""
-                ),
-            ]
-
-            items = list(order.items.all())
-
-            for i, item in enumerate(items):
-                row_data = [""] * len(headers)
-
-                # Only add order info for the first item row
-                if i == 0:
-                    row_data[:15] = base_order_info
-
-                # Item info
-                product_name = (
-                    item.product.name
-                    if item.product
-                    else (item.variant.product.name if item.variant else "Unknown")
-                )
-                variant_info = str(item.variant) if item.variant else ""
-
-                row_data[15] = product_name
-                row_data[16] = variant_info
-                row_data[17] = item.quantity
-                row_data[18] = float(item.price)
-                row_data[19] = float(item.price * item.quantity)
-
-                for col, value in enumerate(row_data, 1):
-                    ws.cell(row=current_row, column=col, value=value)
-                current_row += 1
-
-        # Adjust column widths
-        for col in ws.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except Exception:
-                    pass
-            adjusted_width = max_length + 2
-            ws.column_dimensions[column].width = adjusted_width
-
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-
-        filename = f"orders_export_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        return FileResponse(
-            buffer,
-            as_attachment=True,
-            filename=filename,
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename = f"orders_export_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
+        return export_response(
+            export_format(request),
+            filename,
+            EXPORT_HEADERS,
+            order_export_rows(queryset),
+            title="Orders",
+            column_widths=EXPORT_COLUMN_WIDTHS,
         )
 
 
@@ -438,7 +321,7 @@ class MyOrderStatusView(APIView):
 class CustomerOrderListAPIView(generics.ListAPIView):
     queryset = ORDER_OPTIMIZED_QS
     serializer_class = OrderListSerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     authentication_classes = [TenantJWTAuthentication]
     permission_classes = [IsAuthenticated]
     filter_backends = [
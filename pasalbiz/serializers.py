@@ -1,12 +1,11 @@
 from django.db import connection
 from django.utils import timezone
 from django.utils.text import slugify
-from django_tenants.utils import schema_context
 from rest_framework import serializers
 
 from product.models import Product
-from tenants.models import Client
-from website.models import SiteConfig
+from product.serializers import ProductPageListSerializer
+from tenants.models import Client, TenantDirectory
 
 
 class StoreListSerializer(serializers.ModelSerializer):
@@ -42,37 +41,19 @@ class StoreListSerializer(serializers.ModelSerializer):
             "x_tenant_domain",
         ]
 
+    def get_directory(self, obj):
+        try:
+            return obj.directory
+        except TenantDirectory.DoesNotExist:
+            return None
+
     def get_tenant_id(self, obj):
         return str(obj.id)
 
     def get_x_tenant_domain(self, obj):
-        from tenants.models import Domain
-
-        domains = Domain.objects.filter(tenant=obj)
-        valid_domains = []
-        for d in domains:
-            dom = d.domain.lower()
-            if "nepdora.baliyotech.com" in dom or "localhost" in dom:
-                continue
-            valid_domains.append(d)
-
-        nepdora_default = f"{obj.schema_name.lower()}.nepdora.com"
-        other_domain = None
-        fallback_domain = None
-
-        for d in valid_domains:
-            if d.domain.lower() == nepdora_default:
-                fallback_domain = d
-            else:
-                if getattr(d, "is_primary", False):
-                    other_domain = d
-                    break
-                if not other_domain:
-                    other_domain = d
-
-        selected_domain = other_domain or fallback_domain
-        if selected_domain:
-            return selected_domain.domain
+        directory = self.get_directory(obj)
+        if directory and directory.primary_domain:
+            return directory.primary_domain
 
         if hasattr(obj, "base_url") and obj.base_url:
             domain = obj.base_url
@@ -91,60 +72,32 @@ class StoreListSerializer(serializers.ModelSerializer):
         return "active" if obj.is_plan_active() else "blocked"
 
     def get_last_indexed_at(self, obj):
-        try:
-            with schema_context(obj.schema_name):
-                newest = (
-                    Product.objects
-                    .filter(status="active")
-                    .order_by("-updated_at")
-                    .first()
-                )
-                if newest:
-                    return newest.updated_at.isoformat()
-        except Exception:
-            pass
+        directory = self.get_directory(obj)
+        if directory and directory.last_catalog_change:
+            return directory.last_catalog_change.isoformat()
         return None
 
     def get_store_name(self, obj):
-        try:
-            with schema_context(obj.schema_name):
-                config = SiteConfig.objects.first()
-                if config and config.business_name:
-                    return config.business_name
-        except Exception:
-            pass
+        directory = self.get_directory(obj)
+        if directory and directory.store_name:
+            return directory.store_name
         return obj.name
 
     def get_store_slug(self, obj):
-        try:
-            with schema_context(obj.schema_name):
-                config = SiteConfig.objects.first()
-                if config and config.business_name:
-                    return slugify(config.business_name)
-        except Exception:
-            pass
-        return slugify(obj.name)
+        return slugify(self.get_store_name(obj))
 
     def get_store_description(self, obj):
-        try:
-            with schema_context(obj.schema_name):
-                config = SiteConfig.objects.first()
-                if config and config.business_details:
-                    return config.business_details
-        except Exception:
-            pass
+        directory = self.get_directory(obj)
+        if directory and directory.store_description:
+            return directory.store_description
         return obj.description or ""
 
     def get_store_logo(self, obj):
         request = self.context.get("request")
-        try:
-            with schema_context(obj.schema_name):
-                config = SiteConfig.objects.first()
-                if config and config.logo:
-                    url = config.logo.url
-                    return request.build_absolute_uri(url) if request else url
-        except Exception:
-            pass
+        directory = self.get_directory(obj)
+        if directory and directory.store_logo:
+            url = directory.store_logo
+            return request.build_absolute_uri(url) if request else url
         if obj.template_image:
             url = obj.template_image.url
             return request.build_absolute_uri(url) if request else url
@@ -154,21 +107,14 @@ class StoreListSerializer(serializers.ModelSerializer):
         return str(obj.id)
 
     def get_seller_location(self, obj):
-        try:
-            with schema_context(obj.schema_name):
-                config = SiteConfig.objects.first()
-                if config and config.address:
-                    return config.address
-        except Exception:
-            pass
+        directory = self.get_directory(obj)
+        if directory and directory.seller_location:
+            return directory.seller_location
         return ""
 
     def get_product_count(self, obj):
-        try:
-            with schema_context(obj.schema_name):
-                return Product.objects.filter(status="active").count()
-        except Exception:
-            return 0
+        directory = self.get_directory(obj)
+        return directory.product_count if directory else 0
 
 
 class StorefrontProductSerializer(serializers.ModelSerializer):
@@ -188,6 +134,7 @@ class StorefrontProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
+        list_serializer_class = ProductPageListSerializer
         fields = [
             "external_id",
             "tenant_id",
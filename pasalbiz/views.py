@@ -1,22 +1,22 @@
 import math
 
 from django.utils.dateparse import parse_datetime
-from django_tenants.utils import schema_context
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from pasalbiz.serializers import StorefrontProductSerializer, StoreListSerializer
 from product.models import Product
+from sales_crm.pagination import KeysetPagination
 from tenants.models import Client
 from tenants.views import CustomPagination
-from website.models import SiteConfig
 
 
 class StoreListAPIView(generics.ListAPIView):
     """
     Public API view to retrieve a list of stores that have enabled pasalbiz.
-    Only tenants with SiteConfig.enable_pasalbiz=True are returned.
+    Only tenants with SiteConfig.enable_pasalbiz=True and active products
+    (as recorded in the TenantDirectory) are returned.
     """
 
     permission_classes = [permissions.AllowAny]
@@ -24,34 +24,36 @@ class StoreListAPIView(generics.ListAPIView):
     pagination_class = CustomPagination
 
     def get_queryset(self):
-        all_clients = (
+        # Served from the public-schema directory; tenant schemas are not
+        # touched while listing stores.
+        return (
             Client.objects
             .exclude(schema_name="public")
-            .filter(is_template_account=False)
+            .filter(
+                is_template_account=False,
+                directory__enable_pasalbiz=True,
+                directory__product_count__gt=0,
+            )
+            .select_related("directory")
             .order_by("id")
         )
 
-        enabled_ids = []
-        for client in all_clients:
-            try:
-                with schema_context(client.schema_name):
-                    config = SiteConfig.objects.first()
-                    if (
-                        config
-                        and config.enable_pasalbiz
-                        and Product.objects.filter(status="active").exists()
-                    ):
-                        enabled_ids.append(client.id)
-            except Exception:
-                pass
 
-        return Client.objects.filter(id__in=enabled_ids).order_by("id")
+class StorefrontFeedPagination(KeysetPagination):
+    page_size = 100
+    page_size_query_param = "per_page"
+    max_page_size = 100
 
 
 class StorefrontProductListView(APIView):
     """
     Public API view exposing products for the storefront catalog.
     Supports Stage 3 pagination (cursorless paging) and delta updates.
+
+    With ``?cursor=`` (empty for the first page) products are paged by
+    ``(updated_at, id)`` instead: a sync that keeps the last ``next`` link
+    resumes right after the last product it saw, picks up products updated
+    since, and no page counts or offsets the table.
     """
 
     permission_classes = [permissions.AllowAny]
@@ -87,6 +89,9 @@ class StorefrontProductListView(APIView):
             if dt:
                 queryset = queryset.filter(updated_at__gte=dt)
 
+        if StorefrontFeedPagination.cursor_query_param in request.query_params:
+            return self.get_keyset_page(request, queryset)
+
         total_items = queryset.count()
         total_pages = math.ceil(total_items / per_page) if total_items > 0 else 1
 
@@ -129,3 +134,18 @@ class StorefrontProductListView(APIView):
             response["Link"] = ", ".join(links)
 
         return response
+
+    def get_keyset_page(self, request, queryset):
+        paginator = StorefrontFeedPagination()
+        page = paginator.paginate_queryset(
+            queryset.order_by("updated_at", "id"), request, view=self
+        )
+        serializer = StorefrontProductSerializer(
+            page, many=True, context={"request": request}
+        )
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+
+        next_link = paginator.get_next_link()
+        if next_link:
+            response["Link"] = f'<{next_link}>; rel="next"'
+        return response
@@ -0,0 +1,672 @@
+"""
+Chunked bulk product import (``BulkProductUploadView``).
+
+The sheet has the layout of the template and of the product export: a
+row with a ``name`` starts a product, and the rows below it without one
+add its second and later compositions and variants. Rows are grouped
+into products, which are imported ``IMPORT_CHUNK_SIZE`` at a time, each
+chunk in its own transaction and with a fixed number of queries however
+many rows it has:
+
+- one for the chunk's categories and one for its sub-categories;
+- one ``name__in`` query for products that already exist;
+- one for barcode collisions;
+- one ``bulk_create`` each for products, images, options, option values,
+  variants, variant option values and compositions.
+
+``bulk_create`` sends no ``post_save``, so each chunk queues the price
+recompute and catalog version bump of its products itself.
+
+A chunk is imported in three phases: its rows are validated; its images,
+from the ZIP file or from URLs, are fetched and uploaded concurrently
+(``product.images``) outside any transaction; then only the writes run
+in ``atomic()``. If they roll back, the chunk's uploaded files are
+deleted.
+
+Problems are reported per sheet row in an ``ImportReport``. An error
+skips the product, or only the variant when it is on a later row of the
+product; a warning (unknown category, missing image) does not stop it
+from being imported. With ``dry_run`` every row is validated but nothing
+is written, uploaded or downloaded.
+"""
+
+import re
+import tempfile
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.text import slugify
+
+from sales_crm.exports import write_xlsx
+from sales_crm.utils.s3bucket import PrivateMediaStorage
+
+from .catalog import schedule_catalog_version_bump
+from .images import ImageFetcher, ImageUploader
+from .models import (
+    Category,
+    PricingMetric,
+    Product,
+    ProductComposition,
+    ProductImage,
+    ProductOption,
+    ProductOptionValue,
+    ProductVariant,
+    SubCategory,
+)
+from .pricing import schedule_price_recompute
+from .utils import safe_value
+
+IMPORT_CHUNK_SIZE = 200
+
+ERROR = "error"
+WARNING = "warning"
+
+REPORT_HEADERS = ["Row", "Product", "Level", "Message"]
+REPORT_COLUMN_WIDTHS = {"A": 8, "B": 30, "C": 10, "D": 80}
+REPORT_DIRECTORY = "import_reports"
+REPORT_RETENTION = timedelta(days=7)
+
+# Validated from the sheet; the rest are filled in before bulk_create.
+PRODUCT_CLEAN_EXCLUDE = [
+    "slug",
+    "barcode",
+    "thumbnail_image",
+    "category",
+    "sub_category",
+    "applied_offer",
+]
+VARIANT_CLEAN_EXCLUDE = ["product", "image", "applied_offer"]
+
+
+@dataclass
+class RowIssue:
+    row: int
+    product: str
+    level: str
+    message: str
+
+
+@dataclass
+class ImportReport:
+    dry_run: bool = False
+    products: int = 0
+    variants: int = 0
+    compositions: int = 0
+    images: int = 0
+    skipped: int = 0
+    issues: list = field(default_factory=list)
+
+    def add(self, level, row, product, message):
+        self.issues.append(RowIssue(row, product or "", level, message))
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue.level == ERROR]
+
+    def as_dict(self):
+        action = "Validated" if self.dry_run else "Imported"
+        return {
+            "success": True,
+            "dry_run": self.dry_run,
+            "message": (
+                f"{action} {self.products} products with {self.variants} "
+                f"variants; {self.skipped} skipped."
+            ),
+            "products": self.products,
+            "variants": self.variants,
+            "compositions": self.compositions,
+            "images": self.images,
+            "skipped": self.skipped,
+            "errors": len(self.errors),
+            "warnings": len(self.issues) - len(self.errors),
+            "issues": [
+                {
+                    "row": issue.row,
+                    "product": issue.product,
+                    "level": issue.level,
+                    "message": issue.message,
+                }
+                for issue in self.issues
+            ],
+        }
+
+
+# =====================================================
+# SHEET PARSING
+# =====================================================
+
+
+@dataclass
+class ProductRows:
+    """A product's sheet rows: ``(row number, record)``, its own row first."""
+
+    name: str
+    lines: list
+
+    @property
+    def row(self):
+        return self.lines[0][0]
+
+
+def _blank(record):
+    return all(safe_value(value) in (None, "") for value in record.values())
+
+
+def _text(value, default=None):
+    value = safe_value(value, default)
+    if isinstance(value, str):
+        value = value.strip()
+        return value or default
+    return value
+
+
+def _flag(value, default=False):
+    value = safe_value(value, default)
+    if isinstance(value, str):
+        return value.strip().upper() in ("TRUE", "YES", "1")
+    return bool(value)
+
+
+def group_rows(records, report):
+    """
+    ``ProductRows`` of sheet ``records`` (dicts with lower-case column
+    names, first data row being sheet row 2); blank rows are ignored.
+    """
+    groups = []
+    for row, record in enumerate(records, start=2):
+        if _blank(record):
+            continue
+        name = _text(record.get("name"))
+        if name is not None:
+            groups.append(ProductRows(str(name), [(row, record)]))
+        elif groups:
+            groups[-1].lines.append((row, record))
+        else:
+            report.add(ERROR, row, "", "No product name on or above this row.")
+    return groups
+
+
+def option_columns(columns):
+    """``[(number, name column, values column)]`` of the optionN columns."""
+    options = []
+    for column in columns:
+        match = re.search(r"option(\d+)\s*name", str(column).lower())
+        if match:
+            number = int(match.group(1))
+            options.append((number, column, f"option{number} values"))
+    return sorted(options)
+
+
+def _message(error):
+    if hasattr(error, "message_dict"):
+        return "; ".join(
+            f"{name}: {' '.join(messages)}"
+            for name, messages in error.message_dict.items()
+        )
+    return " ".join(error.messages)
+
+
+def _by_lower_name(model, names):
+    if not names:
+        return {}
+    return {
+        obj.name.lower(): obj
+        for obj in model.objects.annotate(lower_name=Lower("name"))
+        .filter(lower_name__in=names)
+        .only("id", "name")
+    }
+
+
+# =====================================================
+# IMPORTER
+# =====================================================
+
+
+@dataclass
+class PlannedVariant:
+    variant: ProductVariant
+    image: object
+    values: dict  # option number -> value
+
+
+@dataclass
+class PlannedProduct:
+    row: int
+    product: Product
+    thumbnail: object = None
+    images: list = field(default_factory=list)
+    options: dict = field(default_factory=dict)  # option number -> name
+    option_values: dict = field(default_factory=dict)  # number -> {values}
+    variants: list = field(default_factory=list)
+    compositions: list = field(default_factory=list)  # (metric, quantity)
+
+
+class ProductImporter:
+    def __init__(self, archive=None, dry_run=False, chunk_size=None):
+        self.archive = archive  # product.images.ZipImages
+        self.uploads = None
+        self.fetcher = None
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+        self.report = ImportReport(dry_run=dry_run)
+        # Sheet row of the first product of each name, across chunks.
+        self.seen = {}
+        self.metrics = {
+            f"{m.name} ({m.price_per_unit}/{m.unit})".strip().lower(): m
+            for m in PricingMetric.objects.only("id", "name", "price_per_unit", "unit")
+        }
+
+    def run(self, records, columns):
+        self.options = option_columns(columns)
+        groups = group_rows(records, self.report)
+        if self.dry_run:
+            self._run(groups)
+        else:
+            with ImageFetcher() as self.fetcher, ImageUploader() as self.uploads:
+                self._run(groups)
+        return self.report
+
+    def _run(self, groups):
+        for start in range(0, len(groups), self.chunk_size):
+            self.import_chunk(groups[start : start + self.chunk_size])
+
+    def import_chunk(self, chunk):
+        """
+        Validate ``chunk``, upload its images, then write its rows in one
+        transaction. Downloads and uploads run before the transaction, so
+        its connection is not held idle in it; when the writes roll back,
+        the files stored for the chunk are deleted.
+        """
+        planned = self.plan_chunk(chunk)
+        if self.dry_run or not planned:
+            self._count(planned)
+            return
+
+        images = self.upload(planned)
+        try:
+            with transaction.atomic():
+                self.write(planned, images)
+        except DatabaseError as e:
+            self.uploads.discard()
+            # The chunk was rolled back: its planned products are not in.
+            for group in chunk:
+                if self.seen.get(group.name) == group.row:
+                    del self.seen[group.name]
+                    self._skip(group, f"Not imported: {e}")
+            return
+        except BaseException:
+            self.uploads.discard()
+            raise
+        self.uploads.keep()
+        self._count(planned)
+
+    # --- validation -------------------------------------------------------
+
+    def plan_chunk(self, chunk):
+        """Planned products of ``chunk``; the rest are reported."""
+        existing = set(
+            Product.objects.filter(name__in=[group.name for group in chunk])
+            .values_list("name", flat=True)
+        )
+        categories = _by_lower_name(
+            Category, self._names(chunk, "category")
+        )
+        subcategories = _by_lower_name(
+            SubCategory, self._names(chunk, "subcategory")
+        )
+
+        planned = []
+        for group in chunk:
+            if group.name in existing:
+                self._skip(group, f"A product named '{group.name}' already exists.")
+                continue
+            if group.name in self.seen:
+                self._skip(
+                    group,
+                    f"Duplicate of the product on row {self.seen[group.name]}.",
+                )
+                continue
+            plan = self.plan(group, categories, subcategories)
+            if plan is None:
+                self.report.skipped += 1
+                continue
+            self.seen[group.name] = group.row
+            planned.append(plan)
+        return planned
+
+    def _names(self, chunk, column):
+        names = set()
+        for group in chunk:
+            name = _text(group.lines[0][1].get(column))
+            if name is not None:
+                names.add(str(name).lower())
+        return names
+
+    def _skip(self, group, message):
+        self.report.add(ERROR, group.row, group.name, message)
+        self.report.skipped += 1
+
+    def _count(self, planned):
+        for plan in planned:
+            self.report.products += 1
+            self.report.variants += len(plan.variants)
+            self.report.compositions += len(plan.compositions)
+            self.report.images += len(plan.images) + bool(plan.thumbnail)
+
+    def plan(self, group, categories, subcategories):
+        """Validated objects for one product, or None when it has errors."""
+        row, record = group.lines[0]
+        product = self._product(group.name, record, categories, subcategories, row)
+        if product is None:
+            return None
+        plan = PlannedProduct(row=row, product=product)
+
+        plan.thumbnail = self._image_ref(record.get("thumbnail_image"), group, row)
+        images = _text(record.get("images"))
+        if images:
+            for name in str(images).split(","):
+                ref = self._image_ref(name, group, row)
+                if ref:
+                    plan.images.append(ref)
+
+        for number, name_column, values_column in self.options:
+            name = _text(record.get(name_column))
+            if name:
+                plan.options[number] = str(name)
+                value = _text(record.get(values_column))
+                plan.option_values[number] = {str(value)} if value else set()
+
+        for line_row, line in group.lines:
+            if product.use_dynamic_pricing:
+                self._composition(plan, line, group, line_row)
+            self._variant(plan, line, group, line_row)
+        return plan
+
+    def _product(self, name, record, categories, subcategories, row):
+        category = self._lookup(
+            categories, record.get("category"), "Category", name, row
+        )
+        sub_category = self._lookup(
+            subcategories, record.get("subcategory"), "Sub-category", name, row
+        )
+        data = {
+            "name": name,
+            "description": _text(record.get("description"), ""),
+            "price": _text(record.get("price"), 0),
+            "market_price": _text(record.get("market_price")),
+            "track_stock": _flag(record.get("track_stock"), True),
+            "stock": _text(record.get("stock"), 0),
+            "weight": _text(record.get("weight")),
+            "thumbnail_alt_description": _text(
+                record.get(
+                    "thumbnail_image_alt_description",
+                    record.get("thumbnail_image_aly_description"),
+                ),
+                "",
+            ),
+            "category": category,
+            "sub_category": sub_category,
+            "is_popular": _flag(record.get("is_popular")),
+            "is_featured": _flag(record.get("is_featured")),
+            "status": str(_text(record.get("status"), "active")).lower(),
+            "use_dynamic_pricing": _flag(record.get("use_dynamic_pricing")),
+            "base_making_charge": _text(record.get("base_making_charge"), 0),
+            "require_custom_image": _flag(record.get("require_custom_image")),
+            "meta_title": _text(
+                record.get("meta_title", record.get("meta title")), ""
+            ),
+            "meta_description": _text(
+                record.get("meta_description", record.get("meta description")), ""
+            ),
+        }
+        for key in ("weight", "thumbnail_alt_description", "meta_title"):
+            if data[key] is not None:
+                data[key] = str(data[key])
+        product = Product(**{k: v for k, v in data.items() if v is not None})
+        try:
+            product.full_clean(
+                exclude=PRODUCT_CLEAN_EXCLUDE,
+                validate_unique=False,
+                validate_constraints=False,
+            )
+        except ValidationError as e:
+            self.report.add(ERROR, row, name, _message(e))
+            return None
+        return product
+
+    def _lookup(self, objects, value, label, product_name, row):
+        name = _text(value)
+        if name is None:
+            return None
+        obj = objects.get(str(name).lower())
+        if obj is None:
+            self.report.add(
+                WARNING, row, product_name, f"{label} '{name}' not found; left empty."
+            )
+        return obj
+
+    def _image_ref(self, value, group, row):
+        """
+        ``("url", url)`` or ``("zip", member name)`` for a sheet's image
+        reference, or None when it cannot be used.
+        """
+        value = _text(value)
+        if not value:
+            return None
+        value = str(value)
+        if value.startswith(("http://", "https://")):
+            return ("url", value)
+        name = self.archive.find(value) if self.archive else None
+        if name is None:
+            reason = self.archive.rejection(value) if self.archive else None
+            if reason:
+                message = f"Image '{value}' in the ZIP file is {reason}."
+            else:
+                message = f"Image '{value}' is not in the ZIP file."
+            self.report.add(WARNING, row, group.name, message)
+            return None
+        return ("zip", name)
+
+    def _composition(self, plan, line, group, row):
+        composition = _text(line.get("composition"))
+        quantity = _text(line.get("quantity"))
+        if not composition or quantity is None:
+            return
+        metric = self.metrics.get(str(composition).strip().lower())
+        if metric is None:
+            self.report.add(
+                WARNING, row, group.name, f"Unknown composition '{composition}'."
+            )
+            return
+        try:
+            quantity = Decimal(str(quantity))
+        except InvalidOperation:
+            quantity = None
+        if quantity is None or not quantity > 0:
+            self.report.add(
+                WARNING, row, group.name, f"Invalid composition quantity for {metric}."
+            )
+            return
+        plan.compositions.append((metric, quantity))
+
+    def _variant(self, plan, line, group, row):
+        price = _text(line.get("variant price"))
+        stock = _text(line.get("variant stock"))
+        if price is None and stock is None:
+            return
+        product = plan.product
+        variant = ProductVariant(
+            price=price if price is not None else product.price,
+            stock=stock if stock is not None else (product.stock or 0),
+        )
+        try:
+            variant.clean_fields(exclude=VARIANT_CLEAN_EXCLUDE)
+        except ValidationError as e:
+            self.report.add(ERROR, row, group.name, f"Variant skipped: {_message(e)}")
+            return
+
+        values = {}
+        for number in plan.options:
+            value = _text(line.get(f"option{number} values"))
+            if value:
+                values[number] = str(value)
+                plan.option_values[number].add(str(value))
+        image = self._image_ref(line.get("variant image"), group, row)
+        plan.variants.append(PlannedVariant(variant, image, values))
+
+    # --- writing ----------------------------------------------------------
+
+    def _open_image(self, ref):
+        kind, source = ref
+        if kind == "zip":
+            return source, self.archive.open(source)
+        return self.fetcher.fetch(source)
+
+    def _attach(self, field_file, ref, plan):
+        """Queue the upload of image ``ref`` into ``field_file``."""
+        self.uploads.add(
+            field_file, ref, lambda: self._open_image(ref), context=(plan, ref[1])
+        )
+
+    def upload(self, planned):
+        """
+        Store the images of ``planned`` into their fields; returns the
+        unsaved gallery ``ProductImage``s.
+        """
+        images = []
+        for plan in planned:
+            if plan.thumbnail:
+                self._attach(plan.product.thumbnail_image, plan.thumbnail, plan)
+            for ref in plan.images:
+                image = ProductImage(product=plan.product)
+                self._attach(image.image, ref, plan)
+                images.append(image)
+            for planned_variant in plan.variants:
+                if planned_variant.image:
+                    self._attach(
+                        planned_variant.variant.image, planned_variant.image, plan
+                    )
+        for (plan, reference), reason in self.uploads.wait():
+            self.report.add(
+                WARNING,
+                plan.row,
+                plan.product.name,
+                f"Could not fetch image '{reference}' ({reason}).",
+            )
+        return images
+
+    def write(self, planned, images):
+        # What Product.save() would fill in.
+        barcodes = Product.generate_unique_barcodes(len(planned))
+        for plan, barcode in zip(planned, barcodes):
+            product = plan.product
+            product.slug = slugify(product.name)
+            product.barcode = barcode
+            if not product.use_dynamic_pricing:
+                product.stored_final_price = product.price
+        Product.objects.bulk_create([plan.product for plan in planned])
+        ProductImage.objects.bulk_create([image for image in images if image.image])
+
+        options = {}
+        for plan in planned:
+            for number, name in plan.options.items():
+                options[plan.product.pk, number] = ProductOption(
+                    product=plan.product, name=name
+                )
+        ProductOption.objects.bulk_create(options.values())
+
+        values = {}
+        for plan in planned:
+            for number, option_values in plan.option_values.items():
+                option = options[plan.product.pk, number]
+                for value in sorted(option_values):
+                    values[option.pk, value] = ProductOptionValue(
+                        option=option, value=value
+                    )
+        ProductOptionValue.objects.bulk_create(values.values())
+
+        variants = []
+        for plan in planned:
+            for planned_variant in plan.variants:
+                variant = planned_variant.variant
+                variant.product = plan.product
+                # What ProductVariant.save() would fill in.
+                if variant.price is not None and not plan.product.use_dynamic_pricing:
+                    variant.stored_final_price = variant.price
+                variants.append(variant)
+        ProductVariant.objects.bulk_create(variants)
+
+        through = ProductVariant.option_values.through
+        links = []
+        for plan in planned:
+            for planned_variant in plan.variants:
+                for number, value in planned_variant.values.items():
+                    option = options[plan.product.pk, number]
+                    links.append(
+                        through(
+                            productvariant_id=planned_variant.variant.pk,
+                            productoptionvalue_id=values[option.pk, value].pk,
+                        )
+                    )
+        through.objects.bulk_create(links)
+
+        ProductComposition.objects.bulk_create(
+            ProductComposition(product=plan.product, metric=metric, quantity=quantity)
+            for plan in planned
+            for metric, quantity in plan.compositions
+        )
+
+        # bulk_create sends no post_save for the pricing and catalog signals.
+        schedule_price_recompute([plan.product.pk for plan in planned])
+        schedule_catalog_version_bump()
+
+
+# =====================================================
+# ERROR REPORT
+# =====================================================
+
+
+def save_import_report(report):
+    """
+    Write the report's issues to private storage as XLSX and return a
+    signed download URL, or None when there were none.
+    """
+    if not report.issues:
+        return None
+    rows = (
+        [issue.row, issue.product, issue.level, issue.message]
+        for issue in report.issues
+    )
+    storage = PrivateMediaStorage()
+    stamp = timezone.now().strftime("%Y%m%d_%H%M%S")
+    with tempfile.TemporaryFile() as fileobj:
+        write_xlsx(
+            fileobj, REPORT_HEADERS, rows, "Import report", REPORT_COLUMN_WIDTHS
+        )
+        fileobj.seek(0)
+        name = storage.save(
+            f"{REPORT_DIRECTORY}/{connection.schema_name}/product_import_{stamp}.xlsx",
+            fileobj,
+        )
+    return storage.url(name)
+
+
+def purge_import_reports():
+    """Delete every tenant's reports older than ``REPORT_RETENTION``."""
+    storage = PrivateMediaStorage()
+    cutoff = timezone.now() - REPORT_RETENTION
+    deleted = 0
+    schemas, _ = storage.listdir(REPORT_DIRECTORY)
+    for schema_name in schemas:
+        directory = f"{REPORT_DIRECTORY}/{schema_name}"
+        for filename in storage.listdir(directory)[1]:
+            path = f"{directory}/{filename}"
+            if storage.get_modified_time(path) < cutoff:
+                storage.delete(path)
+                deleted += 1
+    return deleted
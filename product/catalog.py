@@ -0,0 +1,136 @@
+"""
+Per-tenant catalog aggregates cached in Redis.
+
+The storefront shows a price-range slider and category counts on every
+listing page. Computing them means scanning the whole product table, so
+they are cached under the tenant's catalog version::
+
+    content_version:{schema}:catalog              -> int
+    catalog:{schema}:{version}:{name}             -> cached value
+
+Signals in ``product.signals`` bump the version whenever anything that
+feeds the aggregates changes; entries for older versions are never read
+again and simply expire.
+"""
+
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Max, Min
+
+from sales_crm.response_cache import (
+    bump_content_version,
+    get_content_version,
+    schedule_content_version_bump,
+)
+
+from .listing import listing_price_range
+from .models import Product, ProductVariant
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES_TIMEOUT = 24 * 60 * 60
+CATALOG_SCOPE = "catalog"
+
+
+def get_catalog_version(schema_name=None):
+    return get_content_version(CATALOG_SCOPE, schema_name)
+
+
+def bump_catalog_version(schema_name=None):
+    return bump_content_version(CATALOG_SCOPE, schema_name)
+
+
+def schedule_catalog_version_bump():
+    """Bump the current tenant's version once the transaction commits."""
+    schedule_content_version_bump(CATALOG_SCOPE)
+
+
+def cached_aggregate(name, compute, timeout=AGGREGATES_TIMEOUT):
+    """
+    Return ``compute()`` cached under the current tenant's catalog version.
+
+    Falls back to computing directly when Redis is unavailable.
+    """
+    schema_name = connection.schema_name
+    version = get_catalog_version(schema_name)
+    if version is None:
+        return compute()
+
+    key = f"catalog:{schema_name}:{version}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+    return value
+
+
+def _counts(queryset, field):
+    return {
+        row[field]: row["count"]
+        for row in queryset.exclude(**{f"{field}__isnull": True})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("id"))
+    }
+
+
+def compute_catalog_aggregates(use_product_variant):
+    if use_product_variant:
+        min_price, max_price = listing_price_range(
+            ProductVariant.objects.all(),
+            Product.objects.filter(variants__isnull=True),
+        )
+    else:
+        prices = Product.objects.aggregate(
+            lo=Min("stored_final_price"), hi=Max("stored_final_price")
+        )
+        min_price = float(prices["lo"] or 0.0)
+        max_price = float(prices["hi"] or 0.0)
+
+    return {
+        "min_price": min_price,
+        "max_price": max_price,
+        "category_counts": _counts(Product.objects.all(), "category__slug"),
+        "sub_category_counts": _counts(Product.objects.all(), "sub_category__slug"),
+    }
+
+
+def catalog_aggregates(use_product_variant):
+    """
+    Price range and per-category / per-sub-category product counts for the
+    whole catalog (unaffected by request filters).
+    """
+    mode = "variants" if use_product_variant else "products"
+    return cached_aggregate(
+        f"aggregates:{mode}",
+        lambda: compute_catalog_aggregates(use_product_variant),
+    )
+
+
+def offer_price_range(use_product_variant, offer_ids, q_var, q_prod):
+    """
+    Price range of the products covered by ``offer_ids``.
+
+    The offer ids are part of the key, so an offer starting or ending
+    switches entries even though no row changed.
+    """
+    digest = hashlib.sha1(
+        ",".join(str(pk) for pk in sorted(offer_ids)).encode()
+    ).hexdigest()[:12]
+    mode = "variants" if use_product_variant else "products"
+
+    def compute():
+        if use_product_variant:
+            return listing_price_range(
+                ProductVariant.objects.filter(q_var),
+                Product.objects.filter(q_prod, variants__isnull=True),
+            )
+        prices = Product.objects.filter(q_prod).aggregate(
+            lo=Min("stored_final_price"), hi=Max("stored_final_price")
+        )
+        return float(prices["lo"] or 0.0), float(prices["hi"] or 0.0)
+
+    return cached_aggregate(f"offer_price_range:{mode}:{digest}", compute)
@@ -0,0 +1,242 @@
+"""
+Rows of the product spreadsheet export (``ProductExcelExportView``).
+
+One row per product, followed by extra rows for its second and later
+compositions and variants, in the layout ``BulkProductUploadView``
+reads back. Products are read in chunks with ``iter_values``; the
+compositions, options and variants of each chunk come from one
+``values()`` query apiece, so no model instances are built.
+"""
+
+from collections import defaultdict
+
+from sales_crm.exports import iter_values
+
+from .models import Product, ProductComposition, ProductOption, ProductVariant
+
+EXPORT_HEADERS = [
+    "name",
+    "description",
+    "price",
+    "market_price",
+    "track_stock",
+    "stock",
+    "weight",
+    "thumbnail_image",
+    "thumbnail_image_aly_description",
+    "category",
+    "subcategory",
+    "is_popular",
+    "is_featured",
+    "status",
+    "use_dynamic_pricing",
+    "base_making_charge",
+    "require_custom_image",
+    "composition",
+    "quantity",
+    "option1 name",
+    "option1 values",
+    "option2 name",
+    "option2 values",
+    "option3 name",
+    "option3 values",
+    "variant price",
+    "variant stock",
+    "variant image",
+    "meta title",
+    "meta description",
+]
+
+EXPORT_COLUMN_WIDTHS = {
+    "A": 15,
+    "B": 20,
+    "C": 10,
+    "D": 15,
+    "E": 12,
+    "F": 10,
+    "G": 10,
+    "H": 20,
+    "I": 20,
+    "J": 15,
+    "K": 25,
+    "L": 12,
+    "M": 12,
+    "N": 10,
+    "O": 20,
+    "P": 20,
+    "Q": 20,
+    "R": 30,
+    "S": 12,
+    "T": 15,
+    "U": 15,
+    "V": 15,
+    "W": 15,
+    "X": 15,
+    "Y": 15,
+    "Z": 15,
+    "AA": 15,
+    "AB": 20,
+    "AC": 20,
+    "AD": 25,
+}
+
+PRODUCT_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "price",
+    "market_price",
+    "track_stock",
+    "stock",
+    "weight",
+    "thumbnail_image",
+    "thumbnail_alt_description",
+    "category__name",
+    "sub_category__name",
+    "is_popular",
+    "is_featured",
+    "status",
+    "use_dynamic_pricing",
+    "base_making_charge",
+    "require_custom_image",
+    "meta_title",
+    "meta_description",
+)
+
+COMPOSITION_COLUMN = 17
+OPTION_COLUMN = 19
+VARIANT_COLUMN = 25
+MAX_OPTIONS = 3
+
+
+def _flag(value):
+    return "TRUE" if value else "FALSE"
+
+
+def _number(value):
+    return float(value) if value else 0.0
+
+
+def _url(model, field, name):
+    return model._meta.get_field(field).storage.url(name) if name else ""
+
+
+def _grouped(queryset, key="product_id"):
+    groups = defaultdict(list)
+    for row in queryset:
+        groups[row[key]].append(row)
+    return groups
+
+
+def _related(product_ids):
+    """Compositions, options and variants (with option values) per product."""
+    compositions = _grouped(
+        ProductComposition.objects
+        .filter(product_id__in=product_ids)
+        .order_by("id")
+        .values(
+            "product_id",
+            "quantity",
+            "metric__name",
+            "metric__price_per_unit",
+            "metric__unit",
+        )
+    )
+    options = _grouped(
+        ProductOption.objects
+        .filter(product_id__in=product_ids)
+        .order_by("id")
+        .values("product_id", "id", "name")
+    )
+    variants = _grouped(
+        ProductVariant.objects
+        .filter(product_id__in=product_ids)
+        .order_by("id")
+        .values("product_id", "id", "price", "stock", "image")
+    )
+    through = ProductVariant.option_values.through
+    values = _grouped(
+        through.objects
+        .filter(productvariant__product_id__in=product_ids)
+        .order_by("id")
+        .values(
+            "productvariant_id",
+            "productoptionvalue__option_id",
+            "productoptionvalue__value",
+        ),
+        key="productvariant_id",
+    )
+    return compositions, options, variants, values
+
+
+def _fill_composition(row, comp):
+    row[COMPOSITION_COLUMN] = (
+        f"{comp['metric__name']} "
+        f"({comp['metric__price_per_unit']}/{comp['metric__unit']})"
+    )
+    row[COMPOSITION_COLUMN + 1] = float(comp["quantity"])
+
+
+def _fill_variant(row, variant, option_ids, values):
+    for value in values.get(variant["id"], ()):
+        option_id = value["productoptionvalue__option_id"]
+        if option_id in option_ids:
+            column = OPTION_COLUMN + 1 + option_ids.index(option_id) * 2
+            row[column] = value["productoptionvalue__value"]
+    row[VARIANT_COLUMN] = _number(variant["price"])
+    row[VARIANT_COLUMN + 1] = variant["stock"]
+    row[VARIANT_COLUMN + 2] = _url(ProductVariant, "image", variant["image"])
+
+
+def _product_rows(product, compositions, options, variants, values):
+    row = [
+        product["name"],
+        product["description"],
+        _number(product["price"]),
+        _number(product["market_price"]),
+        _flag(product["track_stock"]),
+        product["stock"],
+        product["weight"],
+        _url(Product, "thumbnail_image", product["thumbnail_image"]),
+        product["thumbnail_alt_description"],
+        product["category__name"] or "",
+        product["sub_category__name"] or "",
+        _flag(product["is_popular"]),
+        _flag(product["is_featured"]),
+        product["status"],
+        _flag(product["use_dynamic_pricing"]),
+        _number(product["base_making_charge"]),
+        _flag(product["require_custom_image"]),
+    ]
+    row += [""] * (len(EXPORT_HEADERS) - len(row))
+    row[-2:] = [product["meta_title"], product["meta_description"]]
+
+    options = options[:MAX_OPTIONS]
+    option_ids = [option["id"] for option in options]
+    for i, option in enumerate(options):
+        row[OPTION_COLUMN + i * 2] = option["name"]
+
+    for i in range(max(len(compositions), len(variants), 1)):
+        if i > 0:
+            row = [""] * len(EXPORT_HEADERS)
+        if i < len(compositions):
+            _fill_composition(row, compositions[i])
+        if i < len(variants):
+            _fill_variant(row, variants[i], option_ids, values)
+        yield row
+
+
+def product_export_rows(queryset, on_chunk=None):
+    """Spreadsheet rows for the products of ``queryset``, in its order."""
+    for chunk in iter_values(queryset, PRODUCT_FIELDS, on_chunk=on_chunk):
+        compositions, options, variants, values = _related(
+            [product["id"] for product in chunk]
+        )
+        for product in chunk:
+            yield from _product_rows(
+                product,
+                compositions.get(product["id"], []),
+                options.get(product["id"], []),
+                variants.get(product["id"], []),
+                values,
+            )
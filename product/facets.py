@@ -0,0 +1,186 @@
+"""
+Facet counts for storefront filter sidebars.
+
+``product_facets(queryset)`` counts the products of an already filtered
+queryset per category, sub-category, price bucket, rating and applied
+offer in one ``GROUP BY GROUPING SETS`` query over the filtered rows,
+instead of the frontend calling the list endpoint once per filter.
+
+Results are cached per filter (a hash of the query string) under the
+tenant's catalog version, see ``product.catalog``.
+"""
+
+import hashlib
+
+from django.db import connection
+from django.db.models import (
+    Avg,
+    Case,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Floor
+
+from .catalog import cached_aggregate
+from .models import ProductReview
+
+# Upper bounds of the price buckets; the last bucket is open-ended.
+PRICE_BUCKET_EDGES = (500, 1000, 2500, 5000, 10000, 25000, 50000)
+RATING_THRESHOLDS = (4, 3, 2, 1)
+FACETS_TIMEOUT = 10 * 60
+
+# Query parameters that do not change which products match.
+IGNORED_PARAMS = {"page", "page_size", "ordering"}
+
+# facet -> (key column, label column) of the inner query
+GROUPS = {
+    "categories": ("f_category", "f_category_name"),
+    "sub_categories": ("f_sub_category", "f_sub_category_name"),
+    "price_ranges": ("f_price", None),
+    "ratings": ("f_rating", None),
+    "offers": ("f_offer", "f_offer_name"),
+}
+
+
+def _price_bucket():
+    whens = [When(stored_final_price__isnull=True, then=Value(None))]
+    whens += [
+        When(stored_final_price__lt=edge, then=Value(i))
+        for i, edge in enumerate(PRICE_BUCKET_EDGES)
+    ]
+    return Case(
+        *whens, default=Value(len(PRICE_BUCKET_EDGES)), output_field=IntegerField()
+    )
+
+
+def _rating_bucket():
+    average = Subquery(
+        ProductReview.objects
+        .filter(product=OuterRef("pk"))
+        .values("product")
+        .annotate(avg=Avg("rating"))
+        .values("avg")[:1],
+        output_field=FloatField(),
+    )
+    return Floor(Coalesce(average, Value(0.0), output_field=FloatField()))
+
+
+def _facet_sql(queryset):
+    inner = (
+        queryset.order_by()
+        .annotate(
+            f_category=F("category__slug"),
+            f_category_name=F("category__name"),
+            f_sub_category=F("sub_category__slug"),
+            f_sub_category_name=F("sub_category__name"),
+            f_price=_price_bucket(),
+            f_rating=_rating_bucket(),
+            f_offer=F("applied_offer__slug"),
+            f_offer_name=F("applied_offer__name"),
+        )
+        .values("pk", *(c for pair in GROUPS.values() for c in pair if c))
+    )
+    inner_sql, params = inner.query.sql_with_params()
+
+    columns = []
+    sets = ["()"]
+    for key, label in GROUPS.values():
+        group = [key] + ([label] if label else [])
+        columns += group + [f'GROUPING("{key}") AS "g_{key}"']
+        sets.append("(" + ", ".join(f'"{c}"' for c in group) + ")")
+    select = ", ".join(c if c.startswith("GROUPING") else f'"{c}"' for c in columns)
+    sql = (
+        f"SELECT {select}, COUNT(*) FROM ({inner_sql}) AS facets "
+        f"GROUP BY GROUPING SETS ({', '.join(sets)})"
+    )
+    return sql, params
+
+
+def _price_range(bucket):
+    return {
+        "min": PRICE_BUCKET_EDGES[bucket - 1] if bucket > 0 else 0,
+        "max": PRICE_BUCKET_EDGES[bucket] if bucket < len(PRICE_BUCKET_EDGES) else None,
+    }
+
+
+def compute_facets(queryset):
+    sql, params = _facet_sql(queryset)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    total = 0
+    counts = {name: {} for name in GROUPS}
+    labels = {}
+    for row in rows:
+        values = list(row)
+        count = values.pop()
+        grouped = False
+        for name, (key, label) in GROUPS.items():
+            value = values.pop(0)
+            name_value = values.pop(0) if label else None
+            is_total = values.pop(0)
+            if not is_total:
+                grouped = True
+                if value is not None:
+                    counts[name][value] = count
+                    labels[(name, value)] = name_value
+        if not grouped:
+            total = count
+
+    def named(name):
+        return sorted(
+            (
+                {"slug": slug, "name": labels[(name, slug)], "count": count}
+                for slug, count in counts[name].items()
+            ),
+            key=lambda facet: (-facet["count"], facet["name"] or ""),
+        )
+
+    ratings = counts["ratings"]
+    return {
+        "total": total,
+        "categories": named("categories"),
+        "sub_categories": named("sub_categories"),
+        "price_ranges": [
+            {**_price_range(bucket), "count": counts["price_ranges"][bucket]}
+            for bucket in sorted(counts["price_ranges"])
+        ],
+        # "n stars & up", the way storefront sidebars show ratings.
+        "ratings": [
+            {
+                "min_rating": threshold,
+                "count": sum(c for r, c in ratings.items() if r >= threshold),
+            }
+            for threshold in RATING_THRESHOLDS
+        ],
+        "offers": named("offers"),
+        "on_offer": sum(counts["offers"].values()),
+    }
+
+
+def filter_digest(query_params):
+    items = sorted(
+        (key, value)
+        for key in query_params
+        if key not in IGNORED_PARAMS
+        for value in query_params.getlist(key)
+    )
+    return hashlib.sha1(repr(items).encode()).hexdigest()[:16]
+
+
+def product_facets(queryset, query_params):
+    """
+    Facet counts for ``queryset``, cached under the filters in
+    ``query_params`` (the request's query string) that produced it.
+    """
+    return cached_aggregate(
+        f"facets:{filter_digest(query_params)}",
+        lambda: compute_facets(queryset),
+        timeout=FACETS_TIMEOUT,
+    )
@@ -0,0 +1,497 @@
+"""
+Images of bulk product imports.
+
+``ZipImages`` reads an uploaded image archive one member at a time. The
+archive is indexed up front from its central directory, without
+decompressing anything but the first bytes of each member, which are
+checked against the image signatures; members are only extracted when
+they are uploaded, into a spooled temporary file, so memory use does not
+grow with the archive. Member count, per-image size and total size are
+capped, so an archive cannot expand into more than it claims.
+
+``ImageFetcher`` downloads images from URLs over a pooled session, with
+a limit on concurrent requests per host, timeouts, retries and the same
+size cap and signature check as archive members.
+
+``ImageUploader`` saves images into file fields on a bounded thread pool,
+so downloads and uploads to storage overlap instead of running one after
+the other inside the request. A source referenced by many rows is opened
+and uploaded once, and sources with identical content are stored once;
+their field files share the stored name.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+import requests
+from django.core.files import File
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+ZIP_MAX_IMAGES = 5000
+ZIP_MAX_IMAGE_SIZE = 10 * 1024 * 1024
+ZIP_MAX_TOTAL_SIZE = 1024 * 1024 * 1024
+# Extracted members stay in memory up to this size, then go to disk.
+SPOOL_MAX_MEMORY = 1024 * 1024
+COPY_BLOCK_SIZE = 64 * 1024
+
+IMAGE_UPLOAD_WORKERS = 8
+
+FETCH_MAX_PER_HOST = 4
+FETCH_TIMEOUT = (5, 15)  # connect, read between bytes
+# Wall-clock limit of one download, which read timeouts do not bound.
+FETCH_DEADLINE = 60
+FETCH_RETRIES = 2
+FETCH_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+IMAGE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+NOT_AN_IMAGE = "not a PNG, JPEG, GIF or WebP image"
+
+
+def sniff_image_type(head):
+    """Content type of an image from its first bytes, or None."""
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def clean_image_name(name):
+    """The file name of a sheet's image reference, without any path."""
+    if not name or not isinstance(name, str):
+        return None
+    return name.split("/")[-1].split("\\")[-1].strip() or None
+
+
+def content_digest(content):
+    """SHA-256 of a ``File``'s content, which is left rewound."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def storage_identity(storage):
+    """
+    Equal for storages that write to the same place. Every model field
+    builds its own storage instance, so their ``id()``s always differ.
+    """
+    try:
+        path, args, kwargs = storage.deconstruct()
+    except AttributeError:
+        return id(storage)
+    return path, repr(args), repr(sorted(kwargs.items()))
+
+
+def _megabytes(size):
+    return f"larger than {size // (1024 * 1024)} MB"
+
+
+# =====================================================
+# ZIP ARCHIVES
+# =====================================================
+
+
+class ZipImageError(ValueError):
+    """The archive as a whole cannot be used."""
+
+
+class ZipImages:
+    """
+    Images of an uploaded ZIP file by file name; the last member wins when
+    names repeat across folders. Members that are not images or are too
+    large are listed in ``rejected`` with the reason.
+    """
+
+    def __init__(
+        self,
+        upload,
+        max_images=ZIP_MAX_IMAGES,
+        max_image_size=ZIP_MAX_IMAGE_SIZE,
+        max_total_size=ZIP_MAX_TOTAL_SIZE,
+    ):
+        self.max_image_size = max_image_size
+        self.members = {}
+        self.rejected = {}
+        self._lock = threading.Lock()
+        self._spool = None
+
+        if hasattr(upload, "temporary_file_path"):
+            source = upload.temporary_file_path()
+        else:
+            # Uploads small enough to be kept in memory, or other streams.
+            self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+            for chunk in File(upload).chunks():
+                self._spool.write(chunk)
+            self._spool.seek(0)
+            source = self._spool
+
+        try:
+            self._zip = zipfile.ZipFile(source)
+        except zipfile.BadZipFile as e:
+            self.close()
+            raise ZipImageError(f"Invalid ZIP file: {e}")
+
+        try:
+            self._index(max_images, max_total_size)
+        except Exception:
+            self.close()
+            raise
+
+    def _index(self, max_images, max_total_size):
+        total_size = 0
+        for info in self._zip.infolist():
+            if info.is_dir() or "__MACOSX" in info.filename:
+                continue
+            name = clean_image_name(info.filename)
+            if not name:
+                continue
+            if len(self.members) + len(self.rejected) >= max_images:
+                raise ZipImageError(
+                    f"The ZIP file has more than {max_images} files."
+                )
+            total_size += info.file_size
+            if total_size > max_total_size:
+                raise ZipImageError(
+                    f"The ZIP file expands to more than "
+                    f"{max_total_size // (1024 * 1024)} MB."
+                )
+
+            reason = self._check(info)
+            if reason:
+                self.members.pop(name, None)
+                self.rejected[name] = reason
+            else:
+                self.rejected.pop(name, None)
+                self.members[name] = info
+
+    def _check(self, info):
+        if info.file_size > self.max_image_size:
+            return _megabytes(self.max_image_size)
+        with self._zip.open(info) as member:
+            head = member.read(16)
+        if sniff_image_type(head) is None:
+            return NOT_AN_IMAGE
+        return None
+
+    def find(self, reference):
+        """The member name for a sheet's image reference, or None."""
+        name = clean_image_name(reference)
+        return name if name in self.members else None
+
+    def rejection(self, reference):
+        return self.rejected.get(clean_image_name(reference))
+
+    def open(self, name):
+        """
+        ``File`` of member ``name``, extracted into a spooled temporary
+        file; the caller closes it. Safe to call from several threads.
+        """
+        info = self.members[name]
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        try:
+            # Members share the archive's file position.
+            with self._lock, self._zip.open(info) as member:
+                copied = 0
+                for block in iter(lambda: member.read(COPY_BLOCK_SIZE), b""):
+                    copied += len(block)
+                    # The header's size is not trusted to bound the output.
+                    if copied > self.max_image_size:
+                        raise ZipImageError(f"{name} is larger than it claims.")
+                    spool.write(block)
+        except Exception:
+            spool.close()
+            raise
+        spool.seek(0)
+        return File(spool, name=name)
+
+    def close(self):
+        if getattr(self, "_zip", None) is not None:
+            self._zip.close()
+        if self._spool is not None:
+            self._spool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# =====================================================
+# REMOTE IMAGES
+# =====================================================
+
+
+class ImageFetchError(Exception):
+    """An image URL could not be downloaded."""
+
+
+def url_image_name(url, content_type):
+    """File name for an image downloaded from ``url``."""
+    name = clean_image_name(unquote(urlsplit(url).path))
+    stem = os.path.splitext(name)[0] if name else ""
+    return (stem or f"image_{uuid.uuid4().hex[:8]}") + IMAGE_EXTENSIONS[content_type]
+
+
+class ImageFetcher:
+    """
+    Downloads images over one pooled ``requests`` session; safe to share
+    between threads. At most ``max_per_host`` requests run against a host
+    at a time. Connection errors and 429 or 5xx responses are retried with
+    backoff. Bodies are streamed into a spooled temporary file and given up
+    on past ``max_size`` bytes or ``deadline`` seconds. A URL that failed
+    is not requested again by the same fetcher.
+    """
+
+    def __init__(
+        self,
+        max_per_host=FETCH_MAX_PER_HOST,
+        max_size=ZIP_MAX_IMAGE_SIZE,
+        timeout=FETCH_TIMEOUT,
+        deadline=FETCH_DEADLINE,
+        retries=FETCH_RETRIES,
+        pool_size=IMAGE_UPLOAD_WORKERS,
+    ):
+        self.max_per_host = max_per_host
+        self.max_size = max_size
+        self.timeout = timeout
+        self.deadline = deadline
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=FETCH_RETRY_STATUSES,
+                allowed_methods=["GET"],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._failed = {}
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._hosts[host]
+
+    def fetch(self, url):
+        """
+        ``(filename, File)`` of the image at ``url``; the caller closes the
+        file. Raises ``ImageFetchError`` with the reason it cannot be had.
+        """
+        with self._lock:
+            reason = self._failed.get(url)
+        if reason:
+            raise ImageFetchError(reason)
+        try:
+            with self._host_slot(url):
+                return self._fetch(url)
+        except (ImageFetchError, requests.RequestException) as e:
+            reason = str(e) or e.__class__.__name__
+            with self._lock:
+                self._failed[url] = reason
+            raise ImageFetchError(reason) from e
+
+    def _fetch(self, url):
+        deadline = time.monotonic() + self.deadline
+        with self.session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            length = response.headers.get("Content-Length", "")
+            if length.isdigit() and int(length) > self.max_size:
+                raise ImageFetchError(_megabytes(self.max_size))
+
+            spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+            try:
+                size = 0
+                for block in response.iter_content(COPY_BLOCK_SIZE):
+                    size += len(block)
+                    if size > self.max_size:
+                        raise ImageFetchError(_megabytes(self.max_size))
+                    if time.monotonic() > deadline:
+                        raise ImageFetchError(
+                            f"took longer than {self.deadline} seconds"
+                        )
+                    spool.write(block)
+                spool.seek(0)
+                content_type = sniff_image_type(spool.read(16))
+                if content_type is None:
+                    raise ImageFetchError(NOT_AN_IMAGE)
+                spool.seek(0)
+            except Exception:
+                spool.close()
+                raise
+        return url_image_name(url, content_type), File(spool)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# =====================================================
+# UPLOADS
+# =====================================================
+
+
+class ImageUploader:
+    """
+    Save images into ``FieldFile``s on a bounded thread pool::
+
+        with ImageUploader() as uploads:
+            uploads.add(product.thumbnail_image, ("zip", name), opener)
+            failed = uploads.wait()
+
+    ``opener()`` returns ``(filename, File)``, or None when the image cannot
+    be had. ``wait()`` gives each field file the name it was stored under
+    and returns ``(context, reason)`` for the ones that failed. A ``key``
+    is opened once per storage (see ``storage_identity``), and content
+    already stored by another key is not stored again; every field file
+    gets the same stored name.
+
+    Once the rows referencing the files are committed, ``keep()`` them;
+    if the rows are rolled back, ``discard()`` deletes the files stored
+    since the last ``keep()``.
+    """
+
+    def __init__(self, max_workers=IMAGE_UPLOAD_WORKERS):
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="image-upload"
+        )
+        self._lock = threading.Lock()
+        self._uploads = {}
+        self._stored = {}  # (digest, storage identity) -> Future of the stored name
+        self._saved = []  # (storage, name, digest key) since the last keep()
+        self._pending = []
+
+    def add(self, field_file, key, opener, context=None):
+        upload_key = (key, storage_identity(field_file.storage))
+        if upload_key not in self._uploads:
+            self._uploads[upload_key] = self._pool.submit(
+                self._upload, field_file, opener
+            )
+        self._pending.append((field_file, upload_key, context))
+
+    def _upload(self, field_file, opener):
+        opened = opener()
+        if opened is None:
+            return None
+        filename, content = opened
+        try:
+            stored_key = (
+                content_digest(content),
+                storage_identity(field_file.storage),
+            )
+            with self._lock:
+                stored = self._stored.get(stored_key)
+                first = stored is None
+                if first:
+                    stored = self._stored[stored_key] = Future()
+            if not first:
+                return stored.result()
+            try:
+                field = field_file.field
+                name = field.generate_filename(field_file.instance, filename)
+                name = field_file.storage.save(
+                    name, content, max_length=field.max_length
+                )
+            except BaseException as e:
+                stored.set_exception(e)
+                raise
+            with self._lock:
+                self._saved.append((field_file.storage, name, stored_key))
+            stored.set_result(name)
+            return name
+        finally:
+            content.close()
+
+    def wait(self):
+        failed = []
+        for field_file, upload_key, context in self._pending:
+            try:
+                name = self._uploads[upload_key].result()
+                reason = "not found"
+            except Exception as e:
+                logger.warning(f"Image upload failed: {e}")
+                name = None
+                reason = str(e)
+            if name:
+                field_file.name = name
+            else:
+                failed.append((context, reason))
+        self._pending = []
+        return failed
+
+    def keep(self):
+        """Files stored so far are referenced by committed rows."""
+        with self._lock:
+            self._saved = []
+
+    def discard(self):
+        """
+        Delete the files stored since the last ``keep()``; later adds of
+        the same sources and content store them again.
+        """
+        with self._lock:
+            saved, self._saved = self._saved, []
+            for _, _, stored_key in saved:
+                self._stored.pop(stored_key, None)
+        removed = {(stored_key[1], name) for _, name, stored_key in saved}
+        self._uploads = {
+            upload_key: upload
+            for upload_key, upload in self._uploads.items()
+            if not (
+                upload.done()
+                and upload.exception() is None
+                and (upload_key[1], upload.result()) in removed
+            )
+        }
+        for storage, name, _ in saved:
+            try:
+                storage.delete(name)
+            except Exception as e:
+                logger.warning(f"Could not delete image {name}: {e}")
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
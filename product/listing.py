@@ -0,0 +1,271 @@
+"""
+Unified storefront listing for variant-mode catalogs.
+
+With ``SiteConfig.use_product_variant`` on, the storefront shows every
+``ProductVariant`` plus every ``Product`` without variants as one list.
+``UnifiedListing`` combines the two with ``UNION ALL`` over a common
+projection (kind, id and the sortable columns), so the database orders,
+counts and slices the list; only the rows on the requested page are then
+loaded as model instances.
+"""
+
+from django.db.models import (
+    Avg,
+    CharField,
+    DecimalField,
+    F,
+    FloatField,
+    Max,
+    Min,
+    OuterRef,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+from sales_crm.pagination import keyset_filter
+
+from .models import Product, ProductReview, ProductVariant
+from .search import product_rank, variant_rank
+
+# ─── final_price annotation ──────────────────────────────────────────────────
+#
+# Product.final_price as kept in the indexed stored_final_price column by
+# product.pricing, so ORDER BY, range filters and the price-range slider's
+# min/max are index-backed instead of a per-row subquery over compositions.
+
+FINAL_PRICE_ANNOTATION = F("stored_final_price")
+
+
+# ─── Unified listing ─────────────────────────────────────────────────────────
+
+KIND_PRODUCT = "product"
+KIND_VARIANT = "variant"
+
+# ?ordering= value → column of the common projection
+ORDERING_COLUMNS = {
+    "created_at": "sort_created",
+    "price": "sort_price",
+    "is_popular": "sort_popular",
+    "average_rating": "sort_rating",
+    "relevance": "sort_rank",
+}
+DEFAULT_ORDERING = "-created_at"
+SEARCH_ORDERING = "-relevance"
+
+_PRICE = DecimalField(max_digits=20, decimal_places=2)
+
+
+def _rating_sq(product_ref):
+    return Coalesce(
+        Subquery(
+            ProductReview.objects
+            .filter(product=OuterRef(product_ref))
+            .values("product")
+            .annotate(avg=Avg("rating"))
+            .values("avg")[:1],
+            output_field=FloatField(),
+        ),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _no_rank():
+    return Value(0.0, output_field=FloatField())
+
+
+def _variant_rows(variants, search=None):
+    # Variants are listed with their parent's rating and popularity, the
+    # same values the serializer shows for them.
+    return (
+        ProductVariant.objects
+        .filter(pk__in=variants.order_by().values("pk"))
+        .order_by()
+        .annotate(
+            row_kind=Value(KIND_VARIANT, output_field=CharField()),
+            row_id=F("pk"),
+            sort_price=Coalesce("stored_final_price", Value(0), output_field=_PRICE),
+            sort_rating=_rating_sq("product_id"),
+            sort_popular=F("product__is_popular"),
+            sort_created=F("created_at"),
+            sort_rank=variant_rank(search) if search else _no_rank(),
+        )
+        .values(
+            "row_kind",
+            "row_id",
+            "sort_price",
+            "sort_rating",
+            "sort_popular",
+            "sort_created",
+            "sort_rank",
+        )
+    )
+
+
+def _product_rows(products, search=None):
+    return (
+        Product.objects
+        .filter(pk__in=products.order_by().values("pk"))
+        .order_by()
+        .annotate(
+            row_kind=Value(KIND_PRODUCT, output_field=CharField()),
+            row_id=F("pk"),
+            sort_price=Coalesce("stored_final_price", Value(0), output_field=_PRICE),
+            sort_rating=_rating_sq("pk"),
+            sort_popular=F("is_popular"),
+            sort_created=F("created_at"),
+            sort_rank=product_rank(search) if search else _no_rank(),
+        )
+        .values(
+            "row_kind",
+            "row_id",
+            "sort_price",
+            "sort_rating",
+            "sort_popular",
+            "sort_created",
+            "sort_rank",
+        )
+    )
+
+
+def listing_order_by(ordering, default=DEFAULT_ORDERING):
+    """
+    Translate an ``?ordering=`` value into ORDER BY columns for the union.
+
+    Only the first term is used; unknown fields fall back to ``default``
+    (newest first). Kind and id break ties so pages never overlap.
+    """
+    term = (ordering or "").split(",")[0].strip()
+    if term.lstrip("-") not in ORDERING_COLUMNS:
+        term = default
+    direction = "-" if term.startswith("-") else ""
+    column = ORDERING_COLUMNS[term.lstrip("-")]
+    return [f"{direction}{column}", f"{direction}row_kind", f"{direction}row_id"]
+
+
+class UnifiedListing:
+    """
+    A lazily evaluated, paginator-compatible list of variants and
+    standalone products.
+
+    ``variants`` and ``products`` are the filtered querysets to list;
+    ``variant_queryset`` and ``product_queryset`` (default: the same) load
+    the instances for a page, so they carry the select/prefetch the
+    serializer needs. With ``search`` the rows carry a relevance rank and
+    are listed most relevant first unless ``ordering`` says otherwise.
+
+    Supports ``sales_crm.pagination.KeysetPagination``: keyset pages apply
+    the cursor condition inside both halves of the union.
+    """
+
+    # Tells django.core.paginator the rows have a stable order.
+    ordered = True
+
+    def __init__(
+        self,
+        variants,
+        products,
+        ordering=None,
+        variant_queryset=None,
+        product_queryset=None,
+        search=None,
+    ):
+        self.variants = variants
+        self.products = products
+        self.search = search or None
+        self.order_by = listing_order_by(
+            ordering, SEARCH_ORDERING if self.search else DEFAULT_ORDERING
+        )
+        self.variant_queryset = (
+            variants if variant_queryset is None else variant_queryset
+        )
+        self.product_queryset = (
+            products if product_queryset is None else product_queryset
+        )
+        self._count = None
+
+    def rows(self, after=None):
+        """
+        The ordered ``UNION ALL`` of both projections, as dicts; with
+        ``after`` (sort values of a row) only the rows that follow it.
+        """
+        variants = _variant_rows(self.variants, self.search)
+        products = _product_rows(self.products, self.search)
+        if after is not None:
+            q = keyset_filter(self.order_by, after)
+            variants, products = variants.filter(q), products.filter(q)
+        return variants.union(products, all=True).order_by(*self.order_by)
+
+    @property
+    def keyset_ordering(self):
+        return self.order_by
+
+    def count(self):
+        if self._count is None:
+            self._count = self.rows().count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            items = self[key : key + 1]
+            if not items:
+                raise IndexError(key)
+            return items[0]
+        return self._load(list(self.rows()[key]))
+
+    def keyset_page(self, after, limit):
+        rows = list(self.rows(after)[:limit])
+        objects = self._objects(rows)
+        columns = [term.lstrip("-") for term in self.order_by]
+        page = []
+        for row in rows:
+            key = (row["row_kind"], row["row_id"])
+            if key in objects:
+                page.append(([row[column] for column in columns], objects[key]))
+        return page
+
+    def _load(self, rows):
+        objects = self._objects(rows)
+        keys = ((row["row_kind"], row["row_id"]) for row in rows)
+        return [objects[key] for key in keys if key in objects]
+
+    def _objects(self, rows):
+        ids = {KIND_VARIANT: [], KIND_PRODUCT: []}
+        for row in rows:
+            ids[row["row_kind"]].append(row["row_id"])
+
+        objects = {}
+        if ids[KIND_VARIANT]:
+            for obj in self.variant_queryset.filter(pk__in=ids[KIND_VARIANT]):
+                objects[(KIND_VARIANT, obj.pk)] = obj
+        if ids[KIND_PRODUCT]:
+            for obj in self.product_queryset.filter(pk__in=ids[KIND_PRODUCT]):
+                objects[(KIND_PRODUCT, obj.pk)] = obj
+        return objects
+
+
+def listing_price_range(variants, products):
+    """
+    Lowest and highest price for the price-range slider, as floats.
+
+    A variant without its own price is stored with its parent's final
+    price, as the serializer shows it.
+    """
+    variant_prices = variants.aggregate(
+        lo=Min("stored_final_price"), hi=Max("stored_final_price")
+    )
+    product_prices = products.aggregate(
+        lo=Min("stored_final_price"), hi=Max("stored_final_price")
+    )
+    lows = [p["lo"] for p in (variant_prices, product_prices) if p["lo"] is not None]
+    return (
+        float(min(lows)) if lows else 0.0,
+        float(max(variant_prices["hi"] or 0, product_prices["hi"] or 0)),
+    )
@@ -1,65 +1,37 @@
-from django.core.management.base import BaseCommand
 from django.db import models
-from django_tenants.utils import schema_context
-from tenants.models import Client
+
 from product.models import Product
+from tenants.jobs import TenantJobCommand
 
 
-class Command(BaseCommand):
+class Command(TenantJobCommand):
     help = "Generates a unique 12-digit barcode for products missing a barcode across all tenant schemas."
 
-    def add_arguments(self, parser):
-        parser.add_argument(
-            "--schema",
-            type=str,
-            help="Specify a single schema name to run the barcode generation on (optional).",
-        )
-
-    def handle(self, *args, **options):
-        single_schema = options.get("schema")
-
-        if single_schema:
-            schemas = [single_schema]
-        else:
-            schemas = list(Client.objects.values_list("schema_name", flat=True))
-
-        total_updated = 0
-
-        for schema in schemas:
-            self.stdout.write(f"Processing schema: {schema}")
-            try:
-                with schema_context(schema):
-                    products_without_barcode = Product.objects.filter(
-                        models.Q(barcode__isnull=True) | models.Q(barcode="")
-                    )
-                    count = products_without_barcode.count()
-                    if count == 0:
-                        self.stdout.write(
-                            self.style.SUCCESS(f"  No products missing barcodes in schema '{schema}'.")
-                        )
-                        continue
-
-                    self.stdout.write(
-                        f"  Found {count} product(s) missing barcodes in schema '{schema}'. Generating barcodes..."
-                    )
-                    updated_in_schema = 0
-                    for product in products_without_barcode:
-                        if not product.barcode:
-                            product.barcode = Product.generate_unique_barcode()
-                            product.save(update_fields=["barcode"])
-                            updated_in_schema += 1
-
-                    total_updated += updated_in_schema
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f"  Successfully updated {updated_in_schema} product(s) in schema '{schema}'."
-                        )
-                    )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f"  FAILED processing schema '{schema}': {str(e)}")
-                )
+    job_name = "generate_product_barcodes"
 
+    def run_for_tenant(self, schema_name, dry_run=False):
+        products_without_barcode = Product.objects.filter(
+            models.Q(barcode__isnull=True) | models.Q(barcode="")
+        )
+        if dry_run:
+            return products_without_barcode.count()
+
+        updated_in_schema = 0
+        for product in products_without_barcode:
+            if not product.barcode:
+                product.barcode = Product.generate_unique_barcode()
+                product.save(update_fields=["barcode"])
+                updated_in_schema += 1
+        return updated_in_schema
+
+    def describe(self, result):
+        return f"{result.result or 0} product(s) missing barcodes"
+
+    def summarize(self, report):
+        total = sum(r.result or 0 for r in report.succeeded)
+        verb = "Would generate" if report.dry_run else "Generated"
         self.stdout.write(
-            self.style.SUCCESS(f"\nDone! Generated barcodes for {total_updated} total product(s) across schemas.")
+            self.style.SUCCESS(
+                f"{verb} barcodes for {total} total product(s) across schemas."
+            )
         )
@@ -0,0 +1,24 @@
+from product.pricing import recompute_prices, schedule_next_offer_flip
+from tenants.jobs import TenantJobCommand
+
+
+class Command(TenantJobCommand):
+    help = "Recomputes stored product and variant prices across all tenant schemas."
+
+    job_name = "recompute_product_prices"
+
+    def run_for_tenant(self, schema_name, dry_run=False):
+        written = recompute_prices(dry_run=dry_run)
+        if not dry_run:
+            schedule_next_offer_flip(schema_name)
+        return written
+
+    def describe(self, result):
+        return f"{result.result or 0} price(s) out of date"
+
+    def summarize(self, report):
+        total = sum(r.result or 0 for r in report.succeeded)
+        verb = "Would update" if report.dry_run else "Updated"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {total} stored price(s) across schemas.")
+        )
@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-16 23:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Same rule as Product.final_price; discounts and applied offers are filled
+# in by the recompute_product_prices command / nightly reconciliation.
+BACKFILL_FINAL_PRICES = """
+UPDATE product_product p
+SET stored_final_price = CASE
+    WHEN p.use_dynamic_pricing THEN COALESCE((
+        SELECT SUM(m.price_per_unit * c.quantity)
+        FROM product_productcomposition c
+        JOIN product_pricingmetric m ON m.id = c.metric_id
+        WHERE c.product_id = p.id
+    ), 0) + p.base_making_charge
+    ELSE p.price
+END;
+
+UPDATE product_productvariant v
+SET stored_final_price = COALESCE(v.price, p.stored_final_price)
+FROM product_product p
+WHERE p.id = v.product_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0043_product_barcode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='applied_offer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='product.offer'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='stored_discounted_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='stored_final_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='productvariant',
+            name='applied_offer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='product.offer'),
+        ),
+        migrations.AddField(
+            model_name='productvariant',
+            name='stored_discounted_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='productvariant',
+            name='stored_final_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True),
+        ),
+        migrations.RunSQL(BACKFILL_FINAL_PRICES, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['stored_final_price'], name='product_pro_stored__e66ddd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productvariant',
+            index=models.Index(fields=['stored_final_price'], name='product_pro_stored__378978_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-16 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0045_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'updated_at', 'id'], name='product_pro_status_fbe058_idx'),
+        ),
+    ]
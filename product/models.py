@@ -1,8 +1,10 @@
 import random
 import string
+from decimal import Decimal
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
-from django.db.models import Q
 from django.utils.text import slugify
 
 from customer.models import Customer
@@ -171,6 +173,32 @@ class Product(models.Model):
     meta_title = models.CharField(max_length=255, null=True, blank=True)
     meta_description = models.TextField(null=True, blank=True)
 
+    # Maintained by product.pricing; indexed for price sorting and filters
+    stored_final_price = models.DecimalField(
+        max_digits=20, decimal_places=2, null=True, blank=True
+    )
+    stored_discounted_price = models.DecimalField(
+        max_digits=20, decimal_places=2, null=True, blank=True
+    )
+    applied_offer = models.ForeignKey(
+        "Offer",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    # Searched by product.search; category names are matched separately
+    # because a generated column cannot read other tables.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", "barcode", weight="A", config="simple")
+            + SearchVector("description", weight="C", config="simple")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -191,6 +219,13 @@ class Product(models.Model):
             models.Index(fields=["sub_category", "status", "-created_at"]),
             models.Index(fields=["is_popular", "-created_at"]),
             models.Index(fields=["is_featured", "-created_at"]),
+            models.Index(fields=["stored_final_price"]),
+            # Keyset order of the pasalbiz storefront feed.
+            models.Index(fields=["status", "updated_at", "id"]),
+            GinIndex(fields=["search_vector"], name="product_search_vector_gin"),
+            GinIndex(
+                fields=["name"], name="product_name_trgm_gin", opclasses=["gin_trgm_ops"]
+            ),
         ]
 
     def __str__(self):
@@ -207,6 +242,11 @@ class Product(models.Model):
         if not self.barcode:
             self.barcode = self.generate_unique_barcode()
 
+        # Fixed prices are known now; dynamic ones (and offers) are filled
+        # in by product.pricing once the compositions are saved.
+        if not self.use_dynamic_pricing:
+            self.stored_final_price = self.price
+
         super().save(*args, **kwargs)
 
     @classmethod
@@ -217,6 +257,21 @@ class Product(models.Model):
             if not cls.objects.filter(barcode=code).exists():
                 return code
 
+    @classmethod
+    def generate_unique_barcodes(cls, count):
+        """``count`` unique barcodes, with one query per round of candidates."""
+        codes = set()
+        while len(codes) < count:
+            candidates = {
+                "20" + "".join(random.choices(string.digits, k=10))
+                for _ in range(count - len(codes))
+            }
+            taken = cls.objects.filter(barcode__in=candidates).values_list(
+                "barcode", flat=True
+            )
+            codes |= candidates - set(taken)
+        return list(codes)
+
     @property
     def final_price(self):
         if not self.use_dynamic_pricing:
@@ -229,44 +284,26 @@ class Product(models.Model):
 
     @property
     def active_offer(self):
-        from django.utils import timezone
-
-        now = timezone.now()
-
-        q = Q(products=self)  # always check direct product assignment
+        """
+        The live offer assigned to this product, its category or its
+        sub-category with the biggest discount (oldest offer on a tie).
 
-        if self.category_id is not None:
-            q |= Q(categories=self.category)
+        Resolved from the tenant's in-memory offer index and remembered on
+        the instance; ``product.offers.resolve_offers`` fills it in for a
+        whole page at once.
+        """
+        if "_active_offer" not in self.__dict__:
+            from .offers import offer_index
 
-        if self.sub_category_id is not None:
-            q |= Q(sub_categories=self.sub_category)
-
-        offers = (
-            Offer.objects
-            .filter(is_active=True, start_date__lte=now, end_date__gte=now)
-            .filter(q)
-            .distinct()
-        )
-
-        return offers.order_by("-discount_value").first()
+            self._active_offer = offer_index().resolve_product(self)
+        return self._active_offer
 
     @property
     def discounted_price(self):
         offer = self.active_offer
         if not offer:
             return None
-
-        base_price = self.final_price
-
-        if offer.offer_type == "percentage":
-            from decimal import Decimal
-
-            return base_price * (Decimal("1") - offer.discount_value / Decimal("100"))
-        elif offer.offer_type == "fixed":
-            from decimal import Decimal
-
-            return max(Decimal("0.00"), base_price - offer.discount_value)
-        return None
+        return offer.apply_to(self.final_price)
 
 
 class ProductOption(models.Model):
@@ -299,6 +336,22 @@ class ProductVariant(models.Model):
     option_values = models.ManyToManyField(
         ProductOptionValue, related_name="variants", blank=True
     )
+
+    # Maintained by product.pricing; indexed for price sorting and filters
+    stored_final_price = models.DecimalField(
+        max_digits=20, decimal_places=2, null=True, blank=True
+    )
+    stored_discounted_price = models.DecimalField(
+        max_digits=20, decimal_places=2, null=True, blank=True
+    )
+    applied_offer = models.ForeignKey(
+        "Offer",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -307,12 +360,22 @@ class ProductVariant(models.Model):
             models.Index(fields=["price"]),
             models.Index(fields=["-created_at"]),
             models.Index(fields=["product", "price"]),
+            models.Index(fields=["stored_final_price"]),
         ]
 
     def __str__(self):
         values = ", ".join(v.value for v in self.option_values.all())
         return f"{self.product.name} ({values})"
 
+    def save(self, *args, **kwargs):
+        # As in Product.save: an own fixed price is known now. Falling back
+        # to the product's price, dynamic pricing and offers are left to
+        # product.pricing.
+        if self.price is not None and not self.product.use_dynamic_pricing:
+            self.stored_final_price = self.price
+
+        super().save(*args, **kwargs)
+
     @property
     def active_offer(self):
         return self.product.active_offer
@@ -325,16 +388,7 @@ class ProductVariant(models.Model):
 
         # Use variant price if set, otherwise use product's base price
         base_price = self.price if self.price is not None else self.product.final_price
-
-        if offer.offer_type == "percentage":
-            from decimal import Decimal
-
-            return base_price * (Decimal("1") - offer.discount_value / Decimal("100"))
-        elif offer.offer_type == "fixed":
-            from decimal import Decimal
-
-            return max(Decimal("0.00"), base_price - offer.discount_value)
-        return None
+        return offer.apply_to(base_price)
 
 
 class ProductReview(models.Model):
@@ -429,3 +483,11 @@ class Offer(models.Model):
 
         now = timezone.now()
         return self.is_active and self.start_date <= now <= self.end_date
+
+    def apply_to(self, price):
+        """Return ``price`` after this offer's discount (None if unknown type)."""
+        if self.offer_type == "percentage":
+            return price * (Decimal("1") - self.discount_value / Decimal("100"))
+        elif self.offer_type == "fixed":
+            return max(Decimal("0.00"), price - self.discount_value)
+        return None
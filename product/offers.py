@@ -0,0 +1,144 @@
+"""
+In-memory index of the offers that can apply to products.
+
+``Product.active_offer`` used to run an ``Offer`` query (a Q across three
+M2M tables, ``distinct`` and ``order_by``) on every access. ``OfferIndex``
+loads every offer that is active and not yet over, together with its
+product, category and sub-category memberships, once per tenant catalog
+version (see ``product.catalog``) and resolves products from memory.
+
+Start and end dates are checked when resolving, so an offer beginning or
+ending later needs no rebuild; anything that changes an offer bumps the
+catalog version.
+
+``resolve_offers(products)`` resolves a whole page at once and stores the
+result on each instance, so ``active_offer`` / ``discounted_price`` cost
+nothing afterwards.
+"""
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.db import connection
+from django.utils import timezone
+
+from .catalog import get_catalog_version
+from .models import Offer, Product, ProductVariant
+
+MAX_TENANTS = 512
+# Without a catalog version (Redis unavailable) an index is reused this long.
+UNVERSIONED_TTL = 30
+
+
+def _sort_key(offer):
+    # Biggest discount wins; on a tie the oldest offer does.
+    return (-offer.discount_value, offer.pk)
+
+
+class OfferIndex:
+    def __init__(self, offers, product_links):
+        self.by_product = defaultdict(list)
+        self.by_category = defaultdict(list)
+        self.by_sub_category = defaultdict(list)
+
+        offers_by_id = {offer.pk: offer for offer in offers}
+        for offer_id, product_id in product_links:
+            if offer_id in offers_by_id:
+                self.by_product[product_id].append(offers_by_id[offer_id])
+        for offer in offers:
+            for category in offer.categories.all():
+                self.by_category[category.pk].append(offer)
+            for sub_category in offer.sub_categories.all():
+                self.by_sub_category[sub_category.pk].append(offer)
+
+    @classmethod
+    def load(cls, now=None):
+        now = now or timezone.now()
+        offers = list(
+            Offer.objects
+            .filter(is_active=True, end_date__gte=now)
+            .prefetch_related("categories", "sub_categories")
+        )
+        product_links = Offer.products.through.objects.filter(
+            offer_id__in=[offer.pk for offer in offers]
+        ).values_list("offer_id", "product_id")
+        return cls(offers, list(product_links))
+
+    def resolve(self, product_id, category_id=None, sub_category_id=None, now=None):
+        """
+        Return the offer ``Product.active_offer`` would pick: active at
+        ``now`` and assigned to the product, its category or its
+        sub-category.
+        """
+        candidates = list(self.by_product.get(product_id, ()))
+        if category_id is not None:
+            candidates += self.by_category.get(category_id, ())
+        if sub_category_id is not None:
+            candidates += self.by_sub_category.get(sub_category_id, ())
+        if not candidates:
+            return None
+
+        now = now or timezone.now()
+        live = [o for o in candidates if o.start_date <= now <= o.end_date]
+        return min(live, key=_sort_key) if live else None
+
+    def resolve_product(self, product, now=None):
+        return self.resolve(
+            product.pk, product.category_id, product.sub_category_id, now=now
+        )
+
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def offer_index():
+    """The current tenant's ``OfferIndex``, rebuilt when its catalog changes."""
+    schema_name = connection.schema_name
+    version = get_catalog_version(schema_name)
+
+    with _lock:
+        entry = _indexes.get(schema_name)
+        if entry is not None:
+            entry_version, built_at, index = entry
+            fresh = (
+                entry_version == version
+                if version is not None
+                else time.monotonic() - built_at < UNVERSIONED_TTL
+            )
+            if fresh:
+                _indexes.move_to_end(schema_name)
+                return index
+
+    index = OfferIndex.load()
+    with _lock:
+        _indexes[schema_name] = (version, time.monotonic(), index)
+        _indexes.move_to_end(schema_name)
+        while len(_indexes) > MAX_TENANTS:
+            _indexes.popitem(last=False)
+    return index
+
+
+def resolve_offers(items):
+    """
+    Resolve ``active_offer`` for many products and/or variants with one
+    index lookup, caching the result on each product instance.
+
+    Returns ``{product_id: offer or None}``.
+    """
+    products = []
+    for item in items:
+        if isinstance(item, ProductVariant):
+            item = item.product
+        if isinstance(item, Product):
+            products.append(item)
+
+    pending = [p for p in products if "_active_offer" not in p.__dict__]
+    if pending:
+        index = offer_index()
+        now = timezone.now()
+        for product in pending:
+            product._active_offer = index.resolve_product(product, now=now)
+
+    return {product.pk: product._active_offer for product in products}
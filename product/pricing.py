@@ -0,0 +1,237 @@
+"""
+Stored effective prices.
+
+``Product`` and ``ProductVariant`` carry ``stored_final_price`` (the
+composed price), ``stored_discounted_price`` and ``applied_offer`` so the
+storefront can sort, filter and aggregate on indexed columns instead of
+recomputing dynamic prices per row.
+
+``recompute_prices`` brings the columns up to date. Signals queue it (in
+the background, batched per tenant) when prices, compositions, metrics or
+offers change. Offers also take effect or lapse without any row changing,
+so every tenant's next offer start/end time is kept in the Redis sorted
+set ``OFFER_FLIPS_KEY`` and ``flip_offer_prices_task`` recomputes tenants
+whose time has come.
+"""
+
+import logging
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Min, Prefetch
+from django.utils import timezone
+
+from .catalog import schedule_catalog_version_bump
+from .models import Offer, Product, ProductComposition, ProductVariant
+from .offers import offer_index
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+PRICE_FIELDS = ["stored_final_price", "stored_discounted_price", "applied_offer"]
+
+RECOMPUTE_DEBOUNCE_SECONDS = 5
+RECOMPUTE_ALL = "*"
+OFFER_FLIPS_KEY = "product_prices:offer_flips"
+
+
+def _quantize(value):
+    return None if value is None else Decimal(value).quantize(CENT)
+
+
+def _set_prices(obj, final_price, offer):
+    """Update ``obj``'s stored columns; returns True if anything changed."""
+    discounted = None
+    if offer is not None and final_price is not None:
+        discounted = offer.apply_to(final_price)
+    values = (
+        _quantize(final_price),
+        _quantize(discounted),
+        offer.pk if discounted is not None else None,
+    )
+    current = (
+        obj.stored_final_price,
+        obj.stored_discounted_price,
+        obj.applied_offer_id,
+    )
+    if values == current:
+        return False
+    obj.stored_final_price, obj.stored_discounted_price, obj.applied_offer_id = values
+    return True
+
+
+def recompute_prices(product_ids=None, batch_size=500, dry_run=False):
+    """
+    Recompute the stored prices of ``product_ids`` (default: every product)
+    and their variants. Returns the number of rows written (or, with
+    ``dry_run``, that would be).
+    """
+    products = Product.objects.prefetch_related(
+        Prefetch(
+            "compositions",
+            queryset=ProductComposition.objects.select_related("metric"),
+        ),
+        Prefetch(
+            "variants",
+            queryset=ProductVariant.objects.only(
+                "id", "product_id", "price", *PRICE_FIELDS
+            ),
+        ),
+    ).only(
+        "id",
+        "price",
+        "use_dynamic_pricing",
+        "base_making_charge",
+        "category_id",
+        "sub_category_id",
+        *PRICE_FIELDS,
+    ).order_by("id")
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+
+    index = offer_index()
+    now = timezone.now()
+    changed_products = []
+    changed_variants = []
+
+    for product in products.iterator(chunk_size=batch_size):
+        offer = index.resolve_product(product, now=now)
+        final_price = product.final_price
+        if _set_prices(product, final_price, offer):
+            changed_products.append(product)
+
+        for variant in product.variants.all():
+            base_price = variant.price if variant.price is not None else final_price
+            if _set_prices(variant, base_price, offer):
+                changed_variants.append(variant)
+
+    if dry_run:
+        return len(changed_products) + len(changed_variants)
+
+    # bulk_update sends no signals, so this never re-queues itself.
+    with transaction.atomic():
+        Product.objects.bulk_update(
+            changed_products, PRICE_FIELDS, batch_size=batch_size
+        )
+        ProductVariant.objects.bulk_update(
+            changed_variants, PRICE_FIELDS, batch_size=batch_size
+        )
+    if changed_products or changed_variants:
+        # Price ranges and facets are cached under the catalog version.
+        schedule_catalog_version_bump()
+    return len(changed_products) + len(changed_variants)
+
+
+# =====================================================
+# BACKGROUND SCHEDULING
+# =====================================================
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def _pending_key(schema_name):
+    return f"product_prices:pending:{schema_name}"
+
+
+def schedule_price_recompute(product_ids=None):
+    """
+    Queue a recompute of ``product_ids`` (None = every product) for the
+    current tenant once the transaction commits. Bursts of writes are
+    batched into one task.
+    """
+    schema_name = connection.schema_name
+    members = [str(pk) for pk in product_ids] if product_ids is not None else []
+    transaction.on_commit(lambda: _enqueue(schema_name, members or [RECOMPUTE_ALL]))
+
+
+def _enqueue(schema_name, members):
+    from .tasks import flush_price_recompute_task, recompute_prices_task
+
+    try:
+        pipe = _redis().pipeline()
+        pipe.sadd(_pending_key(schema_name), *members)
+        pipe.expire(_pending_key(schema_name), 24 * 60 * 60)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Could not batch price recompute for %s: %s", schema_name, e)
+        product_ids = None if RECOMPUTE_ALL in members else [int(m) for m in members]
+        recompute_prices_task.delay(schema_name, product_ids)
+        return
+
+    if not cache.add(
+        f"product_prices:scheduled:{schema_name}",
+        True,
+        timeout=RECOMPUTE_DEBOUNCE_SECONDS * 12,
+    ):
+        return
+
+    try:
+        flush_price_recompute_task.apply_async(
+            args=[schema_name], countdown=RECOMPUTE_DEBOUNCE_SECONDS
+        )
+    except Exception as e:
+        # The nightly reconciliation will pick the change up.
+        logger.warning("Could not queue price recompute for %s: %s", schema_name, e)
+
+
+def take_pending(schema_name):
+    """
+    Atomically take the queued product ids for ``schema_name``.
+
+    Returns None when everything must be recomputed.
+    """
+    cache.delete(f"product_prices:scheduled:{schema_name}")
+    pipe = _redis().pipeline()
+    pipe.smembers(_pending_key(schema_name))
+    pipe.delete(_pending_key(schema_name))
+    members, _ = pipe.execute()
+
+    members = {m.decode() if isinstance(m, bytes) else m for m in members}
+    if RECOMPUTE_ALL in members:
+        return None
+    return sorted(int(m) for m in members)
+
+
+def next_offer_flip(now=None):
+    """The next time an active offer of the current tenant starts or ends."""
+    now = now or timezone.now()
+    upcoming = Offer.objects.filter(is_active=True)
+    times = [
+        upcoming.filter(start_date__gt=now).aggregate(t=Min("start_date"))["t"],
+        upcoming.filter(end_date__gt=now).aggregate(t=Min("end_date"))["t"],
+    ]
+    times = [t for t in times if t is not None]
+    return min(times) if times else None
+
+
+def schedule_next_offer_flip(schema_name=None):
+    """Record when the current tenant's stored prices next go stale."""
+    schema_name = schema_name or connection.schema_name
+    flip_at = next_offer_flip()
+    try:
+        if flip_at is None:
+            _redis().zrem(OFFER_FLIPS_KEY, schema_name)
+        else:
+            _redis().zadd(OFFER_FLIPS_KEY, {schema_name: flip_at.timestamp()})
+    except Exception as e:
+        logger.warning("Could not schedule offer flip for %s: %s", schema_name, e)
+    return flip_at
+
+
+def take_due_offer_flips(now=None):
+    """Pop every tenant whose next offer start/end time has passed."""
+    now = now or timezone.now()
+    redis = _redis()
+    due = redis.zrangebyscore(OFFER_FLIPS_KEY, "-inf", now.timestamp())
+    taken = []
+    for member in due:
+        # zrem succeeds for exactly one of several concurrent sweepers.
+        if redis.zrem(OFFER_FLIPS_KEY, member):
+            taken.append(member.decode() if isinstance(member, bytes) else member)
+    return taken
+
@@ -0,0 +1,141 @@
+"""
+PostgreSQL full-text and trigram product search.
+
+``?search=`` used to become ``ILIKE '%term%'`` scans, which cannot use an
+index or rank results. A product now matches when any of these hold:
+
+- its ``search_vector`` (name and barcode weighted A, description C; a
+  generated column with a GIN index) matches the query;
+- its name is trigram-similar to the query, which tolerates typos
+  (``pg_trgm``, GIN index on ``name``);
+- its barcode is exactly the query;
+- its category or sub-category name appears in the query, give or take
+  typos (both tables are small, so they are matched by subquery).
+
+Results are ranked by ``search_rank``: the full-text rank, plus part of
+the name similarity, plus a bonus for a matching category (the weight the
+vector would give a B field). Variants match through their product or
+their option values ("Black", "XL").
+"""
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import Case, Exists, F, FloatField, OuterRef, Q, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework import filters
+
+from .models import Category, Product, ProductVariant, SubCategory
+
+SEARCH_CONFIG = "simple"
+
+# word_similarity() a category or option name needs against the query.
+NAME_MATCH_THRESHOLD = 0.6
+NAME_MATCH_WEIGHT = 0.4
+SIMILARITY_WEIGHT = 0.5
+
+
+def search_query(text):
+    return SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+
+
+def _named(queryset, text, field="name"):
+    """Rows of ``queryset`` whose ``field`` appears in ``text``."""
+    return queryset.annotate(
+        name_match=TrigramWordSimilarity(F(field), Value(text))
+    ).filter(name_match__gte=NAME_MATCH_THRESHOLD)
+
+
+def _bonus(condition):
+    return Case(
+        When(condition, then=Value(NAME_MATCH_WEIGHT)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def product_matches(text):
+    """Q selecting the products that match ``text``."""
+    return (
+        Q(search_vector=search_query(text))
+        | Q(name__trigram_word_similar=text)
+        | Q(barcode=text)
+        | Q(category__in=_named(Category.objects.all(), text).values("pk"))
+        | Q(sub_category__in=_named(SubCategory.objects.all(), text).values("pk"))
+    )
+
+
+def product_rank(text, prefix=""):
+    """Relevance of a product to ``text``; ``prefix`` reaches it by relation."""
+    categories = _named(Category.objects.all(), text).values("pk")
+    sub_categories = _named(SubCategory.objects.all(), text).values("pk")
+    return (
+        SearchRank(F(f"{prefix}search_vector"), search_query(text))
+        + Coalesce(
+            TrigramWordSimilarity(text, f"{prefix}name"),
+            Value(0.0),
+            output_field=FloatField(),
+        )
+        * SIMILARITY_WEIGHT
+        + _bonus(Q(**{f"{prefix}category__in": categories}))
+        + _bonus(Q(**{f"{prefix}sub_category__in": sub_categories}))
+    )
+
+
+def _option_value_matches(text):
+    through = ProductVariant.option_values.through
+    return Exists(
+        _named(
+            through.objects.filter(productvariant=OuterRef("pk")),
+            text,
+            "productoptionvalue__value",
+        )
+    )
+
+
+def variant_matches(text):
+    """Q selecting the variants that match ``text``."""
+    products = Product.objects.filter(product_matches(text)).values("pk")
+    return Q(product__in=products) | Q(_option_value_matches(text))
+
+
+def variant_rank(text):
+    return product_rank(text, prefix="product__") + _bonus(
+        Q(_option_value_matches(text))
+    )
+
+
+def search(queryset, text):
+    """
+    Filter a Product or ProductVariant queryset by ``text``, annotated
+    with ``search_rank`` and ordered most relevant first.
+    """
+    if queryset.model is ProductVariant:
+        matches, rank = variant_matches(text), variant_rank(text)
+    else:
+        matches, rank = product_matches(text), product_rank(text)
+    return (
+        queryset.filter(matches)
+        .annotate(search_rank=rank)
+        .order_by("-search_rank", "-pk")
+    )
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` for product and variant list views, backed by ``search``.
+
+    ``search_fields`` is not used. An explicit ``?ordering=`` still wins,
+    as ``OrderingFilter`` runs after this backend.
+    """
+
+    def get_search_text(self, request):
+        return " ".join(self.get_search_terms(request))
+
+    def filter_queryset(self, request, queryset, view):
+        text = self.get_search_text(request)
+        if not text:
+            return queryset
+        return search(queryset, text)
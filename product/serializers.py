@@ -22,6 +22,7 @@ from .models import (
     SubCategory,
     Wishlist,
 )
+from .offers import resolve_offers
 
 
 class PricingMetricSerializer(serializers.ModelSerializer):
@@ -122,6 +123,108 @@ class OfferListSerializer(serializers.ModelSerializer):
         ]
 
 
+PAGE_STAT_FIELDS = {"reviews_count", "average_rating", "is_wishlist"}
+
+
+def _page_products(items):
+    products = []
+    for item in items:
+        if isinstance(item, ProductVariant):
+            item = item.product
+        if isinstance(item, Product):
+            products.append(item)
+    return products
+
+
+def load_page_stats(items, request=None):
+    """
+    Review count, average rating and wishlist membership of every product
+    (or variant's product) in ``items``, in one query each, cached on the
+    product instances for ``_reviews_count`` / ``_average_rating`` /
+    ``_is_wishlist``.
+    """
+    products = _page_products(items)
+
+    pending = [p for p in products if "_review_stats" not in p.__dict__]
+    if pending:
+        stats = {
+            row["product_id"]: (row["count"], row["avg"])
+            for row in ProductReview.objects.filter(
+                product_id__in={p.pk for p in pending}
+            )
+            .order_by()
+            .values("product_id")
+            .annotate(count=models.Count("id"), avg=models.Avg("rating"))
+        }
+        for product in pending:
+            product._review_stats = stats.get(product.pk, (0, None))
+
+    pending = [p for p in products if "_is_wishlist" not in p.__dict__]
+    if pending:
+        customer = get_customer_from_request(request) if request else None
+        wished = set()
+        if customer is not None:
+            wished = set(
+                Wishlist.objects.filter(
+                    user=customer, product_id__in={p.pk for p in pending}
+                ).values_list("product_id", flat=True)
+            )
+        for product in pending:
+            product._is_wishlist = product.pk in wished
+
+
+def _reviews_count(product):
+    # use annotated / page-loaded values if available, else fall back to query
+    if hasattr(product, "reviews_count_annotated"):
+        return product.reviews_count_annotated
+    if "_review_stats" in product.__dict__:
+        return product._review_stats[0]
+    return ProductReview.objects.filter(product=product).count()
+
+
+def _average_rating(product):
+    if hasattr(product, "average_rating"):
+        return product.average_rating or 0
+    if "_review_stats" in product.__dict__:
+        return product._review_stats[1] or 0
+    return (
+        ProductReview.objects.filter(product=product).aggregate(
+            avg_rating=models.Avg("rating")
+        )["avg_rating"]
+        or 0
+    )
+
+
+def _is_wishlist(product, request):
+    if "_is_wishlist" in product.__dict__:
+        return product._is_wishlist
+    if not request:
+        return False
+    user = get_customer_from_request(request)
+    if not user:
+        return False
+    return Wishlist.objects.filter(user=user, product=product).exists()
+
+
+class ProductPageListSerializer(serializers.ListSerializer):
+    """
+    Loads what every item on a page needs before rendering it: active
+    offers in one index lookup, review stats and wishlist membership in
+    one query each.
+    """
+
+    def to_representation(self, data):
+        items = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(items)
+        resolve_offers(items)
+        # Serializers rendering other serializers say so with page_stats.
+        if getattr(self.child, "page_stats", False) or (
+            PAGE_STAT_FIELDS & set(self.child.fields)
+        ):
+            load_page_stats(items, self.context.get("request"))
+        return super().to_representation(items)
+
+
 class OfferWriteSerializer(serializers.ModelSerializer):
     products = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.only("id"), many=True, required=False
@@ -294,6 +397,7 @@ class ProductVariantReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ProductVariant
+        list_serializer_class = ProductPageListSerializer
         fields = [
             "id",
             "price",
@@ -369,6 +473,7 @@ class ProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
+        list_serializer_class = ProductPageListSerializer
         fields = [
             "id",
             "name",
@@ -430,27 +535,13 @@ class ProductSerializer(serializers.ModelSerializer):
         return options_data
 
     def get_reviews_count(self, obj):
-        # use annotated value if available (from queryset), else fall back to query
-        if hasattr(obj, "reviews_count_annotated"):
-            return obj.reviews_count_annotated
-        return ProductReview.objects.filter(product=obj).count()
+        return _reviews_count(obj)
 
     def get_average_rating(self, obj):
-        # use annotated value if available (from queryset), else fall back to query
-        if hasattr(obj, "average_rating"):
-            return obj.average_rating or 0
-        return (
-            ProductReview.objects.filter(product=obj).aggregate(
-                avg_rating=models.Avg("rating")
-            )["avg_rating"]
-            or 0
-        )
+        return _average_rating(obj)
 
     def get_is_wishlist(self, obj):
-        user = get_customer_from_request(self.context["request"])
-        if not user:
-            return False
-        return Wishlist.objects.filter(user=user, product=obj).exists()
+        return _is_wishlist(obj, self.context.get("request"))
 
     # to_internal_value, validate_variants, create, update — all unchanged
     def to_internal_value(self, data):
@@ -779,30 +870,17 @@ class ProductSmallSerializer(serializers.ModelSerializer):
     )
 
     def get_reviews_count(self, obj):
-        # use annotated value if available (from queryset), else fall back to query
-        if hasattr(obj, "reviews_count_annotated"):
-            return obj.reviews_count_annotated
-        return ProductReview.objects.filter(product=obj).count()
+        return _reviews_count(obj)
 
     def get_average_rating(self, obj):
-        # use annotated value if available (from queryset), else fall back to query
-        if hasattr(obj, "average_rating"):
-            return obj.average_rating or 0
-        return (
-            ProductReview.objects.filter(product=obj).aggregate(
-                avg_rating=models.Avg("rating")
-            )["avg_rating"]
-            or 0
-        )
+        return _average_rating(obj)
 
     def get_is_wishlist(self, obj):
-        user = get_customer_from_request(self.context["request"])
-        if not user:
-            return False
-        return Wishlist.objects.filter(user=user, product=obj).exists()
+        return _is_wishlist(obj, self.context.get("request"))
 
     class Meta:
         model = Product
+        list_serializer_class = ProductPageListSerializer
         fields = [
             "id",
             "name",
@@ -844,6 +922,7 @@ class ProductOnlySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
+        list_serializer_class = ProductPageListSerializer
         fields = [
             "id",
             "name",
@@ -927,6 +1006,8 @@ class WishlistSerializer(serializers.ModelSerializer):
 class BulkUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
     zip_file = serializers.FileField(required=False, allow_null=True)
+    # Validate every row and report problems without importing anything.
+    dry_run = serializers.BooleanField(required=False, default=False)
 
 
 class ProductVariantAsProductSerializer(serializers.ModelSerializer):
@@ -972,6 +1053,7 @@ class ProductVariantAsProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ProductVariant
+        list_serializer_class = ProductPageListSerializer
         fields = [
             "id",
             "name",
@@ -1024,27 +1106,21 @@ class ProductVariantAsProductSerializer(serializers.ModelSerializer):
         return None
 
     def get_reviews_count(self, obj):
-        return ProductReview.objects.filter(product=obj.product).count()
+        return _reviews_count(obj.product)
 
     def get_average_rating(self, obj):
-        return (
-            ProductReview.objects.filter(product=obj.product).aggregate(
-                avg_rating=models.Avg("rating")
-            )["avg_rating"]
-            or 0
-        )
+        return _average_rating(obj.product)
 
     def get_is_wishlist(self, obj):
-        request = self.context.get("request")
-        if not request:
-            return False
-        user = get_customer_from_request(request)
-        if not user:
-            return False
-        return Wishlist.objects.filter(user=user, product=obj.product).exists()
+        return _is_wishlist(obj.product, self.context.get("request"))
 
 
 class UnifiedProductListingSerializer(serializers.Serializer):
+    page_stats = True
+
+    class Meta:
+        list_serializer_class = ProductPageListSerializer
+
     def to_representation(self, instance):
         from .models import Product, ProductVariant
 
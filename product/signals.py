@@ -0,0 +1,112 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from sales_crm.response_cache import customer_scope, schedule_content_version_bump
+
+from .catalog import schedule_catalog_version_bump
+from .models import (
+    Category,
+    Offer,
+    PricingMetric,
+    Product,
+    ProductComposition,
+    ProductImage,
+    ProductOption,
+    ProductOptionValue,
+    ProductReview,
+    ProductVariant,
+    SubCategory,
+    Wishlist,
+)
+from .pricing import schedule_price_recompute
+
+# =====================================================
+# CATALOG AGGREGATE INVALIDATION
+# =====================================================
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_save, sender=ProductComposition)
+@receiver(post_delete, sender=ProductComposition)
+@receiver(post_save, sender=PricingMetric)
+@receiver(post_delete, sender=PricingMetric)
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_delete, sender=SubCategory)
+# Not aggregated, but part of the cached catalog responses.
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductOption)
+@receiver(post_delete, sender=ProductOption)
+@receiver(post_save, sender=ProductOptionValue)
+@receiver(post_delete, sender=ProductOptionValue)
+@receiver(post_save, sender=ProductReview)
+@receiver(post_delete, sender=ProductReview)
+def bump_catalog_version_on_change(sender, instance, **kwargs):
+    schedule_catalog_version_bump()
+
+
+@receiver(m2m_changed, sender=Offer.products.through)
+@receiver(m2m_changed, sender=Offer.categories.through)
+@receiver(m2m_changed, sender=Offer.sub_categories.through)
+@receiver(m2m_changed, sender=ProductVariant.option_values.through)
+def bump_catalog_version_on_m2m_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        schedule_catalog_version_bump()
+
+
+@receiver(post_save, sender=Wishlist)
+@receiver(post_delete, sender=Wishlist)
+def bump_customer_version_on_wishlist_change(sender, instance, **kwargs):
+    # Only that customer's cached responses show the wishlist flag.
+    if instance.user_id is not None:
+        schedule_content_version_bump(customer_scope(instance.user_id))
+
+
+# =====================================================
+# STORED PRICE RECOMPUTATION
+# =====================================================
+
+
+@receiver(post_save, sender=Product)
+def recompute_product_prices(sender, instance, **kwargs):
+    schedule_price_recompute([instance.pk])
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_save, sender=ProductComposition)
+@receiver(post_delete, sender=ProductComposition)
+def recompute_parent_product_prices(sender, instance, **kwargs):
+    schedule_price_recompute([instance.product_id])
+
+
+@receiver(post_save, sender=PricingMetric)
+def recompute_metric_product_prices(sender, instance, **kwargs):
+    product_ids = set(
+        ProductComposition.objects.filter(metric=instance).values_list(
+            "product_id", flat=True
+        )
+    )
+    if product_ids:
+        schedule_price_recompute(product_ids)
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+def recompute_prices_on_offer_change(sender, instance, **kwargs):
+    # The offer's old and new scope may both be affected.
+    schedule_price_recompute()
+
+
+@receiver(m2m_changed, sender=Offer.products.through)
+@receiver(m2m_changed, sender=Offer.categories.through)
+@receiver(m2m_changed, sender=Offer.sub_categories.through)
+def recompute_prices_on_offer_scope_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        schedule_price_recompute()
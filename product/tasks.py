@@ -0,0 +1,89 @@
+import logging
+
+from celery import shared_task
+from django.db import close_old_connections
+from django_tenants.utils import schema_context
+
+from tenants.jobs import run_per_tenant
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def recompute_prices_task(schema_name, product_ids=None):
+    """
+    Recompute stored prices for one tenant (every product when
+    ``product_ids`` is None) and reschedule its next offer flip.
+    """
+    from .pricing import recompute_prices, schedule_next_offer_flip
+
+    close_old_connections()
+    try:
+        with schema_context(schema_name):
+            written = recompute_prices(product_ids)
+            if product_ids is None:
+                schedule_next_offer_flip(schema_name)
+        return f"Updated {written} prices in {schema_name}."
+    finally:
+        close_old_connections()
+
+
+@shared_task
+def flush_price_recompute_task(schema_name):
+    """Recompute the products queued by pricing signals for one tenant."""
+    from .pricing import take_pending
+
+    product_ids = take_pending(schema_name)
+    if product_ids == []:
+        return f"Nothing queued for {schema_name}."
+    return recompute_prices_task(schema_name, product_ids)
+
+
+@shared_task
+def flip_offer_prices_task():
+    """
+    Recompute tenants whose offers started or ended since the last run.
+    """
+    from .pricing import take_due_offer_flips
+
+    due = take_due_offer_flips()
+    for schema_name in due:
+        recompute_prices_task.delay(schema_name)
+    return f"Queued offer price flips for {len(due)} tenant(s)."
+
+
+@shared_task
+def reconcile_product_prices():
+    """
+    Recompute every tenant's stored prices, catching changes no signal saw
+    (bulk updates, raw SQL, lost tasks), and rebuild the offer flip
+    schedule.
+    """
+    from .pricing import recompute_prices, schedule_next_offer_flip
+
+    def reconcile(schema_name, dry_run=False):
+        written = recompute_prices()
+        schedule_next_offer_flip(schema_name)
+        return written
+
+    close_old_connections()
+    try:
+        report = run_per_tenant(reconcile, name="reconcile_product_prices")
+        for result in report.failed:
+            logger.error(
+                f"Failed to reconcile prices for {result.schema_name}: {result.error}"
+            )
+        return (
+            f"Reconciled prices for {len(report.succeeded)} tenant(s), "
+            f"{len(report.failed)} failed."
+        )
+    finally:
+        close_old_connections()
+
+
+@shared_task
+def purge_import_reports_task():
+    """Delete bulk import error reports past their retention."""
+    from .bulk_import import purge_import_reports
+
+    return f"Deleted {purge_import_reports()} import report(s)."
@@ -1,3 +1,749 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, Storage
+from django.db import DatabaseError, connection
+from django.http import QueryDict
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django_tenants.test.cases import TenantTestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from customer.models import Customer
+
+from product import bulk_import, catalog, exports, facets, images
+from product.listing import SEARCH_ORDERING, listing_order_by
+from product.models import (
+    Category,
+    Offer,
+    PricingMetric,
+    Product,
+    ProductImage,
+    ProductReview,
+    ProductVariant,
+    Wishlist,
+)
+from product.offers import OfferIndex
+from product.pricing import _set_prices
+from product.serializers import ProductSmallSerializer
+
+
+class ListingOrderByTests(SimpleTestCase):
+    def test_default_is_newest_first(self):
+        self.assertEqual(
+            listing_order_by(None), ["-sort_created", "-row_kind", "-row_id"]
+        )
+
+    def test_price_ascending(self):
+        self.assertEqual(
+            listing_order_by("price"), ["sort_price", "row_kind", "row_id"]
+        )
+
+    def test_only_first_term_is_used(self):
+        self.assertEqual(listing_order_by("-average_rating,price")[0], "-sort_rating")
+
+    def test_unknown_field_falls_back_to_default(self):
+        self.assertEqual(listing_order_by("-stock"), listing_order_by(None))
+
+    def test_search_lists_most_relevant_first_unless_ordered(self):
+        self.assertEqual(listing_order_by(None, SEARCH_ORDERING)[0], "-sort_rank")
+        self.assertEqual(listing_order_by("price", SEARCH_ORDERING)[0], "sort_price")
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class CatalogAggregateCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = patch.object(catalog, "connection", SimpleNamespace(schema_name="t1"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cached_until_version_bump(self):
+        compute = Mock(side_effect=[1, 2])
+
+        self.assertEqual(catalog.cached_aggregate("answer", compute), 1)
+        self.assertEqual(catalog.cached_aggregate("answer", compute), 1)
+        catalog.bump_catalog_version("t1")
+        self.assertEqual(catalog.cached_aggregate("answer", compute), 2)
+        self.assertEqual(compute.call_count, 2)
+
+    def test_versions_are_per_tenant(self):
+        before = catalog.get_catalog_version("t2")
+        catalog.bump_catalog_version("t1")
+        self.assertEqual(catalog.get_catalog_version("t2"), before)
+
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def fake_offer(pk, discount, categories=(), sub_categories=(), starts=-1, ends=1):
+    return SimpleNamespace(
+        pk=pk,
+        discount_value=Decimal(discount),
+        start_date=NOW + timedelta(days=starts),
+        end_date=NOW + timedelta(days=ends),
+        categories=SimpleNamespace(
+            all=lambda: [SimpleNamespace(pk=c) for c in categories]
+        ),
+        sub_categories=SimpleNamespace(
+            all=lambda: [SimpleNamespace(pk=s) for s in sub_categories]
+        ),
+    )
+
+
+class OfferIndexTests(SimpleTestCase):
+    def test_biggest_discount_across_product_category_and_sub_category(self):
+        direct = fake_offer(1, "5")
+        by_category = fake_offer(2, "20", categories=[10])
+        by_sub_category = fake_offer(3, "15", sub_categories=[100])
+        index = OfferIndex([direct, by_category, by_sub_category], [(1, 7)])
+
+        self.assertIs(index.resolve(7, 10, 100, now=NOW), by_category)
+        self.assertIs(index.resolve(7, None, 100, now=NOW), by_sub_category)
+        self.assertIs(index.resolve(7, now=NOW), direct)
+        self.assertIsNone(index.resolve(8, now=NOW))
+
+    def test_tie_goes_to_oldest_offer(self):
+        newer = fake_offer(9, "10", categories=[10])
+        older = fake_offer(4, "10", categories=[10])
+        index = OfferIndex([newer, older], [])
+
+        self.assertIs(index.resolve(1, 10, now=NOW), older)
+
+    def test_offers_outside_their_window_are_ignored(self):
+        upcoming = fake_offer(1, "50", categories=[10], starts=1, ends=2)
+        ended = fake_offer(2, "40", categories=[10], starts=-2, ends=-1)
+        live = fake_offer(3, "5", categories=[10])
+        index = OfferIndex([upcoming, ended, live], [])
+
+        self.assertIs(index.resolve(1, 10, now=NOW), live)
+        later = NOW + timedelta(days=1, hours=1)
+        self.assertIs(index.resolve(1, 10, now=later), upcoming)
+
+
+def fake_priced(final=None, discounted=None, offer_id=None):
+    return SimpleNamespace(
+        stored_final_price=final,
+        stored_discounted_price=discounted,
+        applied_offer_id=offer_id,
+    )
+
+
+class StoredPriceTests(SimpleTestCase):
+    def test_offer_discount_is_stored_rounded(self):
+        offer = Offer(pk=3, offer_type="percentage", discount_value=Decimal("15"))
+        obj = fake_priced()
+
+        self.assertTrue(_set_prices(obj, Decimal("99.99"), offer))
+        self.assertEqual(obj.stored_final_price, Decimal("99.99"))
+        self.assertEqual(obj.stored_discounted_price, Decimal("84.99"))
+        self.assertEqual(obj.applied_offer_id, 3)
+
+    def test_unchanged_prices_are_not_rewritten(self):
+        obj = fake_priced(Decimal("10.00"))
+
+        self.assertFalse(_set_prices(obj, Decimal("10"), None))
+
+    def test_variant_with_its_own_fixed_price_is_stored_on_save(self):
+        fixed = Product(price=Decimal("10"), use_dynamic_pricing=False)
+        dynamic = Product(price=Decimal("10"), use_dynamic_pricing=True)
+        variants = [
+            ProductVariant(product=fixed, price=Decimal("8")),
+            ProductVariant(product=fixed, price=None),
+            ProductVariant(product=dynamic, price=Decimal("8")),
+        ]
+
+        with patch("django.db.models.Model.save"):
+            for variant in variants:
+                variant.save()
+
+        self.assertEqual(
+            [v.stored_final_price for v in variants], [Decimal("8"), None, None]
+        )
+
+
+class FacetTests(SimpleTestCase):
+    def compute(self, rows):
+        cursor = Mock()
+        cursor.fetchall.return_value = rows
+        connection = Mock()
+        connection.cursor.return_value.__enter__ = Mock(return_value=cursor)
+        connection.cursor.return_value.__exit__ = Mock(return_value=False)
+        with patch.object(facets, "connection", connection), patch.object(
+            facets, "_facet_sql", return_value=("", [])
+        ):
+            return facets.compute_facets(None)
+
+    def test_grouping_set_rows_are_split_per_facet(self):
+        none = [None, None, 1, None, None, 1, None, 1, None, 1, None, None, 1]
+        category = ["rings", "Rings", 0] + none[3:]
+        price = none[:6] + [1, 0] + none[8:]
+        rating_4 = none[:8] + [4.0, 0] + none[10:]
+        rating_2 = none[:8] + [2.0, 0] + none[10:]
+        offer = none[:10] + ["dashain", "Dashain Sale", 0]
+        result = self.compute(
+            [
+                none + [9],
+                category + [5],
+                price + [3],
+                rating_4 + [2],
+                rating_2 + [4],
+                offer + [6],
+            ]
+        )
+
+        self.assertEqual(result["total"], 9)
+        self.assertEqual(
+            result["categories"], [{"slug": "rings", "name": "Rings", "count": 5}]
+        )
+        self.assertEqual(
+            result["price_ranges"], [{"min": 500, "max": 1000, "count": 3}]
+        )
+        self.assertEqual(result["ratings"][0], {"min_rating": 4, "count": 2})
+        self.assertEqual(result["ratings"][2], {"min_rating": 2, "count": 6})
+        self.assertEqual(result["on_offer"], 6)
+
+    def test_digest_ignores_paging_and_ordering(self):
+        self.assertEqual(
+            facets.filter_digest(QueryDict("category=rings&page=2&ordering=price")),
+            facets.filter_digest(QueryDict("category=rings")),
+        )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ProductPageQueryCountTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = "Query count"
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Asha",
+            last_name="Rai",
+            email="asha@example.com",
+            password="secret123",
+            phone="9800000000",
+        )
+        category = Category.objects.create(name="Rings", slug="rings")
+        for i in range(12):
+            product = Product.objects.create(
+                name=f"Ring {i}", price=Decimal("100.00"), category=category
+            )
+            if i % 2:
+                Wishlist.objects.create(user=self.customer, product=product)
+                ProductReview.objects.create(
+                    product=product, user=self.customer, rating=4
+                )
+
+    def render(self, size):
+        token = RefreshToken.for_user(self.customer)
+        token["user_id"] = self.customer.id
+        request = Request(
+            APIRequestFactory().get(
+                "/", HTTP_AUTHORIZATION=f"Bearer {token.access_token}"
+            )
+        )
+        products = (
+            Product.objects.select_related("category", "sub_category")
+            .prefetch_related("variants__option_values__option")
+            .order_by("pk")[:size]
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            data = ProductSmallSerializer(
+                products, many=True, context={"request": request}
+            ).data
+        return data, len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.render(1)  # builds the tenant's offer index
+        small, small_queries = self.render(3)
+        large, large_queries = self.render(12)
+
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(
+            [item["is_wishlist"] for item in large], [bool(i % 2) for i in range(12)]
+        )
+        self.assertEqual(large[1]["reviews_count"], 1)
+        self.assertEqual(large[1]["average_rating"], 4)
+
+
+def option_value(option_id, value):
+    return {
+        "productoptionvalue__option_id": option_id,
+        "productoptionvalue__value": value,
+    }
+
+
+class ProductExportRowTests(SimpleTestCase):
+    PRODUCT = dict.fromkeys(exports.PRODUCT_FIELDS) | {
+        "name": "Ring",
+        "price": Decimal("10.00"),
+        "meta_title": "Ring",
+    }
+
+    def test_extra_rows_carry_later_variants(self):
+        options = [{"id": 1, "name": "Size"}]
+        variants = [
+            {"id": 10, "price": Decimal("5"), "stock": 1, "image": None},
+            {"id": 11, "price": None, "stock": 2, "image": None},
+        ]
+        values = {10: [option_value(1, "S")], 11: [option_value(1, "M")]}
+
+        first, second = exports._product_rows(
+            self.PRODUCT, [], options, variants, values
+        )
+
+        self.assertEqual(len(first), len(exports.EXPORT_HEADERS))
+        self.assertEqual((first[0], first[2], first[-2]), ("Ring", 10.0, "Ring"))
+        self.assertEqual(first[19:21], ["Size", "S"])
+        self.assertEqual(second[0], "")
+        self.assertEqual(second[20], "M")
+        self.assertEqual(second[25:27], [0.0, 2])
+
+    def test_product_without_variants_is_one_row(self):
+        rows = list(exports._product_rows(self.PRODUCT, [], [], [], {}))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][25], "")
+
+
+NAN = float("nan")
+IMPORT_COLUMNS = [
+    "name",
+    "price",
+    "status",
+    "category",
+    "option1 name",
+    "option1 values",
+    "variant price",
+    "variant stock",
+]
+
+
+def sheet_row(**values):
+    record = dict.fromkeys(IMPORT_COLUMNS, NAN)
+    record.update({key.replace("_", " "): value for key, value in values.items()})
+    return record
+
+
+class BulkImportTests(SimpleTestCase):
+    def importer(self):
+        with patch.object(PricingMetric.objects, "only", return_value=[]):
+            importer = bulk_import.ProductImporter(dry_run=True)
+        importer.options = bulk_import.option_columns(IMPORT_COLUMNS)
+        return importer
+
+    def validate(self, records, existing=()):
+        importer = self.importer()
+        groups = bulk_import.group_rows(records, importer.report)
+        with (
+            patch.object(Product.objects, "filter") as products,
+            patch.object(bulk_import, "_by_lower_name", return_value={}),
+        ):
+            products.return_value.values_list.return_value = list(existing)
+            importer.import_chunk(groups)
+        return importer.report
+
+    def test_images_are_uploaded_before_the_write_transaction(self):
+        importer = self.importer()
+        importer.dry_run = False
+        importer.uploads = Mock()
+        calls = []
+        atomic = MagicMock()
+        atomic.return_value.__enter__.side_effect = lambda: calls.append("begin")
+        groups = bulk_import.group_rows(
+            [sheet_row(name="Ring", price=10)], importer.report
+        )
+
+        with (
+            patch.object(Product.objects, "filter") as products,
+            patch.object(bulk_import, "_by_lower_name", return_value={}),
+            patch.object(bulk_import.transaction, "atomic", atomic),
+            patch.object(importer, "upload", side_effect=lambda p: calls.append("up")),
+            patch.object(importer, "write", side_effect=DatabaseError("deadlock")),
+        ):
+            products.return_value.values_list.return_value = []
+            importer.import_chunk(groups)
+
+        self.assertEqual(calls, ["up", "begin"])
+        importer.uploads.discard.assert_called_once_with()
+        self.assertEqual(importer.report.products, 0)
+        self.assertEqual(importer.report.errors[-1].message, "Not imported: deadlock")
+
+    def test_rows_without_a_name_belong_to_the_product_above(self):
+        report = bulk_import.ImportReport()
+        groups = bulk_import.group_rows(
+            [
+                sheet_row(variant_price=1),
+                sheet_row(name="Ring", price=10),
+                sheet_row(variant_price=5),
+                dict.fromkeys(IMPORT_COLUMNS, NAN),
+                sheet_row(name="Chain", price=20),
+            ],
+            report,
+        )
+
+        self.assertEqual(
+            [(g.name, [row for row, _ in g.lines]) for g in groups],
+            [("Ring", [3, 4]), ("Chain", [6])],
+        )
+        self.assertEqual([issue.row for issue in report.errors], [2])
+
+    def test_variants_and_option_values(self):
+        importer = self.importer()
+        (group,) = bulk_import.group_rows(
+            [
+                sheet_row(
+                    name="Ring",
+                    price=10,
+                    status="Active",
+                    option1_name="Size",
+                    option1_values="S",
+                    variant_price=8,
+                ),
+                sheet_row(option1_values="M", variant_stock=3),
+            ],
+            importer.report,
+        )
+
+        plan = importer.plan(group, {}, {})
+
+        self.assertEqual(plan.product.status, "active")
+        self.assertEqual(plan.options, {1: "Size"})
+        self.assertEqual(plan.option_values, {1: {"S", "M"}})
+        self.assertEqual(
+            [(v.variant.price, v.variant.stock) for v in plan.variants],
+            [(Decimal("8"), 0), (Decimal("10"), 3)],
+        )
+
+    def test_invalid_rows_are_reported_not_imported(self):
+        report = self.validate([
+            sheet_row(name="Ring", price=10, category="Rings"),
+            sheet_row(variant_price="abc"),
+            sheet_row(name="Bad", price="x"),
+            sheet_row(name="Chain", price=20),
+            sheet_row(name="Ring", price=30),
+        ], existing=["Chain"])
+
+        self.assertEqual((report.products, report.variants, report.skipped), (1, 0, 3))
+        self.assertEqual(
+            [(issue.row, issue.level) for issue in report.issues],
+            [(2, "warning"), (3, "error"), (4, "error"), (5, "error"), (6, "error")],
+        )
+
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def zip_archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+class SlowStorage(Storage):
+    """Reads what it is given in chunks, as a network upload would."""
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self.saved = {}
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def exists(self, name):
+        return name in self.saved
+
+    def delete(self, name):
+        del self.saved[name]
+
+    def _save(self, name, content):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            size = sum(len(chunk) for chunk in content.chunks())
+            time.sleep(self.latency)
+        finally:
+            with self.lock:
+                self.active -= 1
+        with self.lock:
+            self.saved[name] = size
+        return name
+
+
+class ZipImagesTests(SimpleTestCase):
+    def test_members_are_checked_by_content_not_name(self):
+        archive = images.ZipImages(
+            zip_archive([
+                ("photos/ring.jpg", PNG + b"rest"),
+                ("notes.png", b"plain text"),
+                ("big.png", PNG + bytes(2048)),
+                ("__MACOSX/._ring.jpg", b""),
+            ]),
+            max_image_size=1024,
+        )
+
+        self.assertEqual(archive.find("C:\\photos\\ring.jpg"), "ring.jpg")
+        self.assertIsNone(archive.find("notes.png"))
+        self.assertEqual(set(archive.rejected), {"notes.png", "big.png"})
+        self.assertIn("not a PNG", archive.rejection("notes.png"))
+        with archive.open("ring.jpg") as member:
+            self.assertEqual(member.read(), PNG + b"rest")
+
+    def test_limits_apply_to_the_whole_archive(self):
+        members = [(f"{i}.png", PNG) for i in range(3)]
+        with self.assertRaises(images.ZipImageError):
+            images.ZipImages(zip_archive(members), max_images=2)
+        with self.assertRaises(images.ZipImageError):
+            images.ZipImages(zip_archive(members), max_total_size=len(PNG) * 2)
+        with self.assertRaises(images.ZipImageError):
+            images.ZipImages(io.BytesIO(b"not a zip"))
+
+
+class ImageUploaderTests(SimpleTestCase):
+    def upload(self, archive, names, storage, workers):
+        field = ProductImage._meta.get_field("image")
+        with patch.object(field, "storage", storage):
+            targets = [ProductImage() for _ in names]
+            with images.ImageUploader(max_workers=workers) as uploads:
+                for target, name in zip(targets, names):
+                    uploads.add(
+                        target.image,
+                        ("zip", name),
+                        lambda name=name: (name, archive.open(name)),
+                    )
+                failed = uploads.wait()
+        return targets, failed
+
+    def test_uploads_overlap_and_repeats_are_uploaded_once(self):
+        names = [f"{i}.png" for i in range(16)]
+        archive = images.ZipImages(zip_archive([(n, PNG + n.encode()) for n in names]))
+        storage = SlowStorage(latency=0.05)
+
+        targets, failed = self.upload(archive, names + names[:4], storage, 8)
+
+        self.assertEqual(failed, [])
+        self.assertEqual(len(storage.saved), 16)
+        self.assertEqual(targets[0].image.name, targets[16].image.name)
+        self.assertGreater(storage.max_active, 1)
+
+    def test_discarded_files_are_deleted_and_stored_again(self):
+        archive = images.ZipImages(
+            zip_archive([("a.png", PNG), ("b.png", PNG), ("c.png", PNG + b"c")])
+        )
+        storage = SlowStorage()
+        field = ProductImage._meta.get_field("image")
+
+        def add(uploads, target, name):
+            uploads.add(
+                target.image, ("zip", name), lambda: (name, archive.open(name))
+            )
+            uploads.wait()
+
+        with (
+            patch.object(field, "storage", storage),
+            images.ImageUploader() as uploads,
+        ):
+            kept, discarded, again = ProductImage(), ProductImage(), ProductImage()
+            add(uploads, kept, "a.png")
+            uploads.keep()
+
+            # b.png has a.png's content, which stays referenced.
+            add(uploads, discarded, "b.png")
+            add(uploads, discarded, "c.png")
+            uploads.discard()
+            self.assertEqual(set(storage.saved), {kept.image.name})
+
+            add(uploads, again, "c.png")
+            self.assertEqual(len(storage.saved), 2)
+            self.assertIn(again.image.name, storage.saved)
+
+    def test_large_archive_is_read_in_bounded_memory(self):
+        names = [f"{i}.png" for i in range(64)]
+        members = [(name, PNG + name.encode() + bytes(1024 * 1024)) for name in names]
+        buffer = zip_archive(members)
+        storage = SlowStorage()
+
+        tracemalloc.start()
+        try:
+            archive = images.ZipImages(buffer)
+            self.upload(archive, names, storage, 4)
+            archive.close()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(
+            sum(storage.saved.values()), sum(len(member) for _, member in members)
+        )
+        # 64 MB of images; each worker holds at most one spooled member.
+        self.assertLess(peak, 12 * 1024 * 1024)
+
+
+class ImageRequestHandler(BaseHTTPRequestHandler):
+    bodies = {
+        "/page.html": b"<html></html>",
+        "/big.png": PNG + bytes(4096),
+        "/other.png": PNG + b"other",
+    }
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] += 1
+            hits = server.hits[self.path]
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if self.path.startswith("/slow/"):
+                time.sleep(0.05)
+            if self.path == "/missing.png" or (self.path == "/flaky.png" and hits == 1):
+                self.respond(404 if self.path == "/missing.png" else 503, b"")
+            else:
+                self.respond(200, self.bodies.get(self.path, PNG + b"image"))
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def respond(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ImageServer(ThreadingHTTPServer):
+    """Stands in for the hosts bulk uploads reference images on."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ImageRequestHandler)
+        self.lock = threading.Lock()
+        self.hits = Counter()
+        self.active = 0
+        self.max_active = 0
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+
+class ImageFetcherTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ImageServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.fetcher = images.ImageFetcher(max_size=1024)
+        self.addCleanup(self.fetcher.close)
+
+    def fetch(self, path):
+        filename, content = self.fetcher.fetch(self.server.url(path))
+        with content:
+            return filename, content.read()
+
+    def test_fetch_retries_and_checks_what_it_gets(self):
+        self.assertEqual(self.fetch("/photos/ring.jpeg"), ("ring.png", PNG + b"image"))
+        self.assertEqual(self.fetch("/flaky.png"), ("flaky.png", PNG + b"image"))
+        self.assertEqual(self.server.hits["/flaky.png"], 2)
+
+        with self.assertRaisesMessage(images.ImageFetchError, "larger than"):
+            self.fetch("/big.png")
+        with self.assertRaisesMessage(images.ImageFetchError, "not a PNG"):
+            self.fetch("/page.html")
+        for _ in range(2):
+            with self.assertRaisesMessage(images.ImageFetchError, "404"):
+                self.fetch("/missing.png")
+        self.assertEqual(self.server.hits["/missing.png"], 1)
+
+    def test_requests_to_a_host_are_limited(self):
+        fetcher = images.ImageFetcher(max_per_host=2)
+        self.addCleanup(fetcher.close)
+        urls = [self.server.url(f"/slow/{i}.png") for i in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for _, content in pool.map(fetcher.fetch, urls):
+                content.close()
+
+        self.assertEqual(sum(self.server.hits.values()), 8)
+        self.assertEqual(self.server.max_active, 2)
+
+    def test_images_are_fetched_and_stored_once(self):
+        paths = ["/a.png"] * 5 + ["/copy.png"] * 3 + ["/other.png", "/missing.png"]
+        storage = SlowStorage()
+        field = ProductImage._meta.get_field("image")
+        with patch.object(field, "storage", storage):
+            targets = [ProductImage() for _ in paths]
+            with images.ImageUploader() as uploads:
+                for target, path in zip(targets, paths):
+                    url = self.server.url(path)
+                    uploads.add(
+                        target.image,
+                        ("url", url),
+                        lambda url=url: self.fetcher.fetch(url),
+                        context=path,
+                    )
+                failed = uploads.wait()
+
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(failed[0][0], "/missing.png")
+        self.assertEqual(self.server.hits["/a.png"], 1)
+        self.assertEqual(self.server.hits["/copy.png"], 1)
+        # /a.png and /copy.png serve the same bytes.
+        self.assertEqual(len(storage.saved), 2)
+        self.assertEqual({t.image.name for t in targets[:8]}, {targets[0].image.name})
+
+    def test_one_url_for_two_fields_is_fetched_and_stored_once(self):
+        # Each field builds its own storage; both write to the same place.
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        url = self.server.url("/a.png")
+        product, image = Product(), ProductImage()
+        with (
+            patch.object(
+                Product._meta.get_field("thumbnail_image"),
+                "storage",
+                FileSystemStorage(location=folder.name),
+            ),
+            patch.object(
+                ProductImage._meta.get_field("image"),
+                "storage",
+                FileSystemStorage(location=folder.name),
+            ),
+            images.ImageUploader() as uploads,
+        ):
+            for field_file in (product.thumbnail_image, image.image):
+                uploads.add(field_file, ("url", url), lambda: self.fetcher.fetch(url))
+            failed = uploads.wait()
+
+        self.assertEqual(failed, [])
+        self.assertEqual(self.server.hits["/a.png"], 1)
+        self.assertEqual(product.thumbnail_image.name, image.image.name)
+        stored = [files for _, _, files in os.walk(folder.name) if files]
+        self.assertEqual(stored, [["a.png"]])
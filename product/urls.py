@@ -16,6 +16,7 @@ from .views import (
     ProductCompositionRetrieveUpdateDestroyView,
     ProductDeleteView,
     ProductExcelExportView,
+    ProductFacetsView,
     ProductImageListCreateView,
     ProductImageRetrieveUpdateDestroyView,
     ProductListCreateView,
@@ -33,6 +34,7 @@ from .views import (
 
 urlpatterns = [
     path("product/", ProductListCreateView.as_view(), name="product-list-create"),
+    path("product/facets/", ProductFacetsView.as_view(), name="product-facets"),
     path("product/<int:pk>/delete", ProductDeleteView.as_view(), name="product-delete"),
     path(
         "offer-products/",
@@ -1,27 +1,12 @@
 import io
-import re
-from itertools import chain
 
 import pandas as pd
-from django.db.models import (
-    Avg,
-    Case,
-    DecimalField,
-    ExpressionWrapper,
-    F,
-    Max,
-    OuterRef,
-    Prefetch,
-    Subquery,
-    Sum,
-    When,
-)
+from django.db.models import Avg, Prefetch
 from django.http import FileResponse
 from django_filters import rest_framework as django_filters
 from openpyxl import Workbook
 from openpyxl.worksheet.datavalidation import DataValidation
 from rest_framework import filters, generics, permissions, serializers, status
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -29,6 +14,9 @@ from rest_framework.views import APIView
 from customer.authentication import CustomerJWTAuthentication
 from customer.utils import get_customer_from_request
 from sales_crm.authentication import TenantJWTAuthentication
+from sales_crm.exports import export_format, export_response
+from sales_crm.pagination import KeysetPagination
+from sales_crm.response_cache import CachedResponseMixin, ConditionalGetMixin
 from website.models import SiteConfig
 
 from .models import (
@@ -63,71 +51,45 @@ from .serializers import (
     UnifiedProductListingSerializer,
     WishlistSerializer,
 )
-from .utils import (
-    download_image_from_url,
-    extract_images_from_zip,
-    process_image_field,
-    safe_value,
-)
+from .bulk_import import ProductImporter, save_import_report
+from .catalog import catalog_aggregates, offer_price_range
+from .exports import EXPORT_COLUMN_WIDTHS, EXPORT_HEADERS, product_export_rows
+from .facets import product_facets
+from .listing import FINAL_PRICE_ANNOTATION, UnifiedListing
+from .search import ProductSearchFilter
+from .images import ZipImages
 
 
-class CustomPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = "page_size"
-    max_page_size = 100
+# Storefront responses change with the catalog and with SiteConfig.
+CATALOG_CACHE_SCOPES = ("catalog", "website")
 
 
-class ProductPagination(CustomPagination):
+class ProductPagination(KeysetPagination):
+    """
+    Adds the catalog price range for the price slider. Views set
+    ``min_price`` / ``max_price`` from the cached catalog aggregates, so a
+    page request never aggregates over the whole product table.
+    """
+
     def get_paginated_response(self, data):
         from collections import OrderedDict
 
+        fields = [
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+        ]
+        if self.keyset is None:
+            fields.insert(0, ("count", self.page.paginator.count))
         return Response(
             OrderedDict([
-                ("count", self.page.paginator.count),
-                ("next", self.get_next_link()),
-                ("previous", self.get_previous_link()),
+                *fields,
+                ("min_price", getattr(self, "min_price", 0.0)),
                 ("max_price", getattr(self, "max_price", 0.0)),
                 ("results", data),
             ])
         )
 
 
-# ─── final_price annotation helpers ──────────────────────────────────────────
-#
-# Mirrors the Product.final_price model property at the DB level so we can
-# ORDER BY it and compute a correct max_price for the price-range slider.
-#
-#   use_dynamic_pricing=True  → SUM(metric.price_per_unit × composition.quantity)
-#   use_dynamic_pricing=False → product.price
-
-_dynamic_price_sq = (
-    ProductComposition.objects
-    .filter(product=OuterRef("pk"))
-    .values("product")
-    .annotate(
-        total=Sum(
-            ExpressionWrapper(
-                F("metric__price_per_unit") * F("quantity"),
-                output_field=DecimalField(max_digits=20, decimal_places=2),
-            )
-        )
-    )
-    .values("total")[:1]
-)
-
-FINAL_PRICE_ANNOTATION = Case(
-    When(
-        use_dynamic_pricing=True,
-        then=Subquery(
-            _dynamic_price_sq,
-            output_field=DecimalField(max_digits=20, decimal_places=2),
-        ),
-    ),
-    default=F("price"),
-    output_field=DecimalField(max_digits=20, decimal_places=2),
-)
-
-
 # ─── Shared optimized queryset ────────────────────────────────────────────────
 
 PRODUCT_LIST_QS = (
@@ -293,19 +255,108 @@ PRODUCT_VARIANT_QS = (
     )
 )
 
+# Products without variants, as listed next to variants in variant mode.
+STANDALONE_PRODUCT_QS = (
+    Product.objects
+    .filter(variants__isnull=True)
+    .select_related("category", "sub_category")
+    .prefetch_related(
+        Prefetch(
+            "images",
+            queryset=ProductImage.objects.only("id", "product_id", "image"),
+        ),
+    )
+    .annotate(
+        average_rating=Avg("productreview__rating"),
+        computed_final_price=FINAL_PRICE_ANNOTATION,
+    )
+    .only(
+        "id",
+        "name",
+        "slug",
+        "price",
+        "market_price",
+        "stock",
+        "thumbnail_image",
+        "thumbnail_alt_description",
+        "category_id",
+        "sub_category_id",
+        "is_popular",
+        "is_featured",
+        "fast_shipping",
+        "warranty",
+        "use_dynamic_pricing",
+        "base_making_charge",
+        "created_at",
+        "updated_at",
+    )
+)
+
+
+def _strtobool(value):
+    # distutils.util.strtobool, which is gone from Python 3.12.
+    value = value.lower()
+    if value in ("y", "yes", "t", "true", "on", "1"):
+        return 1
+    if value in ("n", "no", "f", "false", "off", "0"):
+        return 0
+    raise ValueError(f"invalid truth value {value!r}")
+
+
+def unified_listing(view, request, q_var=None, q_prod=None):
+    """
+    Variant-mode catalog for ``view``: filtered variants plus standalone
+    products as one ``UnifiedListing``, ordered and paginated in SQL.
+    """
+    params = request.GET.copy()
+    if "is_popular" in params:
+        try:
+            params["is_popular"] = _strtobool(str(params["is_popular"]))
+        except ValueError:
+            params.pop("is_popular")
+
+    search_filter = ProductSearchFilter()
+
+    variant_qs = PRODUCT_VARIANT_QS
+    if q_var is not None:
+        variant_qs = variant_qs.filter(q_var)
+    variant_qs = ProductVariantFilterSet(params, queryset=variant_qs).qs
+    variant_qs = search_filter.filter_queryset(request, variant_qs, view)
+
+    product_qs = STANDALONE_PRODUCT_QS
+    if q_prod is not None:
+        product_qs = product_qs.filter(q_prod)
+    product_qs = ProductFilterSet(params, queryset=product_qs).qs
+    product_qs = search_filter.filter_queryset(request, product_qs, view)
+
+    return UnifiedListing(
+        variant_qs,
+        product_qs,
+        ordering=request.query_params.get("ordering"),
+        variant_queryset=PRODUCT_VARIANT_QS,
+        product_queryset=STANDALONE_PRODUCT_QS,
+        search=search_filter.get_search_text(request),
+    )
+
 
 # ─── Category ─────────────────────────────────────────────────────────────────
 
 
-class CategoryListCreateView(generics.ListCreateAPIView):
+class CategoryListCreateView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView
+):
+    cache_scopes = CATALOG_CACHE_SCOPES
     queryset = CATEGORY_QS
     serializer_class = CategorySerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     filter_backends = [filters.SearchFilter]
     search_fields = ["name"]
 
 
-class CategoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryRetrieveUpdateDestroyView(
+    ConditionalGetMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    cache_scopes = CATALOG_CACHE_SCOPES
     queryset = CATEGORY_QS
     serializer_class = CategorySerializer
     lookup_field = "slug"
@@ -324,10 +375,13 @@ class SubCategoryFilterSet(django_filters.FilterSet):
         fields = ["category"]
 
 
-class SubCategoryListCreateView(generics.ListCreateAPIView):
+class SubCategoryListCreateView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView
+):
+    cache_scopes = CATALOG_CACHE_SCOPES
     queryset = SUBCATEGORY_QS
     serializer_class = SubCategorySerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     filter_backends = [filters.SearchFilter, django_filters.DjangoFilterBackend]
     filterset_class = SubCategoryFilterSet
     search_fields = ["name"]
@@ -338,7 +392,10 @@ class SubCategoryListCreateView(generics.ListCreateAPIView):
         return SubCategoryDetailSerializer
 
 
-class SubCategoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class SubCategoryRetrieveUpdateDestroyView(
+    ConditionalGetMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    cache_scopes = CATALOG_CACHE_SCOPES
     queryset = SUBCATEGORY_QS
     serializer_class = SubCategorySerializer
     lookup_field = "slug"
@@ -384,8 +441,12 @@ class ProductFilterSet(django_filters.FilterSet):
     sub_category = django_filters.CharFilter(
         field_name="sub_category__slug", lookup_expr="iexact"
     )
-    min_price = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
-    max_price = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
+    min_price = django_filters.NumberFilter(
+        field_name="stored_final_price", lookup_expr="gte"
+    )
+    max_price = django_filters.NumberFilter(
+        field_name="stored_final_price", lookup_expr="lte"
+    )
     is_popular = django_filters.BooleanFilter(field_name="is_popular")
     is_featured = django_filters.BooleanFilter(field_name="is_featured")
     offer = django_filters.CharFilter(method="filter_by_offer")
@@ -478,8 +539,12 @@ class ProductFilterSet(django_filters.FilterSet):
 
 
 class ProductVariantFilterSet(django_filters.FilterSet):
-    min_price = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
-    max_price = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
+    min_price = django_filters.NumberFilter(
+        field_name="stored_final_price", lookup_expr="gte"
+    )
+    max_price = django_filters.NumberFilter(
+        field_name="stored_final_price", lookup_expr="lte"
+    )
     category = django_filters.CharFilter(field_name="product__category__slug")
     sub_category = django_filters.CharFilter(field_name="product__sub_category__slug")
     status = django_filters.ChoiceFilter(
@@ -576,18 +641,21 @@ class ProductVariantFilterSet(django_filters.FilterSet):
 # ─── Product ──────────────────────────────────────────────────────────────────
 
 
-class ProductListCreateView(generics.ListCreateAPIView):
+class ProductListCreateView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView
+):
+    cache_scopes = CATALOG_CACHE_SCOPES
+    cache_per_customer = True
     queryset = PRODUCT_LIST_QS
     serializer_class = ProductSerializer
     pagination_class = ProductPagination
     filter_backends = [
         django_filters.DjangoFilterBackend,
-        filters.SearchFilter,
+        ProductSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_class = ProductFilterSet
     ordering_fields = ["created_at", "price", "is_popular", "average_rating"]
-    search_fields = ["name"]
 
     def get_authenticators(self):
         if self.request.method == "POST":
@@ -628,22 +696,18 @@ class ProductListCreateView(generics.ListCreateAPIView):
     def list(self, request, *args, **kwargs):
         site_config = SiteConfig.get_solo()
 
+        # Global price range across the whole catalog using real final
+        # prices, unaffected by filters or pagination (cached per tenant)
+        aggregates = catalog_aggregates(site_config.use_product_variant)
+
         if not site_config.use_product_variant:
             queryset = self.filter_queryset(self.get_queryset())
 
-            # Global max_price across ALL products using real final prices,
-            # unaffected by filters or pagination
-            max_price = float(
-                Product.objects.annotate(
-                    computed_final_price=FINAL_PRICE_ANNOTATION
-                ).aggregate(m=Max("computed_final_price"))["m"]
-                or 0.0
-            )
-
             page = self.paginate_queryset(queryset)
             if page is not None:
                 if self.paginator is not None:
-                    self.paginator.max_price = max_price
+                    self.paginator.min_price = aggregates["min_price"]
+                    self.paginator.max_price = aggregates["max_price"]
                 serializer = self.get_serializer(page, many=True)
                 return self.get_paginated_response(serializer.data)
 
@@ -651,153 +715,50 @@ class ProductListCreateView(generics.ListCreateAPIView):
             return Response(serializer.data)
 
         # ── variant mode ────────────────────────────────────────────────────────
+        # Variants and standalone products are combined with UNION ALL, so
+        # ordering and pagination happen in SQL and only one page is loaded.
         self.filter_backends = []
-
-        params = request.GET.copy()
-
-        from distutils.util import strtobool
-
-        if "is_popular" in params:
-            try:
-                params["is_popular"] = strtobool(str(params["is_popular"]))
-            except ValueError:
-                params.pop("is_popular")
-
-        variant_qs = PRODUCT_VARIANT_QS
-        variant_filter = ProductVariantFilterSet(params, queryset=variant_qs)
-        variant_qs = variant_filter.qs
-
-        search_filter = filters.SearchFilter()
-        ordering_filter = filters.OrderingFilter()
-
-        orig_search_fields = self.search_fields
-        self.search_fields = ["product__name", "option_values__value"]
-
-        variant_qs = search_filter.filter_queryset(request, variant_qs, self)
-        variant_qs = ordering_filter.filter_queryset(request, variant_qs, self)
-
-        self.search_fields = orig_search_fields
-
-        product_qs = (
-            Product.objects
-            .filter(variants__isnull=True)
-            .select_related("category", "sub_category")
-            .prefetch_related(
-                Prefetch(
-                    "images",
-                    queryset=ProductImage.objects.only("id", "product_id", "image"),
-                ),
-            )
-            .annotate(
-                average_rating=Avg("productreview__rating"),
-                computed_final_price=FINAL_PRICE_ANNOTATION,
-            )
-            .only(
-                "id",
-                "name",
-                "slug",
-                "price",
-                "market_price",
-                "stock",
-                "thumbnail_image",
-                "thumbnail_alt_description",
-                "category_id",
-                "sub_category_id",
-                "is_popular",
-                "is_featured",
-                "fast_shipping",
-                "warranty",
-                "use_dynamic_pricing",
-                "base_making_charge",
-                "created_at",
-                "updated_at",
-            )
-        )
-
-        product_filter = ProductFilterSet(params, queryset=product_qs)
-        product_qs = product_filter.qs
-        product_qs = search_filter.filter_queryset(request, product_qs, self)
-        product_qs = ordering_filter.filter_queryset(request, product_qs, self)
-
-        # ── ordering-aware Python sort for the combined list ──────────────────
-        ordering = request.query_params.get("ordering", "-created_at")
-        sort_field = ordering.lstrip("-")
-        sort_reverse = ordering.startswith("-")
-
-        def _sort_key(obj):
-            if sort_field == "price":
-                if isinstance(obj, ProductVariant):
-                    # Variants use their own price (no dynamic pricing on variants)
-                    return float(obj.price or 0)
-                # Products: use the annotated computed_final_price if available,
-                # otherwise fall back to the model property
-                if (
-                    hasattr(obj, "computed_final_price")
-                    and obj.computed_final_price is not None
-                ):
-                    return float(obj.computed_final_price)
-                return float(obj.final_price or 0)
-            if sort_field == "average_rating":
-                return float(getattr(obj, "average_rating", None) or 0)
-            if sort_field == "is_popular":
-                val = getattr(obj, "is_popular", False)
-                if isinstance(obj, ProductVariant):
-                    val = getattr(obj.product, "is_popular", False)
-                return 0 if val else 1  # True sorts first when reverse=True
-            # Default / created_at
-            return getattr(obj, "created_at", None) or 0
-
-        combined = sorted(
-            chain(variant_qs, product_qs),
-            key=_sort_key,
-            reverse=sort_reverse,
-        )
-
-        # Global max_price across ALL variants and ALL standalone products,
-        # unaffected by filters or pagination
-        variant_max = float(
-            ProductVariant.objects.aggregate(m=Max("price"))["m"] or 0.0
-        )
-        standalone_product_max = float(
-            Product.objects
-            .filter(variants__isnull=True)
-            .annotate(computed_final_price=FINAL_PRICE_ANNOTATION)
-            .aggregate(m=Max("computed_final_price"))["m"]
-            or 0.0
-        )
-        # Also account for variants with no price, which fall back to product.price
-        fallback_max = float(
-            Product.objects.filter(
-                variants__isnull=False,
-                variants__price__isnull=True,
-            ).aggregate(m=Max("price"))["m"]
-            or 0.0
-        )
-        max_price = max(variant_max, standalone_product_max, fallback_max)
+        combined = unified_listing(self, request)
 
         page = self.paginate_queryset(combined)
         if page is not None:
             if self.paginator is not None:
-                self.paginator.max_price = max_price
+                self.paginator.min_price = aggregates["min_price"]
+                self.paginator.max_price = aggregates["max_price"]
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(combined, many=True)
+        serializer = self.get_serializer(list(combined), many=True)
         return Response(serializer.data)
 
 
+class ProductFacetsView(generics.GenericAPIView):
+    """
+    Facet counts (category, sub-category, price range, rating, offer) for
+    the products matching the same filters and ?search= as the product list.
+    """
+
+    queryset = Product.objects.all()
+    filter_backends = [django_filters.DjangoFilterBackend, ProductSearchFilter]
+    filterset_class = ProductFilterSet
+    authentication_classes = []
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(product_facets(queryset, request.query_params))
+
+
 class AdminProductListCreateView(generics.ListCreateAPIView):
     queryset = PRODUCT_LIST_QS
     serializer_class = ProductSerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     filter_backends = [
         django_filters.DjangoFilterBackend,
-        filters.SearchFilter,
+        ProductSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_class = ProductFilterSet
     ordering_fields = ["created_at", "price", "is_popular", "average_rating"]
-    search_fields = ["name"]
 
     def get_authenticators(self):
         if self.request.method == "POST":
@@ -828,7 +789,11 @@ class AdminProductListCreateView(generics.ListCreateAPIView):
         return queryset
 
 
-class ProductRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class ProductRetrieveUpdateDestroyView(
+    ConditionalGetMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    cache_scopes = CATALOG_CACHE_SCOPES
+    cache_per_customer = True
     queryset = PRODUCT_LIST_QS
     serializer_class = ProductSerializer
     lookup_field = "slug"
@@ -855,17 +820,20 @@ class ProductBarcodeRetrieveView(generics.RetrieveAPIView):
     lookup_field = "barcode"
 
 
-class RelatedProductList(generics.ListAPIView):
+class RelatedProductList(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView
+):
+    cache_scopes = CATALOG_CACHE_SCOPES
+    cache_per_customer = True
     queryset = PRODUCT_LIST_QS
     serializer_class = ProductSmallSerializer
     filter_backends = [
         django_filters.DjangoFilterBackend,
-        filters.SearchFilter,
+        ProductSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_class = ProductFilterSet
     ordering_fields = ["created_at", "price", "is_popular", "average_rating"]
-    search_fields = ["name"]
 
     def get_queryset(self):
         try:
@@ -884,7 +852,7 @@ class ProductExcelExportView(generics.ListAPIView):
     serializer_class = ProductSerializer
     filter_backends = [
         django_filters.DjangoFilterBackend,
-        filters.SearchFilter,
+        ProductSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_class = ProductFilterSet
@@ -893,180 +861,14 @@ class ProductExcelExportView(generics.ListAPIView):
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Products"
-
-        headers = [
-            "name",
-            "description",
-            "price",
-            "market_price",
-            "track_stock",
-            "stock",
-            "weight",
-            "thumbnail_image",
-            "thumbnail_image_aly_description",
-            "category",
-            "subcategory",
-            "is_popular",
-            "is_featured",
-            "status",
-            "use_dynamic_pricing",
-            "base_making_charge",
-            "require_custom_image",
-            "composition",
-            "quantity",
-            "option1 name",
-            "option1 values",
-            "option2 name",
-            "option2 values",
-            "option3 name",
-            "option3 values",
-            "variant price",
-            "variant stock",
-            "variant image",
-            "meta title",
-            "meta description",
-        ]
-
-        for col, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col, value=header)
-
-        current_row = 2
-        for product in queryset:
-            base_data = [
-                product.name,
-                product.description,
-                float(product.price) if product.price else 0.0,
-                float(product.market_price) if product.market_price else 0.0,
-                "TRUE" if product.track_stock else "FALSE",
-                product.stock,
-                product.weight,
-                product.thumbnail_image.url if product.thumbnail_image else "",
-                product.thumbnail_alt_description,
-                product.category.name if product.category else "",
-                product.sub_category.name if product.sub_category else "",
-                "TRUE" if product.is_popular else "FALSE",
-                "TRUE" if product.is_featured else "FALSE",
-                product.status,
-                "TRUE" if product.use_dynamic_pricing else "FALSE",
-                float(product.base_making_charge)
-                if product.base_making_charge
-                else 0.0,
-                "TRUE" if product.require_custom_image else "FALSE",
-            ]
-
-            compositions = list(product.compositions.all())
-            variants = list(product.variants.all())
-            options = list(product.productoption_set.all())
-
-            option_headers = ["", "", "", "", "", ""]
-            for i, opt in enumerate(options[:3]):
-                option_headers[i * 2] = opt.name
-
-            row_data = (
-                base_data
-                + ["", ""]
-                + option_headers
-                + ["", "", "", product.meta_title, product.meta_description]
-            )
-
-            if compositions:
-                comp = compositions[0]
-                row_data[17] = (
-                    f"{comp.metric.name} ({comp.metric.price_per_unit}/{comp.metric.unit})"
-                )
-                row_data[18] = float(comp.quantity)
-
-            if variants:
-                var = variants[0]
-                var_values = list(var.option_values.all())
-                for val in var_values:
-                    for i, opt in enumerate(options[:3]):
-                        if val.option_id == opt.id:
-                            row_data[20 + i * 2] = val.value
-                row_data[25] = float(var.price) if var.price else 0.0
-                row_data[26] = var.stock
-                row_data[27] = var.image.url if var.image else ""
-
-            for col, value in enumerate(row_data, 1):
-                ws.cell(row=current_row, column=col, value=value)
-            current_row += 1
-
-            max_remaining = max(len(compositions), len(variants))
-            for i in range(1, max_remaining):
-                extra_row = [""] * len(headers)
-                if i < len(compositions):
-                    comp = compositions[i]
-                    extra_row[17] = (
-                        f"{comp.metric.name} ({comp.metric.price_per_unit}/{comp.metric.unit})"
-                    )
-                    extra_row[18] = float(comp.quantity)
-
-                if i < len(variants):
-                    var = variants[i]
-                    var_values = list(var.option_values.all())
-                    for val in var_values:
-                        for j, opt in enumerate(options[:3]):
-                            if val.option_id == opt.id:
-                                extra_row[20 + j * 2] = val.value
-                    extra_row[25] = float(var.price) if var.price else 0.0
-                    extra_row[26] = var.stock
-                    extra_row[27] = var.image.url if var.image else ""
-
-                for col, value in enumerate(extra_row, 1):
-                    ws.cell(row=current_row, column=col, value=value)
-                current_row += 1
-
-        column_widths = {
-            "A": 15,
-            "B": 20,
-            "C": 10,
-            "D": 15,
-            "E": 12,
-            "F": 10,
-            "G": 10,
-            "H": 20,
-            "I": 20,
-            "J": 15,
-            "K": 25,
-            "L": 12,
-            "M": 12,
-            "N": 10,
-            "O": 20,
-            "P": 20,
-            "Q": 20,
-            "R": 30,
-            "S": 12,
-            "T": 15,
-            "U": 15,
-            "V": 15,
-            "W": 15,
-            "X": 15,
-            "Y": 15,
-            "Z": 15,
-            "AA": 15,
-            "AB": 20,
-            "AC": 20,
-            "AD": 25,
-        }
-        for col_let, width in column_widths.items():
-            ws.column_dimensions[col_let].width = width
-
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-
-        filename = (
-            f"products_export_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        )
-        return FileResponse(
-            buffer,
-            as_attachment=True,
-            filename=filename,
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename = f"products_export_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}"
+        return export_response(
+            export_format(request),
+            filename,
+            EXPORT_HEADERS,
+            product_export_rows(queryset),
+            title="Products",
+            column_widths=EXPORT_COLUMN_WIDTHS,
         )
 
 
@@ -1120,7 +922,7 @@ class ProductReviewFilter(django_filters.FilterSet):
 class ProductReviewView(generics.ListCreateAPIView):
     queryset = PRODUCT_REVIEW_QS
     serializer_class = ProductReviewSerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     filter_backends = [django_filters.DjangoFilterBackend]
     filterset_class = ProductReviewFilter
     authentication_classes = [CustomerJWTAuthentication]
@@ -1223,17 +1025,20 @@ class WishlistRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
 # ─── Product Variant ──────────────────────────────────────────────────────────
 
 
-class ProductVariantListCreateView(generics.ListCreateAPIView):
+class ProductVariantListCreateView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView
+):
+    cache_scopes = CATALOG_CACHE_SCOPES
+    cache_per_customer = True
     queryset = PRODUCT_VARIANT_QS
     serializer_class = ProductVariantAsProductSerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     filter_backends = [
         django_filters.DjangoFilterBackend,
-        filters.SearchFilter,
+        ProductSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_class = ProductVariantFilterSet
-    search_fields = ["product__name", "option_values__value"]
     ordering_fields = ["created_at", "price"]
 
     def get_authenticators(self):
@@ -1560,10 +1365,6 @@ class BulkProductUploadView(APIView):
         zip_file = serializer.validated_data.get("zip_file")
 
         try:
-            images_from_zip = {}
-            if zip_file:
-                images_from_zip = extract_images_from_zip(zip_file)
-
             if file.name.endswith(".csv"):
                 df = pd.read_csv(file)
             elif file.name.endswith((".xls", ".xlsx")):
@@ -1575,319 +1376,25 @@ class BulkProductUploadView(APIView):
                 )
 
             df.columns = [col.strip().lower() for col in df.columns]
+            # Indexed now, extracted member by member while importing.
+            archive = ZipImages(zip_file) if zip_file else None
         except Exception as e:
             return Response(
                 {"error": f"Invalid file: {str(e)}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        all_metrics = list(
-            PricingMetric.objects.only("id", "name", "price_per_unit", "unit")
+        importer = ProductImporter(
+            archive, dry_run=serializer.validated_data["dry_run"]
         )
-        metric_col_map = {
-            f"{m.name} ({m.price_per_unit}/{m.unit})".strip().lower(): m
-            for m in all_metrics
-        }
-
-        all_categories = {
-            c.name.lower(): c for c in Category.objects.only("id", "name")
-        }
-        all_subcategories = {
-            s.name.lower(): s for s in SubCategory.objects.only("id", "name")
-        }
-
-        created_products = {}
-        current_product = None
-        current_option_names = {}
-        product_options = {}
-        pending_compositions = {}
-
-        for idx, row in df.iterrows():
-            product_name = safe_value(row.get("name"))
-
-            if product_name:
-                if current_product and current_product.pk in pending_compositions:
-                    self._save_compositions(
-                        current_product, pending_compositions.pop(current_product.pk)
-                    )
-
-                if Product.objects.filter(name=product_name).exists():
-                    current_product = None
-                    current_option_names = {}
-                    continue
-
-                current_product_key = product_name
-
-                if current_product_key not in created_products:
-                    category_name = safe_value(row.get("category"))
-                    sub_category_name = safe_value(row.get("subcategory"))
-
-                    category = (
-                        all_categories.get(category_name.lower())
-                        if category_name
-                        else None
-                    )
-                    sub_category = (
-                        all_subcategories.get(sub_category_name.lower())
-                        if sub_category_name
-                        else None
-                    )
-
-                    raw_dynamic = safe_value(row.get("use_dynamic_pricing"), False)
-                    if isinstance(raw_dynamic, str):
-                        use_dynamic_pricing = raw_dynamic.strip().upper() == "TRUE"
-                    else:
-                        use_dynamic_pricing = bool(raw_dynamic)
-
-                    base_making_charge = safe_value(row.get("base_making_charge"), 0.00)
-                    try:
-                        base_making_charge = (
-                            float(base_making_charge)
-                            if base_making_charge is not None
-                            else 0.00
-                        )
-                    except (ValueError, TypeError):
-                        base_making_charge = 0.00
-
-                    raw_custom_image = safe_value(
-                        row.get("require_custom_image"), False
-                    )
-                    if isinstance(raw_custom_image, str):
-                        require_custom_image = (
-                            raw_custom_image.strip().upper() == "TRUE"
-                        )
-                    else:
-                        require_custom_image = bool(raw_custom_image)
-
-                    product_data = {
-                        "name": current_product_key,
-                        "description": safe_value(row.get("description"), ""),
-                        "price": safe_value(row.get("price"), 0),
-                        "market_price": safe_value(row.get("market_price")),
-                        "track_stock": safe_value(row.get("track_stock"), True),
-                        "stock": safe_value(row.get("stock"), 0),
-                        "weight": safe_value(row.get("weight")),
-                        "thumbnail_alt_description": safe_value(
-                            row.get(
-                                "thumbnail_image_alt_description",
-                                row.get("thumbnail_image_aly_description"),
-                            ),
-                            "",
-                        ),
-                        "category": category,
-                        "sub_category": sub_category,
-                        "is_popular": safe_value(row.get("is_popular"), False),
-                        "is_featured": safe_value(row.get("is_featured"), False),
-                        "status": safe_value(row.get("status"), "active"),
-                        "use_dynamic_pricing": use_dynamic_pricing,
-                        "base_making_charge": base_making_charge,
-                        "require_custom_image": require_custom_image,
-                        "meta_title": safe_value(
-                            row.get("meta_title", row.get("meta title")), ""
-                        ),
-                        "meta_description": safe_value(
-                            row.get("meta_description", row.get("meta description")), ""
-                        ),
-                    }
-
-                    product_data = {
-                        k: v for k, v in product_data.items() if v is not None
-                    }
-                    product = Product(**product_data)
-
-                    thumb_val = safe_value(row.get("thumbnail_image"))
-                    if thumb_val:
-                        if not str(thumb_val).startswith(("http://", "https://")):
-                            thumb_file = process_image_field(thumb_val, images_from_zip)
-                            if thumb_file:
-                                product.thumbnail_image.save(
-                                    thumb_file.name, thumb_file, save=False
-                                )
-                        else:
-                            thumb_file, thumb_filename = download_image_from_url(
-                                thumb_val, upload_to="product_images"
-                            )
-                            if thumb_file:
-                                product.thumbnail_image.save(
-                                    thumb_filename, thumb_file, save=False
-                                )
-
-                    try:
-                        product.save()
-                    except Exception as e:
-                        return Response(
-                            {"error": str(e)}, status=status.HTTP_400_BAD_REQUEST
-                        )
-
-                    images_val = safe_value(row.get("images"))
-                    if images_val:
-                        image_names = [
-                            img.strip()
-                            for img in str(images_val).split(",")
-                            if img.strip()
-                        ]
-                        for img_name in image_names:
-                            if not img_name.startswith(("http://", "https://")):
-                                img_file = process_image_field(
-                                    img_name, images_from_zip
-                                )
-                                if img_file:
-                                    prod_image = ProductImage(product=product)
-                                    prod_image.image.save(
-                                        img_file.name, img_file, save=True
-                                    )
-                            else:
-                                img_file, img_filename = download_image_from_url(
-                                    img_name, upload_to="product_images"
-                                )
-                                if img_file:
-                                    prod_image = ProductImage(product=product)
-                                    prod_image.image.save(
-                                        img_filename, img_file, save=True
-                                    )
-
-                    option_names = self._create_product_options(product, row)
-                    product_options[current_product_key] = option_names
-
-                    created_products[current_product_key] = {
-                        "product": product,
-                        "options_created": True,
-                        "use_dynamic_pricing": use_dynamic_pricing,
-                    }
-                    pending_compositions[product.pk] = []
-
-                current_product = created_products[current_product_key]["product"]
-                current_option_names = product_options[current_product_key]
-
-            if current_product:
-                product_meta = next(
-                    (
-                        v
-                        for v in created_products.values()
-                        if v["product"].pk == current_product.pk
-                    ),
-                    None,
-                )
-                use_dynamic = (
-                    product_meta["use_dynamic_pricing"] if product_meta else False
-                )
-
-                if use_dynamic:
-                    composition_val = safe_value(row.get("composition"))
-                    quantity_val = safe_value(row.get("quantity"))
-
-                    if composition_val and quantity_val is not None:
-                        normalised_comp = str(composition_val).strip().lower()
-                        metric = metric_col_map.get(normalised_comp)
-                        try:
-                            quantity = float(quantity_val)
-                        except (ValueError, TypeError):
-                            quantity = None
-
-                        if metric and quantity and quantity > 0:
-                            pending_compositions.setdefault(
-                                current_product.pk, []
-                            ).append((metric, quantity))
-
-                self._create_product_variant(
-                    current_product, row, current_option_names, images_from_zip
-                )
-
-        if current_product and current_product.pk in pending_compositions:
-            self._save_compositions(
-                current_product, pending_compositions.pop(current_product.pk)
-            )
-
-        return Response({
-            "success": True,
-            "message": f"Successfully processed {len(created_products)} products with variants",
-        })
-
-    def _save_compositions(self, product, composition_list):
-        ProductComposition.objects.filter(product=product).delete()
-        for metric, quantity in composition_list:
-            ProductComposition.objects.create(
-                product=product,
-                metric=metric,
-                quantity=quantity,
-            )
-
-    def _create_product_options(self, product, row):
-        ProductOption.objects.filter(product=product).delete()
-        option_names = {}
-        option_columns = {}
-
-        for col_name in row.index:
-            col_str = str(col_name).lower()
-            match = re.search(r"option(\d+)\s*name", col_str)
-            if match:
-                option_columns[int(match.group(1))] = col_name
-
-        for option_num, col_name in sorted(option_columns.items()):
-            option_name = safe_value(row.get(col_name))
-            values_col_name = f"option{option_num} values"
-            option_values_str = safe_value(row.get(values_col_name))
-
-            if option_name:
-                option_names[option_num] = option_name
-                option, _ = ProductOption.objects.get_or_create(
-                    product=product, name=option_name
-                )
-                if option_values_str:
-                    ProductOptionValue.objects.get_or_create(
-                        option=option, value=option_values_str
-                    )
-
-        return option_names
-
-    def _create_product_variant(self, product, row, option_names, images_from_zip=None):
-        variant_price = safe_value(row.get("variant price"))
-        variant_stock = safe_value(row.get("variant stock"))
-        variant_image_val = safe_value(row.get("variant image"))
-
-        if variant_price is None and variant_stock is None:
-            return None
-
-        variant = ProductVariant(
-            product=product,
-            price=variant_price if variant_price is not None else product.price,
-            stock=variant_stock if variant_stock is not None else (product.stock or 0),
-        )
-
-        if variant_image_val:
-            if images_from_zip and not str(variant_image_val).startswith((
-                "http://",
-                "https://",
-            )):
-                variant_file = process_image_field(variant_image_val, images_from_zip)
-                if variant_file:
-                    variant.image.save(variant_file.name, variant_file, save=False)
-            else:
-                variant_file, variant_filename = download_image_from_url(
-                    variant_image_val, upload_to="variant_images"
-                )
-                if variant_file:
-                    variant.image.save(variant_filename, variant_file, save=False)
-
-        variant.save()
-
-        for option_num, option_name in option_names.items():
-            values_col_name = f"option{option_num} values"
-            option_value_str = safe_value(row.get(values_col_name))
-            if not option_value_str:
-                continue
-
-            option = ProductOption.objects.filter(
-                product=product, name=option_name
-            ).first()
-
-            if option:
-                option_value, _ = ProductOptionValue.objects.get_or_create(
-                    option=option, value=option_value_str
-                )
-                variant.option_values.add(option_value)
-
-        return variant
+        try:
+            report = importer.run(df.to_dict("records"), df.columns)
+        finally:
+            if archive:
+                archive.close()
+        data = report.as_dict()
+        data["error_report_url"] = save_import_report(report)
+        return Response(data)
 
 
 # ─── Offer ────────────────────────────────────────────────────────────────────
@@ -1900,7 +1407,7 @@ OFFER_QS = Offer.objects.prefetch_related(
 
 class OfferListCreateView(generics.ListCreateAPIView):
     queryset = OFFER_QS
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
@@ -1917,18 +1424,21 @@ class OfferRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         return OfferWriteSerializer
 
 
-class OfferProductListView(generics.ListAPIView):
+class OfferProductListView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView
+):
+    cache_scopes = CATALOG_CACHE_SCOPES
+    cache_per_customer = True
     queryset = PRODUCT_LIST_QS
     serializer_class = ProductSerializer
     pagination_class = ProductPagination
     filter_backends = [
         django_filters.DjangoFilterBackend,
-        filters.SearchFilter,
+        ProductSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_class = ProductFilterSet
     ordering_fields = ["created_at", "price", "is_popular", "average_rating"]
-    search_fields = ["name"]
 
     def get_serializer_class(self):
         site_config = SiteConfig.get_solo()
@@ -1958,7 +1468,8 @@ class OfferProductListView(generics.ListAPIView):
         has_offer_products = False
         q_prod = Q()
         q_var = Q()
-        if active_offers.exists():
+        offer_ids = list(active_offers.values_list("id", flat=True))
+        if offer_ids:
             category_ids = list(
                 filter(None, active_offers.values_list("categories", flat=True))
             )
@@ -1984,6 +1495,16 @@ class OfferProductListView(generics.ListAPIView):
             ) and Product.objects.filter(q_prod).exists():
                 has_offer_products = True
 
+        # Price range of the offer's products (or the whole catalog),
+        # cached per tenant catalog version
+        if has_offer_products:
+            price_range = offer_price_range(
+                site_config.use_product_variant, offer_ids, q_var, q_prod
+            )
+        else:
+            aggregates = catalog_aggregates(site_config.use_product_variant)
+            price_range = (aggregates["min_price"], aggregates["max_price"])
+
         if not site_config.use_product_variant:
             queryset = self.get_queryset()
             if has_offer_products:
@@ -1991,26 +1512,10 @@ class OfferProductListView(generics.ListAPIView):
 
             queryset = self.filter_queryset(queryset)
 
-            if has_offer_products:
-                max_price = float(
-                    Product.objects
-                    .filter(q_prod)
-                    .annotate(computed_final_price=FINAL_PRICE_ANNOTATION)
-                    .aggregate(m=Max("computed_final_price"))["m"]
-                    or 0.0
-                )
-            else:
-                max_price = float(
-                    Product.objects.annotate(
-                        computed_final_price=FINAL_PRICE_ANNOTATION
-                    ).aggregate(m=Max("computed_final_price"))["m"]
-                    or 0.0
-                )
-
             page = self.paginate_queryset(queryset)
             if page is not None:
                 if self.paginator is not None:
-                    self.paginator.max_price = max_price
+                    self.paginator.min_price, self.paginator.max_price = price_range
                 serializer = self.get_serializer(page, many=True)
                 return self.get_paginated_response(serializer.data)
 
@@ -2019,156 +1524,19 @@ class OfferProductListView(generics.ListAPIView):
 
         # ── variant mode ────────────────────────────────────────────────────────
         self.filter_backends = []
-
-        params = request.GET.copy()
-
-        from distutils.util import strtobool
-
-        if "is_popular" in params:
-            try:
-                params["is_popular"] = strtobool(str(params["is_popular"]))
-            except ValueError:
-                params.pop("is_popular")
-
-        variant_qs = PRODUCT_VARIANT_QS
         if has_offer_products:
-            variant_qs = variant_qs.filter(q_var).distinct()
-
-        variant_filter = ProductVariantFilterSet(params, queryset=variant_qs)
-        variant_qs = variant_filter.qs
-
-        search_filter = filters.SearchFilter()
-        ordering_filter = filters.OrderingFilter()
-
-        orig_search_fields = self.search_fields
-        self.search_fields = ["product__name", "option_values__value"]
-
-        variant_qs = search_filter.filter_queryset(request, variant_qs, self)
-        variant_qs = ordering_filter.filter_queryset(request, variant_qs, self)
-
-        self.search_fields = orig_search_fields
-
-        product_qs = (
-            Product.objects
-            .filter(variants__isnull=True)
-            .select_related("category", "sub_category")
-            .prefetch_related(
-                Prefetch(
-                    "images",
-                    queryset=ProductImage.objects.only("id", "product_id", "image"),
-                ),
-            )
-            .annotate(
-                average_rating=Avg("productreview__rating"),
-                computed_final_price=FINAL_PRICE_ANNOTATION,
-            )
-            .only(
-                "id",
-                "name",
-                "slug",
-                "price",
-                "market_price",
-                "stock",
-                "thumbnail_image",
-                "thumbnail_alt_description",
-                "category_id",
-                "sub_category_id",
-                "is_popular",
-                "is_featured",
-                "fast_shipping",
-                "warranty",
-                "use_dynamic_pricing",
-                "base_making_charge",
-                "created_at",
-                "updated_at",
-            )
-        )
-        if has_offer_products:
-            product_qs = product_qs.filter(q_prod).distinct()
-
-        product_filter = ProductFilterSet(params, queryset=product_qs)
-        product_qs = product_filter.qs
-        product_qs = search_filter.filter_queryset(request, product_qs, self)
-        product_qs = ordering_filter.filter_queryset(request, product_qs, self)
-
-        # ── ordering-aware Python sort for the combined list ──────────────────
-        ordering = request.query_params.get("ordering", "-created_at")
-        sort_field = ordering.lstrip("-")
-        sort_reverse = ordering.startswith("-")
-
-        def _sort_key(obj):
-            if sort_field == "price":
-                if isinstance(obj, ProductVariant):
-                    return float(obj.price or 0)
-                if (
-                    hasattr(obj, "computed_final_price")
-                    and obj.computed_final_price is not None
-                ):
-                    return float(obj.computed_final_price)
-                return float(obj.final_price or 0)
-            if sort_field == "average_rating":
-                return float(getattr(obj, "average_rating", None) or 0)
-            if sort_field == "is_popular":
-                val = getattr(obj, "is_popular", False)
-                if isinstance(obj, ProductVariant):
-                    val = getattr(obj.product, "is_popular", False)
-                return 0 if val else 1
-            return getattr(obj, "created_at", None) or 0
-
-        combined = sorted(
-            chain(variant_qs, product_qs),
-            key=_sort_key,
-            reverse=sort_reverse,
-        )
-
-        if has_offer_products:
-            variant_max = float(
-                ProductVariant.objects.filter(q_var).aggregate(m=Max("price"))["m"]
-                or 0.0
-            )
-            standalone_product_max = float(
-                Product.objects
-                .filter(q_prod, variants__isnull=True)
-                .annotate(computed_final_price=FINAL_PRICE_ANNOTATION)
-                .aggregate(m=Max("computed_final_price"))["m"]
-                or 0.0
-            )
-            fallback_max = float(
-                Product.objects.filter(
-                    q_prod,
-                    variants__isnull=False,
-                    variants__price__isnull=True,
-                ).aggregate(m=Max("price"))["m"]
-                or 0.0
-            )
+            combined = unified_listing(self, request, q_var=q_var, q_prod=q_prod)
         else:
-            variant_max = float(
-                ProductVariant.objects.aggregate(m=Max("price"))["m"] or 0.0
-            )
-            standalone_product_max = float(
-                Product.objects
-                .filter(variants__isnull=True)
-                .annotate(computed_final_price=FINAL_PRICE_ANNOTATION)
-                .aggregate(m=Max("computed_final_price"))["m"]
-                or 0.0
-            )
-            fallback_max = float(
-                Product.objects.filter(
-                    variants__isnull=False,
-                    variants__price__isnull=True,
-                ).aggregate(m=Max("price"))["m"]
-                or 0.0
-            )
-        max_price = max(variant_max, standalone_product_max, fallback_max)
+            combined = unified_listing(self, request)
 
         page = self.paginate_queryset(combined)
         if page is not None:
             if self.paginator is not None:
-                self.paginator.max_price = max_price
+                self.paginator.min_price, self.paginator.max_price = price_range
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(combined, many=True)
+        serializer = self.get_serializer(list(combined), many=True)
         return Response(serializer.data)
 
 
@@ -1,20 +1,31 @@
 import asyncio
+import logging
 from datetime import date
 from urllib.parse import urlparse
 
 from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import connection
 from django.http import JsonResponse
-from django.utils.deprecation import MiddlewareMixin
 from django_tenants.utils import (
     get_public_schema_name,
     get_tenant_domain_model,
 )
 
+from sales_crm.postgresql_backend import stats as search_path_stats
+from sales_crm.ratelimit import RateLimiter
+from tenants.cache import (
+    PUBLIC_TENANT_KEY,
+    local_tenant_cache,
+    start_invalidation_listener,
+    tenant_domain_key,
+)
 from tenants.models import Client
 
+logger = logging.getLogger(__name__)
+
 # =====================================================
 # CONFIG
 # =====================================================
@@ -28,23 +39,109 @@ EXEMPT_PATHS = (
     "/api/upgrade",
 )
 
+# Marks a request whose subscription check has not been run yet.
+NOT_CHECKED = object()
+
 WHITELISTED_IPS = {
     "127.0.0.1",
     "::1",
     "172.188.98.151",
 }
 
+# =====================================================
+# SEARCH PATH STATS MIDDLEWARE
+# =====================================================
+
+
+class SearchPathStatsMiddleware:
+    """
+    Counts SET search_path statements issued and elided per request.
+
+    The counts are logged and, when SEARCH_PATH_STATS_HEADER is on, returned
+    in the ``X-Search-Path-Switches`` response header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.add_header = getattr(settings, "SEARCH_PATH_STATS_HEADER", False)
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self._sync_call(request)
+
+    async def __acall__(self, request):
+        stats = search_path_stats.track_request()
+        response = await self.get_response(request)
+        return self.report(request, response, stats)
+
+    def _sync_call(self, request):
+        stats = search_path_stats.track_request()
+        response = self.get_response(request)
+        return self.report(request, response, stats)
+
+    def report(self, request, response, stats):
+        logger.debug(
+            "search_path %s %s: %s", request.method, request.path, stats.as_header()
+        )
+        if self.add_header:
+            response["X-Search-Path-Switches"] = stats.as_header()
+        return response
+
+
 # =====================================================
 # RATE LIMIT MIDDLEWARE
 # =====================================================
 
 
-class RateLimitMiddleware(MiddlewareMixin):
+class RateLimitMiddleware:
     RATE_LIMIT = 1000
     WINDOW = 60
     BLOCK_TIME = 300
 
-    def process_request(self, request):
+    limiter = RateLimiter(RATE_LIMIT, WINDOW, BLOCK_TIME)
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self._sync_call(request)
+
+    async def __acall__(self, request):
+        key = self.get_rate_key(request)
+        if key is not None:
+            # Leased tokens and known blocks are answered without a hop.
+            allowed = self.limiter.check_local(key)
+            if allowed is None:
+                allowed = await sync_to_async(self._allow_remote)(key)
+            if not allowed:
+                return self.too_many_requests()
+        return await self.get_response(request)
+
+    def _sync_call(self, request):
+        key = self.get_rate_key(request)
+        if key is not None:
+            allowed = self.limiter.check_local(key)
+            if allowed is None:
+                allowed = self._allow_remote(key)
+            if not allowed:
+                return self.too_many_requests()
+        return self.get_response(request)
+
+    def _allow_remote(self, key):
+        try:
+            return self.limiter.allow_remote(key)
+        except Exception:
+            # Fail open when Redis is unavailable.
+            return True
+
+    def get_rate_key(self, request):
         path = request.path.lower()
         if any(path.startswith(p) for p in EXEMPT_PATHS):
             return None
@@ -55,27 +152,10 @@ class RateLimitMiddleware(MiddlewareMixin):
 
         tenant = getattr(request, "tenant", None)
         tenant_schema = tenant.schema_name if tenant else "public"
+        return f"{tenant_schema}:{ip}"
 
-        blocked_key = f"blocked:{tenant_schema}:{ip}"
-        rate_key = f"ratelimit:{tenant_schema}:{ip}"
-
-        if cache.get(blocked_key):
-            return JsonResponse({"detail": "Too Many Requests"}, status=429)
-
-        try:
-            cache.add(rate_key, 0, timeout=self.WINDOW)
-            count = cache.incr(rate_key)
-        except ValueError:
-            cache.set(rate_key, 1, timeout=self.WINDOW)
-            count = 1
-        except Exception:
-            return None
-
-        if count > self.RATE_LIMIT:
-            cache.set(blocked_key, True, timeout=self.BLOCK_TIME)
-            return JsonResponse({"detail": "Too Many Requests"}, status=429)
-
-        return None
+    def too_many_requests(self):
+        return JsonResponse({"detail": "Too Many Requests"}, status=429)
 
     def get_client_ip(self, request):
         xff = request.META.get("HTTP_X_FORWARDED_FOR")
@@ -105,6 +185,7 @@ class CustomDomainTenantMiddleware:
         self.get_response = get_response
         if asyncio.iscoroutinefunction(self.get_response):
             self._is_coroutine = asyncio.coroutines._is_coroutine
+        start_invalidation_listener()
 
     def __call__(self, request):
         if asyncio.iscoroutinefunction(self.get_response):
@@ -116,20 +197,30 @@ class CustomDomainTenantMiddleware:
     # --------------------------------------------------
 
     async def __acall__(self, request):
-        await sync_to_async(connection.set_schema_to_public)()
+        # Everything that touches the thread-bound DB connection runs in a
+        # single hop. There is no reset hop after the response: under ASGI
+        # each request gets its own ThreadSensitiveContext executor, and
+        # every request starts by resetting the schema anyway.
+        error_response = await sync_to_async(self._activate_tenant)(request)
+        if error_response is not None:
+            return error_response
+        return await self.get_response(request)
+
+    def _activate_tenant(self, request):
+        connection.set_schema_to_public()
 
         path = request.path.lower()
 
         if path.startswith(("/static", "/media")):
-            await sync_to_async(self.set_public_tenant)(request)
-            return await self.get_response(request)
+            self.set_public_tenant(request)
+            return None
 
         try:
-            tenant = await sync_to_async(self.resolve_tenant)(request)
-            await sync_to_async(connection.set_tenant)(tenant)
+            tenant = self.resolve_tenant(request)
+            connection.set_tenant(tenant)
             request.tenant = tenant
         except (ObjectDoesNotExist, Client.DoesNotExist):
-            await sync_to_async(self.set_public_tenant)(request)
+            self.set_public_tenant(request)
 
             if self.requires_tenant(path):
                 return JsonResponse(
@@ -140,10 +231,12 @@ class CustomDomainTenantMiddleware:
                     status=400,
                 )
 
-        try:
-            return await self.get_response(request)
-        finally:
-            await sync_to_async(connection.set_schema_to_public)()
+        # Piggyback the subscription check on this hop so
+        # SubscriptionMiddleware does not need one of its own.
+        request._subscription_response = SubscriptionMiddleware._check_subscription(
+            request
+        )
+        return None
 
     # --------------------------------------------------
     # SYNC
@@ -188,25 +281,28 @@ class CustomDomainTenantMiddleware:
             if not hostname:
                 continue
 
-            cache_key = f"tenant_domain:{hostname}"
-            tenant_id = cache.get(cache_key)
+            # Tier 1: per-process LRU, no network round trip at all.
+            tenant = local_tenant_cache.get(hostname)
+            if tenant is not None:
+                return tenant
 
-            try:
-                if tenant_id is None:
-                    domain_obj = (
-                        DomainModel.objects
-                        .select_related("tenant")
-                        .only("tenant__id")
-                        .get(domain=hostname)
-                    )
-                    tenant_id = domain_obj.tenant_id
-                    cache.set(cache_key, tenant_id, timeout=self.CACHE_TIMEOUT)
-
-                return Client.objects.get(id=tenant_id)
-
-            except (ObjectDoesNotExist, Client.DoesNotExist):
-                cache.delete(cache_key)
-                continue
+            # Tier 2: shared Redis entry holding the hydrated Client.
+            cache_key = tenant_domain_key(hostname)
+            tenant = cache.get(cache_key)
+
+            if not isinstance(tenant, Client):
+                try:
+                    domain_obj = DomainModel.objects.select_related(
+                        "tenant", "tenant__pricing_plan"
+                    ).get(domain=hostname)
+                except ObjectDoesNotExist:
+                    continue
+
+                tenant = domain_obj.tenant
+                cache.set(cache_key, tenant, timeout=self.CACHE_TIMEOUT)
+
+            local_tenant_cache.set(hostname, tenant)
+            return tenant
 
         raise Client.DoesNotExist
 
@@ -247,10 +343,17 @@ class CustomDomainTenantMiddleware:
 
     def set_public_tenant(self, request):
         connection.set_schema_to_public()
-        try:
-            request.tenant = Client.objects.get(schema_name=get_public_schema_name())
-        except Client.DoesNotExist:
-            request.tenant = None
+
+        tenant = local_tenant_cache.get(PUBLIC_TENANT_KEY)
+        if tenant is None:
+            try:
+                tenant = Client.objects.get(schema_name=get_public_schema_name())
+            except Client.DoesNotExist:
+                request.tenant = None
+                return
+            local_tenant_cache.set(PUBLIC_TENANT_KEY, tenant)
+
+        request.tenant = tenant
 
     def requires_tenant(self, path):
         if not path.startswith(self.TENANT_REQUIRED_PATHS):
@@ -275,7 +378,9 @@ class SubscriptionMiddleware:
         return self._sync_call(request)
 
     async def __acall__(self, request):
-        blocked = await sync_to_async(self._check_subscription)(request)
+        blocked = getattr(request, "_subscription_response", NOT_CHECKED)
+        if blocked is NOT_CHECKED:
+            blocked = await sync_to_async(self._check_subscription)(request)
         if blocked:
             return blocked
         return await self.get_response(request)
@@ -286,7 +391,8 @@ class SubscriptionMiddleware:
             return blocked
         return self.get_response(request)
 
-    def _check_subscription(self, request):
+    @classmethod
+    def _check_subscription(cls, request):
         path = request.path.lower()
 
         if any(p in path for p in EXEMPT_PATHS):
@@ -296,7 +402,7 @@ class SubscriptionMiddleware:
         if not tenant or tenant.schema_name == get_public_schema_name():
             return None
 
-        is_active = self.is_subscription_active(tenant)
+        is_active = cls.is_subscription_active(tenant)
         request.tenant_is_active = is_active
 
         if not is_active and request.method not in SAFE_METHODS:
@@ -311,7 +417,8 @@ class SubscriptionMiddleware:
 
         return None
 
-    def is_subscription_active(self, tenant):
+    @staticmethod
+    def is_subscription_active(tenant):
         cache_key = f"tenant_sub:{tenant.schema_name}"
         cached = cache.get(cache_key)
 
@@ -1,7 +1,276 @@
+"""
+Page-number and keyset pagination for list views.
+
+``CustomPagination`` is plain page-number pagination: every page runs a
+``COUNT(*)`` and an ``OFFSET``, both of which grow with the table.
+
+``KeysetPagination`` keeps that API and adds keyset (cursor) pagination
+for requests with a ``cursor`` parameter (empty for the first page). A
+keyset page is the next ``page_size`` rows after the last row of the
+previous one::
+
+    WHERE (created_at, id) < (:last_created_at, :last_id)
+    ORDER BY created_at DESC, id DESC LIMIT :page_size + 1
+
+so every page costs the same as the first and nothing is counted. The
+cursor in ``next`` carries the ordering and the last row's values.
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Model, Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+# =====================================================
+# KEYSET CONDITIONS
+# =====================================================
+
+
+def _beyond(field, value, descending, nullable):
+    """
+    Rows strictly past ``value`` in one column, or None for no rows.
+
+    NULLs sort last ascending and first descending, as in PostgreSQL.
+    """
+    if value is None:
+        return Q(**{f"{field}__isnull": False}) if descending else None
+    q = Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+    if nullable and not descending:
+        q |= Q(**{f"{field}__isnull": True})
+    return q
+
+
+def keyset_filter(ordering, values, nullable=()):
+    """
+    Q selecting the rows after ``values`` in ``ordering`` (``order_by``
+    terms, the last one unique); fields named in ``nullable`` may be NULL.
+    """
+    q = None
+    for term, value in reversed(list(zip(ordering, values))):
+        field = term.lstrip("-")
+        descending = term.startswith("-")
+        beyond = _beyond(field, value, descending, field in nullable)
+        if q is not None:
+            tie = Q(**{f"{field}__isnull": True} if value is None else {field: value})
+            tie &= q
+            q = tie if beyond is None else beyond | tie
+        else:
+            q = beyond
+
+    if q is None:
+        return Q(pk__in=[])
+
+    # Repeat the bound on the leading column outside the OR so it can
+    # drive an index range scan.
+    field, value = ordering[0].lstrip("-"), values[0]
+    if value is not None and field not in nullable:
+        lookup = "lte" if ordering[0].startswith("-") else "gte"
+        q &= Q(**{f"{field}__{lookup}": value})
+    return q
+
+
+class QuerySetKeyset:
+    """Keyset pages of a queryset, in its own ordering plus the primary key."""
+
+    def __init__(self, queryset, ordering):
+        self.queryset = queryset
+        self.keyset_ordering = list(ordering)
+        model = queryset.model
+
+        last = self.keyset_ordering[-1].lstrip("-")
+        if last not in ("pk", model._meta.pk.name):
+            direction = "-" if self.keyset_ordering[-1].startswith("-") else ""
+            self.keyset_ordering.append(f"{direction}pk")
+
+        self.nullable = set()
+        for term in self.keyset_ordering:
+            name = term.lstrip("-")
+            if name == "pk":
+                continue
+            try:
+                if not model._meta.get_field(name).null:
+                    continue
+            except FieldDoesNotExist:
+                pass  # annotations and related lookups
+            self.nullable.add(name)
+
+    @classmethod
+    def for_queryset(cls, queryset, default_ordering):
+        """None when the queryset is ordered by expressions or randomly."""
+        query = queryset.query
+        ordering = query.order_by or (
+            query.default_ordering and queryset.model._meta.ordering
+        )
+        ordering = list(ordering or default_ordering)
+        if query.extra_order_by or not all(
+            isinstance(term, str) and term != "?" for term in ordering
+        ):
+            return None
+        return cls(queryset, ordering)
+
+    def values(self, obj):
+        if isinstance(obj, dict):  # values() querysets
+            return [obj[term.lstrip("-")] for term in self.keyset_ordering]
+        values = []
+        for term in self.keyset_ordering:
+            value = obj
+            for attr in term.lstrip("-").split("__"):
+                value = getattr(value, attr) if value is not None else None
+            values.append(value.pk if isinstance(value, Model) else value)
+        return values
+
+    def keyset_page(self, after, limit):
+        queryset = self.queryset
+        if after is not None:
+            queryset = queryset.filter(
+                keyset_filter(self.keyset_ordering, after, self.nullable)
+            )
+        objects = queryset.order_by(*self.order_by())[:limit]
+        return [(self.values(obj), obj) for obj in objects]
+
+    def chunks(self, size):
+        """
+        All rows as successive lists of ``size``, one keyset query each;
+        unlike ``iterator()``, this needs no server-side cursor.
+        """
+        after = None
+        while True:
+            page = self.keyset_page(after, size)
+            if page:
+                yield [obj for _, obj in page]
+            if len(page) < size:
+                return
+            after = page[-1][0]
+
+    def order_by(self):
+        # Spell out where NULLs go, so the order is the one keyset_filter
+        # assumes whatever the database's default.
+        order_by = []
+        for term in self.keyset_ordering:
+            name = term.lstrip("-")
+            if name not in self.nullable:
+                order_by.append(term)
+            elif term.startswith("-"):
+                order_by.append(F(name).desc(nulls_first=True))
+            else:
+                order_by.append(F(name).asc(nulls_last=True))
+        return order_by
+
+
+# =====================================================
+# PAGINATORS
+# =====================================================
+
+
+class KeysetPagination(CustomPagination):
+    """
+    Page numbers by default; keyset pages with ``?cursor=``.
+
+    Keyset pages follow the queryset's ordering (after any
+    ``OrderingFilter``; ``keyset_default_ordering`` when it has none) with
+    the primary key appended as the tie-breaker. A cursor is only valid
+    for the ordering it was issued under. Keyset responses have no
+    ``count`` and only a ``next`` link. Querysets ordered by expressions
+    fall back to page numbers.
+
+    Objects other than querysets can paginate themselves by providing
+    ``keyset_ordering`` and ``keyset_page(after, limit)``, which returns
+    ``(values, object)`` pairs (see ``product.listing.UnifiedListing``).
+    """
+
+    cursor_query_param = "cursor"
+    keyset_default_ordering = ("-created_at",)
+    invalid_cursor_message = "Invalid cursor."
+
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+
+        if hasattr(queryset, "keyset_page"):
+            keyset = queryset
+        else:
+            keyset = QuerySetKeyset.for_queryset(
+                queryset, self.keyset_default_ordering
+            )
+            if keyset is None:
+                return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        self.keyset = keyset
+        after = self.decode_cursor(request)
+        rows = keyset.keyset_page(after, page_size + 1)
+        self.next_values = rows[page_size - 1][0] if len(rows) > page_size else None
+        return [obj for _, obj in rows[:page_size]]
+
+    def encode_cursor(self, values):
+        payload = json.dumps(
+            {"o": list(self.keyset.keyset_ordering), "v": values},
+            default=str,
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        """The values to continue after, or None for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            ordering, values = payload["o"], payload["v"]
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        ordering_ok = ordering == list(self.keyset.keyset_ordering)
+        if not ordering_ok or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_link(self):
+        if self.keyset is None:
+            return super().get_next_link()
+        if self.next_values is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_values)
+        )
+
+    def get_previous_link(self):
+        if self.keyset is None:
+            return super().get_previous_link()
+        return None
+
+    def get_paginated_response(self, data):
+        if self.keyset is None:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict([
+                ("next", self.get_next_link()),
+                ("previous", None),
+                ("results", data),
+            ])
+        )
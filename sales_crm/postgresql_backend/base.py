@@ -0,0 +1,80 @@
+"""
+django-tenants backend that skips redundant ``SET search_path`` statements.
+
+django-tenants forgets the active search_path on every ``set_tenant`` and
+re-issues ``SET search_path`` on the next cursor, even when the schema did
+not change (middleware resets, ``schema_context`` loops, websocket
+consumers re-applying their tenant). Behind PgBouncer each of those is a
+round trip through the pooler.
+
+This wrapper remembers the search_path actually in effect on the open
+database session and only issues ``SET`` when it would change something.
+The remembered value is dropped whenever PostgreSQL may have discarded it:
+on connect/close and on (savepoint) rollback, since ``SET`` is
+transactional. This relies on PgBouncer running in session mode, which
+schema switching already requires.
+"""
+
+from django_tenants.postgresql_backend.base import (
+    DatabaseWrapper as TenantDatabaseWrapper,
+)
+
+from sales_crm.postgresql_backend import stats
+
+
+class DatabaseWrapper(TenantDatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        # search_path confirmed on the current database session, or None.
+        self._active_search_path = None
+        super().__init__(*args, **kwargs)
+
+    def set_tenant(self, tenant, include_public=True):
+        if (
+            tenant.schema_name == self.schema_name
+            and include_public == self.include_public_schema
+        ):
+            # Same schema: nothing to switch and no ContentType cache to
+            # clear, just keep the freshest tenant object.
+            self.tenant = tenant
+            return
+        super().set_tenant(tenant, include_public)
+
+    def _cursor(self, name=None):
+        # Settle the connection first so a reconnect cannot happen after
+        # deciding to skip the SET.
+        self.close_if_health_check_failed()
+        self.ensure_connection()
+
+        if self.schema_name:
+            search_paths = self._get_cursor_search_paths()
+            if search_paths == self._active_search_path:
+                self.search_path_set_schemas = search_paths
+                stats.record(issued=False)
+                # Bypass django-tenants' _cursor, which would SET again.
+                return super(TenantDatabaseWrapper, self)._cursor(name=name)
+
+        cursor = super()._cursor(name=name)
+
+        if self.search_path_set_schemas:
+            self._active_search_path = list(self.search_path_set_schemas)
+            stats.record(issued=True)
+        return cursor
+
+    def connect(self):
+        self._active_search_path = None
+        super().connect()
+
+    def close(self):
+        self._active_search_path = None
+        super().close()
+
+    def rollback(self):
+        # Rolling back reverts a SET issued inside the transaction.
+        self._active_search_path = None
+        super().rollback()
+
+    def savepoint_rollback(self, sid):
+        try:
+            super().savepoint_rollback(sid)
+        finally:
+            self._active_search_path = None
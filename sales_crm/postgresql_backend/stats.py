@@ -0,0 +1,44 @@
+"""
+Counters for ``SET search_path`` statements issued vs. elided.
+
+``totals`` accumulates for the whole process. ``track_request`` installs a
+per-request ``SearchPathStats`` in a context variable; asgiref copies the
+context into ``sync_to_async`` threads, so ORM work done there is counted
+against the request that triggered it.
+"""
+
+import contextvars
+from dataclasses import dataclass
+
+
+@dataclass
+class SearchPathStats:
+    issued: int = 0
+    elided: int = 0
+
+    def as_header(self):
+        return f"issued={self.issued};elided={self.elided}"
+
+
+totals = SearchPathStats()
+
+_current = contextvars.ContextVar("search_path_stats", default=None)
+
+
+def track_request():
+    """Start counting for the current request; returns the stats object."""
+    stats = SearchPathStats()
+    _current.set(stats)
+    return stats
+
+
+def record(issued):
+    stats = _current.get()
+    if issued:
+        totals.issued += 1
+        if stats is not None:
+            stats.issued += 1
+    else:
+        totals.elided += 1
+        if stats is not None:
+            stats.elided += 1
@@ -0,0 +1,171 @@
+"""
+Atomic GCRA rate limiter backed by a single Redis script call.
+
+GCRA (generic cell rate algorithm) stores one "theoretical arrival time"
+per client and admits at most ``limit`` requests in *any* sliding
+``window``, so there is no double-rate burst at fixed window edges.
+
+To keep well-behaved clients off Redis entirely, the script may lease a
+small batch of tokens to the calling process when the client is far below
+its limit. Leased tokens are already charged against the global budget, so
+the pre-filter never admits more than the limit; unused leases simply
+expire locally.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# KEYS[1]  theoretical arrival time (ms)
+# KEYS[2]  block flag
+# ARGV[1]  emission interval (ms per request)
+# ARGV[2]  window (ms)
+# ARGV[3]  block time (ms)
+# ARGV[4]  requested lease size
+#
+# Returns {granted, n}: granted == 0 means denied and n is the block TTL in
+# ms; otherwise n is the number of tokens still available.
+GCRA_SCRIPT = """
+local blocked_ttl = redis.call('PTTL', KEYS[2])
+if blocked_ttl > 0 then
+  return {0, blocked_ttl}
+end
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local lease = tonumber(ARGV[4])
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+  tat = now
+end
+
+local available = math.floor((now + window - tat) / interval)
+if available < 1 then
+  redis.call('SET', KEYS[2], 1, 'PX', ARGV[3])
+  return {0, tonumber(ARGV[3])}
+end
+
+-- Only lease a batch when the client is far below its limit.
+local granted = 1
+if available >= 4 * lease then
+  granted = lease
+end
+
+tat = tat + granted * interval
+redis.call('SET', KEYS[1], tat, 'PX', math.ceil(tat - now))
+return {granted, available - granted}
+"""
+
+
+class LocalLeases:
+    """
+    Per-process pre-filter holding leased tokens and known blocks.
+
+    ``take`` answers True (spend a leased token), False (client is blocked)
+    or None (nothing known locally, ask Redis).
+    """
+
+    def __init__(self, max_entries=10000, lease_ttl=1.0):
+        self.max_entries = max_entries
+        self.lease_ttl = lease_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            tokens, expires_at, blocked = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+
+            if blocked:
+                return False
+
+            if tokens <= 0:
+                del self._entries[key]
+                return None
+
+            self._entries[key] = (tokens - 1, expires_at, False)
+            return True
+
+    def grant(self, key, tokens):
+        if tokens <= 0:
+            return
+        self._store(key, (tokens, time.monotonic() + self.lease_ttl, False))
+
+    def block(self, key, ttl_ms):
+        self._store(key, (0, time.monotonic() + ttl_ms / 1000, True))
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RateLimiter:
+    KEY_PREFIX = "rl"
+
+    def __init__(self, limit, window, block_time, lease_size=10, client=None):
+        self.limit = limit
+        self.window_ms = window * 1000
+        self.block_ms = block_time * 1000
+        # Rounded up so the effective limit never exceeds the configured one.
+        self.interval_ms = max(1, math.ceil(self.window_ms / limit))
+        self.lease_size = max(1, lease_size)
+        self.leases = LocalLeases()
+        self._client = client
+        self._script = None
+        self._lock = threading.Lock()
+
+    def get_client(self):
+        if self._client is None:
+            from django_redis import get_redis_connection
+
+            self._client = get_redis_connection("default")
+        return self._client
+
+    def get_script(self):
+        with self._lock:
+            if self._script is None:
+                self._script = self.get_client().register_script(GCRA_SCRIPT)
+            return self._script
+
+    def check_local(self, key):
+        """Decide without any network I/O when possible, otherwise None."""
+        return self.leases.take(key)
+
+    def allow(self, key):
+        decision = self.check_local(key)
+        if decision is not None:
+            return decision
+        return self.allow_remote(key)
+
+    def allow_remote(self, key):
+        granted, value = self.get_script()(
+            keys=[f"{self.KEY_PREFIX}:tat:{key}", f"{self.KEY_PREFIX}:blocked:{key}"],
+            args=[self.interval_ms, self.window_ms, self.block_ms, self.lease_size],
+        )
+        granted, value = int(granted), int(value)
+
+        if granted == 0:
+            self.leases.block(key, value)
+            return False
+
+        # One token is spent by this request, the rest stay local.
+        self.leases.grant(key, granted - 1)
+        return True
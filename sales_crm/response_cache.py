@@ -0,0 +1,291 @@
+"""
+Versioned response cache for public storefront GET endpoints.
+
+Every tenant keeps a content version per scope (usually an app label)::
+
+    content_version:{schema}:{scope}                  -> int
+
+and ``CachedResponseMixin`` stores GET response bodies under::
+
+    response:{schema}:{scope versions}:{hash of path and query string}
+
+Saving or deleting any model of a tracked app bumps that app's version
+(see ``track_content_changes``), so an edit invalidates every cached
+response of the app in O(1): keys for older versions are never read again
+and simply expire. Views whose output depends on the customer (wishlist
+flags) add the customer id and a per-customer version to the key.
+
+Hits and misses are counted per view in this process (``stats()``) and
+reported in the ``X-Cache`` response header.
+
+Versions start from, and on every bump catch up with, the clock in
+milliseconds, so a version doubles as the time of the scope's last change.
+``ConditionalGetMixin`` derives ``ETag`` and ``Last-Modified`` from them
+and answers revalidations with ``304 Not Modified`` before the view runs.
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+RESPONSE_TIMEOUT = 15 * 60
+
+
+# =====================================================
+# CONTENT VERSIONS
+# =====================================================
+
+
+def content_version_key(schema_name, scope):
+    return f"content_version:{schema_name}:{scope}"
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def get_content_version(scope, schema_name=None):
+    """The tenant's version for ``scope``; None when the cache is down."""
+    return get_content_versions([scope], schema_name)[scope]
+
+
+def get_content_versions(scopes, schema_name=None):
+    """``{scope: version}`` in one cache round trip; None values when down."""
+    schema_name = schema_name or connection.schema_name
+    keys = {scope: content_version_key(schema_name, scope) for scope in scopes}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for scope, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            # Start from the clock rather than 1, so a version key lost to an
+            # eviction can never come back as a value that was already used.
+            cache.add(key, _now_ms(), timeout=None)
+            version = cache.get(key)
+        versions[scope] = version
+    return versions
+
+
+def bump_content_version(scope, schema_name=None):
+    schema_name = schema_name or connection.schema_name
+    key = content_version_key(schema_name, scope)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        # No version yet: nothing can be cached under the old one.
+        return get_content_version(scope, schema_name)
+    # Catch up with the clock (still only via incr, so concurrent bumps
+    # never move the version backwards); see ConditionalGetMixin.
+    lag = _now_ms() - version
+    if lag > 0:
+        version = cache.incr(key, lag)
+    return version
+
+
+def schedule_content_version_bump(scope):
+    """Bump the current tenant's ``scope`` version once the transaction commits."""
+    schema_name = connection.schema_name
+    transaction.on_commit(lambda: bump_content_version(scope, schema_name))
+
+
+def customer_scope(customer_id):
+    return f"customer:{customer_id}"
+
+
+def track_content_changes(app_config, exclude=()):
+    """
+    Bump ``app_config.label``'s content version whenever one of its models
+    (except those named in ``exclude``) is saved, deleted or has its
+    many-to-many relations changed. Call from ``AppConfig.ready``.
+    """
+    scope = app_config.label
+
+    def bump(sender, **kwargs):
+        if kwargs.get("action", "post_").startswith("post_"):
+            schedule_content_version_bump(scope)
+
+    for model in app_config.get_models():
+        if model.__name__ in exclude:
+            continue
+        uid = f"content_version:{model._meta.label}"
+        post_save.connect(bump, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(bump, sender=model, weak=False, dispatch_uid=uid)
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(
+                bump,
+                sender=field.remote_field.through,
+                weak=False,
+                dispatch_uid=f"{uid}.{field.name}",
+            )
+
+
+# =====================================================
+# HIT / MISS COUNTERS
+# =====================================================
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def record(view_name, hit):
+    with _stats_lock:
+        _stats[(view_name, "hits" if hit else "misses")] += 1
+
+
+def stats():
+    """``{view name: {"hits": n, "misses": n}}`` for this process."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    result = {}
+    for (view_name, kind), count in snapshot.items():
+        result.setdefault(view_name, {"hits": 0, "misses": 0})[kind] = count
+    return result
+
+
+# =====================================================
+# VIEW MIXINS
+# =====================================================
+
+
+class ContentVersionMixin:
+    """
+    Content versions a view's GET responses depend on.
+
+    ``cache_scopes`` lists them (default: the view's app);
+    ``cache_per_customer`` adds the requesting customer's own version, for
+    views whose output depends on who asks. Looked up once per request.
+    """
+
+    cache_scopes = None
+    cache_per_customer = False
+
+    def get_cache_scopes(self):
+        return self.cache_scopes or (type(self).__module__.split(".")[0],)
+
+    def get_content_versions(self, request):
+        """``{scope: version}``, or None when the cache is unavailable."""
+        if hasattr(self, "_content_versions"):
+            return self._content_versions
+
+        scopes = list(self.get_cache_scopes())
+        if self.cache_per_customer:
+            from customer.utils import get_customer_from_request
+
+            customer = get_customer_from_request(request)
+            if customer is not None:
+                scopes.append(customer_scope(customer.pk))
+
+        versions = get_content_versions(scopes)
+        if None in versions.values():
+            versions = None
+        self._content_versions = versions
+        return versions
+
+    def get_request_digest(self, request):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        return hashlib.sha1(f"{request.path}?{query}".encode()).hexdigest()
+
+    def uncached_get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class ConditionalGetMixin(ContentVersionMixin):
+    """
+    ``ETag`` / ``Last-Modified`` for GET responses, from content versions.
+
+    The ETag is strong: the same versions, URL, renderer and customer
+    always produce the same body. A matching ``If-None-Match`` (or a
+    ``If-Modified-Since`` not older than the newest version) is answered
+    with 304 before the queryset is built or anything is serialized; the
+    only lookups are the version keys in Redis and, for per-customer views,
+    the customer from the token.
+
+    Put it first, before ``CachedResponseMixin`` and the DRF view class.
+    """
+
+    def get_etag(self, request, versions):
+        parts = [
+            connection.schema_name,
+            ",".join(f"{scope}={version}" for scope, version in versions.items()),
+            self.get_request_digest(request),
+            getattr(request, "accepted_media_type", ""),
+        ]
+        return quote_etag(hashlib.sha1("|".join(parts).encode()).hexdigest())
+
+    def get_last_modified(self, versions):
+        # Bumps may run a few milliseconds ahead of the clock.
+        return min(max(versions.values()), _now_ms()) // 1000
+
+    def get(self, request, *args, **kwargs):
+        versions = self.get_content_versions(request)
+        if versions is None:
+            return super().get(request, *args, **kwargs)
+
+        etag = self.get_etag(request, versions)
+        last_modified = self.get_last_modified(versions)
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        if self.cache_per_customer:
+            patch_vary_headers(response, ("Authorization",))
+        return response
+
+
+class CachedResponseMixin(ContentVersionMixin):
+    """
+    Serve GET responses of a public view from the versioned cache.
+
+    Put it before the DRF view class. Authentication, permissions and
+    throttling still run on every request.
+
+    Views that implement GET themselves define ``uncached_get`` instead of
+    ``get``.
+    """
+
+    cache_timeout = RESPONSE_TIMEOUT
+
+    def get_response_cache_key(self, request):
+        versions = self.get_content_versions(request)
+        if versions is None:
+            return None
+        scopes = ",".join(f"{scope}={version}" for scope, version in versions.items())
+        return (
+            f"response:{connection.schema_name}:{scopes}:"
+            f"{self.get_request_digest(request)}"
+        )
+
+    def get(self, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return self.uncached_get(request, *args, **kwargs)
+
+        view_name = type(self).__name__
+        data = cache.get(key)
+        if data is not None:
+            record(view_name, hit=True)
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        record(view_name, hit=False)
+        response = self.uncached_get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, timeout=self.cache_timeout)
+        response["X-Cache"] = "MISS"
+        return response
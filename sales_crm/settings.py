@@ -72,6 +72,7 @@ SHARED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sites",  # Required for allauth
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "django_filters",
@@ -139,7 +140,17 @@ TENANT_APPS = [
     "gallery",
     "event",
     "google_adsense",
+    "export",
 ]
+# New tenants are cloned from this pre-migrated schema instead of running
+# every tenant migration at signup (see tenants/golden.py).
+TENANT_BASE_SCHEMA = os.getenv("TENANT_BASE_SCHEMA", "tenant_golden")
+TENANT_CREATION_FAKES_MIGRATIONS = (
+    os.getenv("TENANT_CLONE_PROVISIONING", "True").lower() == "true"
+)
+# Pre-provisioned schemas that signups claim instead of building one.
+TENANT_WARM_POOL_SIZE = int(os.getenv("TENANT_WARM_POOL_SIZE", "5"))
+
 SILENCED_SYSTEM_CHECKS = ["auth.W004"]
 AUTH_CREATE_PERMISSIONS = True
 
@@ -151,6 +162,7 @@ SITE_ID = 1
 
 
 MIDDLEWARE = [
+    "sales_crm.middleware.SearchPathStatsMiddleware",
     "sales_crm.middleware.CustomDomainTenantMiddleware",
     "sales_crm.middleware.RateLimitMiddleware",
     "sales_crm.middleware.SubscriptionMiddleware",
@@ -240,7 +252,8 @@ CACHES = {
 
 DATABASES = {
     "default": {
-        "ENGINE": "django_tenants.postgresql_backend",
+        # django-tenants backend that skips redundant SET search_path.
+        "ENGINE": "sales_crm.postgresql_backend",
         "NAME": os.getenv("DB_NAME", "nepdora_db"),
         "USER": os.getenv("DB_USER", "ratish"),
         "PASSWORD": os.getenv("DB_PASSWORD", "ratish123"),
@@ -254,6 +267,10 @@ DATABASES = {
 
 DATABASE_ROUTERS = ("django_tenants.routers.TenantSyncRouter",)
 
+# Report SET search_path issued/elided counts in an X-Search-Path-Switches
+# response header.
+SEARCH_PATH_STATS_HEADER = DEBUG
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 
@@ -572,6 +589,30 @@ CELERY_BEAT_SCHEDULE = {
         "task": "accounts.tasks.auto_purge_deleted_users",
         "schedule": crontab(hour=0, minute=0),  # Runs every night at midnight
     },
+    "reconcile-tenant-directory-hourly": {
+        "task": "tenants.tasks.reconcile_tenant_directory",
+        "schedule": crontab(minute=15),
+    },
+    "replenish-warm-schema-pool": {
+        "task": "tenants.tasks.replenish_warm_pool_task",
+        "schedule": crontab(minute="*/5"),
+    },
+    "flip-offer-prices": {
+        "task": "product.tasks.flip_offer_prices_task",
+        "schedule": crontab(),  # Every minute
+    },
+    "reconcile-product-prices-daily": {
+        "task": "product.tasks.reconcile_product_prices",
+        "schedule": crontab(hour=1, minute=30),
+    },
+    "purge-expired-exports-daily": {
+        "task": "export.tasks.purge_expired_exports",
+        "schedule": crontab(hour=2, minute=0),
+    },
+    "purge-import-reports-daily": {
+        "task": "product.tasks.purge_import_reports_task",
+        "schedule": crontab(hour=2, minute=30),
+    },
 }
 
 # Aakash SMS Configuration
@@ -0,0 +1,397 @@
+import asyncio
+import os
+import threading
+import warnings
+from types import SimpleNamespace
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django_tenants.utils import schema_context
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from sales_crm import response_cache
+from sales_crm.exports import ExportResponse
+from sales_crm.pagination import KeysetPagination, keyset_filter
+from sales_crm.postgresql_backend import stats as search_path_stats
+from sales_crm.ratelimit import LocalLeases, RateLimiter
+
+try:
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+TEST_REDIS_URL = os.getenv("RATELIMIT_TEST_REDIS_URL")
+
+
+def make_redis_client():
+    """A local Redis when configured, otherwise fakeredis with Lua support."""
+    if TEST_REDIS_URL and redis is not None:
+        client = redis.Redis.from_url(TEST_REDIS_URL)
+        client.flushdb()
+        return client
+    server = fakeredis.FakeServer()
+    return fakeredis.FakeStrictRedis(server=server)
+
+
+def redis_available():
+    if TEST_REDIS_URL and redis is not None:
+        return True
+    if fakeredis is None:
+        return False
+    try:
+        fakeredis.FakeStrictRedis().eval("return 1", 0)
+    except Exception:
+        return False
+    return True
+
+
+class LocalLeasesTests(SimpleTestCase):
+    def test_spends_leased_tokens_then_asks_redis(self):
+        leases = LocalLeases()
+        leases.grant("k", 2)
+
+        self.assertTrue(leases.take("k"))
+        self.assertTrue(leases.take("k"))
+        self.assertIsNone(leases.take("k"))
+
+    def test_block_is_answered_locally(self):
+        leases = LocalLeases()
+        leases.block("k", 5000)
+        self.assertIs(leases.take("k"), False)
+
+    def test_leases_expire(self):
+        leases = LocalLeases(lease_ttl=1)
+        with patch("sales_crm.ratelimit.time.monotonic", return_value=10):
+            leases.grant("k", 5)
+        with patch("sales_crm.ratelimit.time.monotonic", return_value=11):
+            self.assertIsNone(leases.take("k"))
+
+
+@skipUnless(redis_available(), "needs fakeredis[lua] or RATELIMIT_TEST_REDIS_URL")
+class RateLimiterTests(SimpleTestCase):
+    def test_blocks_after_limit_and_stays_blocked(self):
+        limiter = RateLimiter(
+            limit=5, window=60, block_time=300, lease_size=1, client=make_redis_client()
+        )
+
+        results = [limiter.allow("tenant:1.2.3.4") for _ in range(7)]
+
+        self.assertEqual(results, [True] * 5 + [False] * 2)
+
+    def test_keys_are_isolated(self):
+        limiter = RateLimiter(
+            limit=1, window=60, block_time=300, lease_size=1, client=make_redis_client()
+        )
+
+        self.assertTrue(limiter.allow("a:1.1.1.1"))
+        self.assertTrue(limiter.allow("b:1.1.1.1"))
+        self.assertFalse(limiter.allow("a:1.1.1.1"))
+
+    def test_pre_filter_skips_redis_far_below_limit(self):
+        client = make_redis_client()
+        limiter = RateLimiter(
+            limit=1000, window=60, block_time=300, lease_size=10, client=client
+        )
+
+        with patch.object(
+            limiter, "allow_remote", wraps=limiter.allow_remote
+        ) as remote:
+            for _ in range(30):
+                self.assertTrue(limiter.allow("tenant:9.9.9.9"))
+
+        self.assertEqual(remote.call_count, 3)
+
+    def test_concurrent_hits_never_exceed_limit(self):
+        client = make_redis_client()
+        limit = 200
+        allowed = []
+        lock = threading.Lock()
+
+        def worker():
+            # A separate limiter per thread stands in for separate processes.
+            limiter = RateLimiter(
+                limit=limit, window=60, block_time=300, lease_size=10, client=client
+            )
+            count = sum(limiter.allow("tenant:5.5.5.5") for _ in range(50))
+            with lock:
+                allowed.append(count)
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLessEqual(sum(allowed), limit)
+        self.assertGreater(sum(allowed), 0)
+
+    def test_concurrent_hits_without_leases_are_exact(self):
+        client = make_redis_client()
+        limiter = RateLimiter(
+            limit=100, window=60, block_time=300, lease_size=1, client=client
+        )
+        allowed = []
+        lock = threading.Lock()
+
+        def worker():
+            count = sum(limiter.allow_remote("tenant:6.6.6.6") for _ in range(25))
+            with lock:
+                allowed.append(count)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(allowed), 100)
+
+
+class SearchPathStatsTests(SimpleTestCase):
+    def test_counts_against_current_request_only(self):
+        first = search_path_stats.track_request()
+        search_path_stats.record(issued=True)
+        search_path_stats.record(issued=False)
+
+        second = search_path_stats.track_request()
+        search_path_stats.record(issued=False)
+
+        self.assertEqual((first.issued, first.elided), (1, 1))
+        self.assertEqual((second.issued, second.elided), (0, 1))
+        self.assertEqual(second.as_header(), "issued=0;elided=1")
+
+
+class SearchPathElisionTests(TransactionTestCase):
+    def setUp(self):
+        if not hasattr(connection, "_active_search_path"):
+            self.skipTest("Needs the sales_crm.postgresql_backend engine")
+        connection.set_schema_to_public()
+
+    def set_statements(self, queries):
+        return [q for q in queries if q["sql"].startswith("SET search_path")]
+
+    def test_switch_to_active_schema_is_elided(self):
+        connection.cursor().execute("SELECT 1")
+        stats = search_path_stats.track_request()
+
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(3):
+                with schema_context("public"):
+                    connection.cursor().execute("SELECT 1")
+
+        self.assertEqual(self.set_statements(ctx.captured_queries), [])
+        self.assertEqual(stats.issued, 0)
+        self.assertGreaterEqual(stats.elided, 3)
+
+    def test_changed_schema_issues_set(self):
+        connection.cursor().execute("SELECT 1")
+
+        with CaptureQueriesContext(connection) as ctx:
+            with schema_context("elision_test"):
+                connection.cursor().execute("SELECT 1")
+            connection.cursor().execute("SELECT 1")
+
+        # Into the other schema and back to public.
+        self.assertEqual(len(self.set_statements(ctx.captured_queries)), 2)
+
+    def test_rollback_forgets_active_search_path(self):
+        connection.cursor().execute("SELECT 1")
+        try:
+            with transaction.atomic():
+                connection.set_schema("elision_test")
+                connection.cursor().execute("SELECT 1")
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        connection.set_schema_to_public()
+
+        with CaptureQueriesContext(connection) as ctx:
+            connection.cursor().execute("SELECT 1")
+
+        self.assertEqual(len(self.set_statements(ctx.captured_queries)), 1)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = patch.object(
+            response_cache, "connection", SimpleNamespace(schema_name="t1")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.calls = 0
+        test = self
+
+        class CountingView(response_cache.CachedResponseMixin, APIView):
+            cache_scopes = ("faq",)
+            authentication_classes = []
+            permission_classes = []
+
+            def uncached_get(self, request):
+                test.calls += 1
+                return Response({"calls": test.calls})
+
+        self.view = CountingView.as_view()
+        self.factory = APIRequestFactory()
+
+    def test_query_string_is_normalized(self):
+        hits = response_cache.stats().get("CountingView", {}).get("hits", 0)
+        first = self.view(self.factory.get("/faq/?b=2&a=1"))
+        second = self.view(self.factory.get("/faq/?a=1&b=2"))
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, {"calls": 1})
+        self.assertEqual(response_cache.stats()["CountingView"]["hits"], hits + 1)
+
+    def test_version_bump_invalidates(self):
+        self.view(self.factory.get("/faq/"))
+        response_cache.bump_content_version("faq", "t1")
+        response = self.view(self.factory.get("/faq/"))
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data, {"calls": 2})
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ConditionalGetTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = patch.object(
+            response_cache, "connection", SimpleNamespace(schema_name="t1")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.calls = 0
+        test = self
+
+        class PageView(
+            response_cache.ConditionalGetMixin,
+            response_cache.CachedResponseMixin,
+            APIView,
+        ):
+            cache_scopes = ("website",)
+            authentication_classes = []
+            permission_classes = []
+
+            def uncached_get(self, request):
+                test.calls += 1
+                return Response({"calls": test.calls})
+
+        self.view = PageView.as_view()
+        self.factory = APIRequestFactory()
+
+    def test_matching_etag_is_not_modified(self):
+        first = self.view(self.factory.get("/pages/"))
+        second = self.view(
+            self.factory.get("/pages/", HTTP_IF_NONE_MATCH=first["ETag"])
+        )
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(self.calls, 1)
+
+    def test_version_bump_changes_etag(self):
+        first = self.view(self.factory.get("/pages/"))
+        response_cache.bump_content_version("website", "t1")
+        second = self.view(
+            self.factory.get("/pages/", HTTP_IF_NONE_MATCH=first["ETag"])
+        )
+
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second.data, {"calls": 2})
+
+
+class KeysetPaginationTests(SimpleTestCase):
+    class Listing:
+        """Rows 1..25, newest (highest) first, paging itself by keyset."""
+
+        keyset_ordering = ["-pk"]
+
+        def keyset_page(self, after, limit):
+            rows = range(25, 0, -1)
+            if after is not None:
+                rows = [pk for pk in rows if pk < after[0]]
+            return [([pk], pk) for pk in list(rows)[:limit]]
+
+    def paginate(self, url):
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get(url))
+        page = paginator.paginate_queryset(self.Listing(), request)
+        return paginator, page
+
+    def test_cursor_walks_every_row_once(self):
+        url, seen = "/items/?cursor=", []
+        while url:
+            paginator, page = self.paginate(url)
+            seen += page
+            url = paginator.get_next_link()
+
+        self.assertEqual(seen, list(range(25, 0, -1)))
+        self.assertNotIn("count", paginator.get_paginated_response(page).data)
+
+    def test_cursor_from_other_ordering_is_rejected(self):
+        paginator, _ = self.paginate("/items/?cursor=")
+        cursor = paginator.encode_cursor([10])
+        self.Listing.keyset_ordering = ["created_at", "pk"]
+        self.addCleanup(setattr, self.Listing, "keyset_ordering", ["-pk"])
+
+        with self.assertRaises(NotFound):
+            self.paginate(f"/items/?cursor={cursor}")
+
+    def test_filter_handles_descending_nulls(self):
+        q = keyset_filter(["-published_at", "-pk"], [None, 7], {"published_at"})
+
+        self.assertEqual(
+            q,
+            Q(published_at__isnull=False)
+            | (Q(published_at__isnull=True) & Q(pk__lt=7)),
+        )
+
+
+class ExportResponseTests(SimpleTestCase):
+    def test_asgi_iteration_pulls_one_block_at_a_time(self):
+        produced = []
+
+        def blocks():
+            for i in range(3):
+                produced.append(i)
+                yield f"block {i}".encode()
+
+        async def consume(response):
+            received = []
+            async for block in response:
+                # Nothing beyond the block being sent has been produced.
+                self.assertEqual(len(produced), len(received) + 1)
+                received.append(block)
+            return received
+
+        with warnings.catch_warnings():
+            # Django warns when it has to drain a sync iterator into a list.
+            warnings.simplefilter("error")
+            received = asyncio.run(consume(ExportResponse(blocks())))
+
+        self.assertEqual(received, [b"block 0", b"block 1", b"block 2"])
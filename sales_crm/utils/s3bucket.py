@@ -11,3 +11,15 @@ class PublicMediaStorage(S3Boto3Storage):
     @property
     def querystring_auth(self):
         return False
+
+
+class PrivateMediaStorage(S3Boto3Storage):
+    """Files only reachable through short-lived signed URLs (exports)."""
+
+    location = "private/nepdora/"
+    default_acl = "private"
+    file_overwrite = False
+    custom_domain = None  # the CDN domain cannot serve signed URLs
+    querystring_auth = True
+    querystring_expire = 15 * 60
+    signature_version = "s3v4"
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from sales_crm.authentication import TenantJWTAuthentication
+from sales_crm.response_cache import CachedResponseMixin
 
 from .models import Service, ServiceCategory
 from .serializers import (
@@ -82,7 +83,7 @@ class ServiceFilterSet(django_filters.FilterSet):
 # ─── Service ──────────────────────────────────────────────────────────────────
 
 
-class ServiceListCreateView(generics.ListCreateAPIView):
+class ServiceListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     serializer_class = ServiceSerializer
     pagination_class = CustomPagination
     filter_backends = [
@@ -115,7 +116,9 @@ class ServiceListCreateView(generics.ListCreateAPIView):
         return ServiceSerializer
 
 
-class ServiceRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class ServiceRetrieveUpdateDestroyView(
+    CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = SERVICE_QS
     serializer_class = ServiceSerializer
     lookup_field = "slug"
@@ -134,7 +137,7 @@ class ServiceRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
 # ─── Service Category ─────────────────────────────────────────────────────────
 
 
-class ServiceCategoryListCreateView(generics.ListCreateAPIView):
+class ServiceCategoryListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     queryset = SERVICE_CATEGORY_QS
     serializer_class = ServiceCategorySerializer
     pagination_class = CustomPagination
@@ -142,7 +145,9 @@ class ServiceCategoryListCreateView(generics.ListCreateAPIView):
     search_fields = ["name"]
 
 
-class ServiceCategoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class ServiceCategoryRetrieveUpdateDestroyView(
+    CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = SERVICE_CATEGORY_QS
     serializer_class = ServiceCategorySerializer
     lookup_field = "slug"
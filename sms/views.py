@@ -1,4 +1,5 @@
-from django_tenants.utils import schema_context
+from dataclasses import dataclass
+
 from rest_framework import generics, permissions, status
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
@@ -10,6 +11,7 @@ from order.models import Order
 from sales_crm.authentication import TenantJWTAuthentication
 from sales_crm.pagination import CustomPagination
 from sms.serializers import SMSPurchaseListSerializer
+from tenants.fanout import FanOutTimeout, fan_out
 from tenants.models import Client
 
 from .models import SMSSendHistory, SMSSetting
@@ -225,6 +227,14 @@ class SMSBalanceView(APIView):
         })
 
 
+@dataclass
+class TenantSMSSettingRow:
+    schema_name: str
+    sms_enabled: bool
+    sms_credit: int
+    delivery_sms_enabled: bool
+
+
 class AllTenantSMSSettingView(APIView):
     """
     Get SMS settings for all tenants.
@@ -246,15 +256,33 @@ class AllTenantSMSSettingView(APIView):
         data = []
         target_tenants = page if page is not None else tenants
 
+        # Read every tenant's singleton in one statement; tenants that have
+        # never saved their settings fall back to the model defaults.
+        setting_table = SMSSetting._meta.db_table
+        try:
+            rows = fan_out(
+                "SELECT sms_enabled, sms_credit, delivery_sms_enabled "
+                f"FROM {{schema}}.{setting_table} WHERE id = 1",
+                [tenant.schema_name for tenant in target_tenants],
+                row_type=TenantSMSSettingRow,
+                requires=[setting_table],
+            )
+        except FanOutTimeout:
+            return Response(
+                {"error": "Reading tenant SMS settings timed out. Try again."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        settings_by_schema = {row.schema_name: row for row in rows}
+        default_setting = SMSSetting()
+
         for tenant in target_tenants:
-            with schema_context(tenant.schema_name):
-                setting = SMSSetting.load()
-                data.append({
-                    "tenant": tenant,
-                    "sms_enabled": setting.sms_enabled,
-                    "sms_credit": setting.sms_credit,
-                    "delivery_sms_enabled": setting.delivery_sms_enabled,
-                })
+            setting = settings_by_schema.get(tenant.schema_name, default_setting)
+            data.append({
+                "tenant": tenant,
+                "sms_enabled": setting.sms_enabled,
+                "sms_credit": setting.sms_credit,
+                "delivery_sms_enabled": setting.delivery_sms_enabled,
+            })
 
         serializer = TenantSMSSettingSerializer(data, many=True)
 
@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import argparse
 import os
 
 import django
@@ -12,47 +13,96 @@ django.setup()
 # ---------------------------
 # Imports
 # ---------------------------
-from django.db import close_old_connections
-from django_tenants.utils import schema_context
+import json
 
 from facebook.models import Facebook
 from facebook.utils import (
     sync_conversations_from_facebook,
     sync_messages_for_conversation,
 )
+from tenants.jobs import run_per_tenant
 from tenants.models import FacebookPageTenantMap
 
 
 # ---------------------------
 # Sync function
 # ---------------------------
-def sync_all_tenants():
-    for page_map in FacebookPageTenantMap.objects.all():
-        tenant = page_map.tenant
-        print(
-            f"🔄 Processing tenant: {tenant.schema_name} | Page: {page_map.page_name}"
-        )
+def sync_tenant_pages(schema_name, dry_run=False):
+    """Sync every mapped Facebook page of one tenant (runs in its schema)."""
+    page_ids = list(
+        FacebookPageTenantMap.objects.filter(
+            tenant__schema_name=schema_name
+        ).values_list("page_id", flat=True)
+    )
+    pages = Facebook.objects.filter(page_id__in=page_ids, is_enabled=True)
 
-        # Activate tenant schema
-        with schema_context(tenant.schema_name):
-            try:
-                fb_page = Facebook.objects.get(
-                    page_id=page_map.page_id, is_enabled=True
-                )
-                sync_conversations_from_facebook(fb_page)
-                # Optional: sync messages for all conversations of this page
-                for conv in fb_page.conversations.all():
-                    sync_messages_for_conversation(conv)
-            except Facebook.DoesNotExist:
-                print(f"⚠️ Facebook page not found in tenant {tenant.schema_name}")
-            finally:
-                close_old_connections()
+    missing = set(page_ids) - set(pages.values_list("page_id", flat=True))
+    for page_id in missing:
+        print(f"⚠️ Facebook page {page_id} not found in tenant {schema_name}")
 
-    print("✅ All tenants synced.")
+    if dry_run:
+        return {"pages": pages.count(), "missing": len(missing)}
+
+    synced = 0
+    for fb_page in pages:
+        sync_conversations_from_facebook(fb_page)
+        # Optional: sync messages for all conversations of this page
+        for conv in fb_page.conversations.all():
+            sync_messages_for_conversation(conv)
+        synced += 1
+    return {"pages": synced, "missing": len(missing)}
+
+
+def sync_all_tenants(max_workers=4, rate_limit=2, dry_run=False, checkpoint=None):
+    schemas = list(
+        FacebookPageTenantMap.objects.values_list(
+            "tenant__schema_name", flat=True
+        ).distinct()
+    )
+
+    def progress(done, total, result):
+        icon = "✅" if result.status == "ok" else "❌"
+        detail = result.result if result.status == "ok" else result.error
+        print(f"{icon} [{done}/{total}] {result.schema_name}: {detail}")
+
+    report = run_per_tenant(
+        sync_tenant_pages,
+        schemas=schemas,
+        name="sync_facebook",
+        max_workers=max_workers,
+        # Facebook's Graph API is rate limited per app; pace tenant starts.
+        rate_limit=rate_limit,
+        checkpoint=checkpoint,
+        resume=bool(checkpoint),
+        dry_run=dry_run,
+        progress=progress,
+    )
+
+    print(
+        f"✅ All tenants synced: {len(report.succeeded)} ok, "
+        f"{len(report.failed)} failed in {report.elapsed:.1f}s"
+    )
+    return report
 
 
 # ---------------------------
 # Entry point
 # ---------------------------
 if __name__ == "__main__":
-    sync_all_tenants()
+    parser = argparse.ArgumentParser(description="Sync Facebook pages for all tenants")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate-limit", type=float, default=2)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--checkpoint")
+    parser.add_argument("--report")
+    args = parser.parse_args()
+
+    report = sync_all_tenants(
+        max_workers=args.workers,
+        rate_limit=args.rate_limit,
+        dry_run=args.dry_run,
+        checkpoint=args.checkpoint,
+    )
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report.as_dict(), f, indent=2, default=str)
@@ -3,6 +3,7 @@ from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 
 from sales_crm.authentication import TenantJWTAuthentication
+from sales_crm.response_cache import CachedResponseMixin
 
 from .models import TeamMember, TeamMemberCategory
 from .serializers import TeamMemberCategorySerializer, TeamMemberSerializer
@@ -10,7 +11,7 @@ from .serializers import TeamMemberCategorySerializer, TeamMemberSerializer
 # Create your views here.
 
 
-class TeamMemberCategoryListCreateView(generics.ListCreateAPIView):
+class TeamMemberCategoryListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     queryset = TeamMemberCategory.objects.all()
     serializer_class = TeamMemberCategorySerializer
 
@@ -44,7 +45,7 @@ class TeamMemberFilterSet(django_filters.FilterSet):
         }
 
 
-class TeamMemberListCreateView(generics.ListCreateAPIView):
+class TeamMemberListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     queryset = TeamMember.objects.all()
     serializer_class = TeamMemberSerializer
     filter_backends = [django_filters.DjangoFilterBackend]
@@ -5,6 +5,7 @@ from .models import (
     Client,
     Domain,
     FacebookPageTenantMap,
+    TenantProvisioning,
     TemplateCategory,
     TemplateSubCategory,
 )
@@ -92,3 +93,15 @@ class FacebookPageTenantMapAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         connection.set_schema_to_public()
         return super().get_queryset(request)
+
+
+@admin.register(TenantProvisioning)
+class TenantProvisioningAdmin(admin.ModelAdmin):
+    list_display = ("schema_name", "owner", "status", "used_warm_schema", "created_at")
+    list_filter = ["status", "used_warm_schema"]
+    search_fields = ["schema_name", "store_name", "owner__email"]
+    readonly_fields = ["tenant", "error", "created_at", "updated_at"]
+
+    def get_queryset(self, request):
+        connection.set_schema_to_public()
+        return super().get_queryset(request)
@@ -0,0 +1,170 @@
+"""
+Two-tier tenant resolution cache.
+
+Tier 1 is a small per-process LRU of fully hydrated ``Client`` objects keyed
+by normalized hostname. Tier 2 is the shared Redis entry
+``tenant_domain:{host}`` which holds the same pickled ``Client``.
+
+Every process subscribes to ``TENANT_CACHE_CHANNEL``; when a ``Client`` or
+``Domain`` row changes, ``invalidate_tenant`` drops the Redis entries and
+publishes the tenant id so every process evicts its local copy.
+"""
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+TENANT_CACHE_CHANNEL = "tenant_cache:invalidate"
+PUBLIC_TENANT_KEY = "__public__"
+INVALIDATE_ALL = "*"
+
+
+def tenant_domain_key(hostname):
+    return f"tenant_domain:{hostname}"
+
+
+class LocalTenantCache:
+    """
+    Thread-safe LRU of Client objects with a TTL safety net.
+
+    The TTL bounds staleness if a pub/sub invalidation is ever missed
+    (e.g. while Redis was unreachable).
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            tenant, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+        # Hand out a copy so a view mutating request.tenant never leaks
+        # into other requests sharing the cached instance.
+        return copy.copy(tenant)
+
+    def set(self, key, tenant):
+        with self._lock:
+            self._entries[key] = (copy.copy(tenant), time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict_tenant(self, tenant_id):
+        with self._lock:
+            stale = [
+                key
+                for key, (tenant, _) in self._entries.items()
+                if str(tenant.pk) == str(tenant_id)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+local_tenant_cache = LocalTenantCache()
+
+_subscriber_lock = threading.Lock()
+_subscriber_thread = None
+
+
+def _handle_invalidation(message):
+    data = message.get("data")
+    if isinstance(data, bytes):
+        data = data.decode()
+
+    if data == INVALIDATE_ALL:
+        local_tenant_cache.clear()
+    else:
+        local_tenant_cache.evict_tenant(data)
+
+
+def _handle_subscriber_error(exc, pubsub, worker):
+    # Messages may have been lost while disconnected; start from scratch.
+    logger.warning("Tenant cache subscriber error: %s", exc)
+    local_tenant_cache.clear()
+    time.sleep(1)
+
+
+def start_invalidation_listener():
+    """
+    Start the per-process pub/sub listener (idempotent).
+
+    Failures are logged and swallowed: without a listener the local cache
+    still expires entries after ``LocalTenantCache.ttl`` seconds.
+    """
+    global _subscriber_thread
+
+    with _subscriber_lock:
+        if _subscriber_thread is not None and _subscriber_thread.is_alive():
+            return
+
+        try:
+            from django_redis import get_redis_connection
+
+            pubsub = get_redis_connection("default").pubsub(
+                ignore_subscribe_messages=True
+            )
+            pubsub.subscribe(**{TENANT_CACHE_CHANNEL: _handle_invalidation})
+            _subscriber_thread = pubsub.run_in_thread(
+                sleep_time=1,
+                daemon=True,
+                exception_handler=_handle_subscriber_error,
+            )
+        except Exception as e:
+            logger.warning("Could not start tenant cache listener: %s", e)
+            _subscriber_thread = None
+
+
+def publish_invalidation(tenant_id):
+    try:
+        from django_redis import get_redis_connection
+
+        get_redis_connection("default").publish(TENANT_CACHE_CHANNEL, str(tenant_id))
+    except Exception as e:
+        logger.warning("Could not publish tenant cache invalidation: %s", e)
+
+
+def invalidate_tenant(tenant_id, hostnames=()):
+    """
+    Drop every cached copy of a tenant.
+
+    ``hostnames`` are the domains whose shared Redis entries must go; the
+    www-less variant is removed as well since lookups are normalized.
+    """
+    keys = set()
+    for hostname in hostnames:
+        if not hostname:
+            continue
+        hostname = hostname.strip().lower()
+        keys.add(tenant_domain_key(hostname))
+        keys.add(tenant_domain_key(hostname.replace("www.", "")))
+
+    if keys:
+        cache.delete_many(list(keys))
+
+    local_tenant_cache.evict_tenant(tenant_id)
+    publish_invalidation(tenant_id)
@@ -0,0 +1,190 @@
+"""
+Keeps the public-schema TenantDirectory in sync with tenant data.
+
+All tenant-side values are read with one fan-out statement, so refreshing
+a single tenant and reconciling every tenant share the same code path.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.core.cache import cache
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from payment_gateway.models import Payment
+from product.models import Product
+from tenants.fanout import fan_out
+from tenants.models import Client, Domain, TenantDirectory
+from website.models import SiteConfig
+
+logger = logging.getLogger(__name__)
+
+REFRESH_DEBOUNCE_SECONDS = 5
+EXCLUDED_DOMAIN_PARTS = ("nepdora.baliyotech.com", "localhost")
+
+
+@dataclass
+class DirectoryRow:
+    schema_name: str
+    business_name: str | None
+    business_details: str | None
+    logo: str | None
+    address: str | None
+    enable_pasalbiz: bool
+    product_count: int
+    last_catalog_change: datetime | None
+    payment_enabled: bool
+
+
+def directory_sql():
+    config_table = SiteConfig._meta.db_table
+    product_table = Product._meta.db_table
+    payment_table = Payment._meta.db_table
+
+    sql = (
+        "SELECT c.business_name, c.business_details, c.logo, c.address, "
+        "COALESCE(c.enable_pasalbiz, false) AS enable_pasalbiz, "
+        "p.product_count, p.last_catalog_change, "
+        f"EXISTS (SELECT 1 FROM {{schema}}.{payment_table} WHERE is_enabled) "
+        "AS payment_enabled "
+        "FROM (SELECT 1) AS one "
+        f"LEFT JOIN LATERAL (SELECT * FROM {{schema}}.{config_table} "
+        "ORDER BY id LIMIT 1) AS c ON true "
+        "CROSS JOIN LATERAL (SELECT COUNT(*) AS product_count, "
+        "MAX(updated_at) AS last_catalog_change "
+        f"FROM {{schema}}.{product_table} WHERE status = %s) AS p"
+    )
+    return sql, ["active"], [config_table, product_table, payment_table]
+
+
+def select_storefront_domain(schema_name, domains):
+    """
+    Pick the domain a storefront should be reached on.
+
+    ``domains`` is a list of ``(domain, is_primary)``. A custom domain
+    (primary first) wins over the default ``<schema>.nepdora.com`` one.
+    """
+    nepdora_default = f"{schema_name.lower()}.nepdora.com"
+    other_domain = None
+    fallback_domain = None
+
+    for domain, is_primary in domains:
+        dom = domain.lower()
+        if any(part in dom for part in EXCLUDED_DOMAIN_PARTS):
+            continue
+
+        if dom == nepdora_default:
+            fallback_domain = domain
+        elif is_primary:
+            other_domain = domain
+            break
+        elif not other_domain:
+            other_domain = domain
+
+    return other_domain or fallback_domain
+
+
+def refresh_tenant_directory(schema_names=None, timeout=60):
+    """
+    Recompute directory rows for ``schema_names`` (every tenant when None).
+
+    Rows of those tenants that produced none, because the tenant is gone or
+    its schema lacks the tables, are deleted; a full refresh also deletes
+    rows of tenants that no longer exist. Returns the number of rows
+    written.
+    """
+    with schema_context(get_public_schema_name()):
+        tenants = Client.objects.exclude(schema_name=get_public_schema_name())
+        stale = TenantDirectory.objects.all()
+        if schema_names is not None:
+            schema_names = list(schema_names)
+            tenants = tenants.filter(schema_name__in=schema_names)
+            stale = stale.filter(tenant__schema_name__in=schema_names)
+        tenants = {t.schema_name: t for t in tenants.only("id", "schema_name")}
+
+        rows = []
+        if tenants:
+            sql, params, required_tables = directory_sql()
+            rows = fan_out(
+                sql,
+                list(tenants),
+                params=params,
+                row_type=DirectoryRow,
+                requires=required_tables,
+                timeout=timeout,
+            )
+        stale.exclude(
+            tenant_id__in=[tenants[row.schema_name].id for row in rows]
+        ).delete()
+        if not rows:
+            return 0
+
+        domains = defaultdict(list)
+        for tenant_id, domain, is_primary in Domain.objects.filter(
+            tenant_id__in=[t.id for t in tenants.values()]
+        ).values_list("tenant_id", "domain", "is_primary"):
+            domains[tenant_id].append((domain, is_primary))
+
+        logo_storage = SiteConfig._meta.get_field("logo").storage
+        entries = []
+        for row in rows:
+            tenant = tenants[row.schema_name]
+            entries.append(
+                TenantDirectory(
+                    tenant=tenant,
+                    store_name=row.business_name,
+                    store_description=row.business_details,
+                    store_logo=logo_storage.url(row.logo) if row.logo else None,
+                    seller_location=row.address,
+                    enable_pasalbiz=row.enable_pasalbiz,
+                    product_count=row.product_count,
+                    payment_enabled=row.payment_enabled,
+                    last_catalog_change=row.last_catalog_change,
+                    primary_domain=select_storefront_domain(
+                        row.schema_name, domains[tenant.id]
+                    ),
+                )
+            )
+
+        TenantDirectory.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=["tenant"],
+            update_fields=[
+                "store_name",
+                "store_description",
+                "store_logo",
+                "seller_location",
+                "enable_pasalbiz",
+                "product_count",
+                "payment_enabled",
+                "last_catalog_change",
+                "primary_domain",
+                "updated_at",
+            ],
+        )
+        return len(entries)
+
+
+def schedule_directory_refresh(schema_name):
+    """
+    Queue a debounced refresh so a burst of catalog writes costs one task.
+    """
+    from tenants.tasks import refresh_tenant_directory_task
+
+    if not cache.add(
+        f"tenant_directory:pending:{schema_name}",
+        True,
+        timeout=REFRESH_DEBOUNCE_SECONDS * 12,
+    ):
+        return
+
+    try:
+        refresh_tenant_directory_task.apply_async(
+            args=[schema_name], countdown=REFRESH_DEBOUNCE_SECONDS
+        )
+    except Exception as e:
+        # The periodic reconciliation will pick the change up.
+        logger.warning("Could not queue directory refresh for %s: %s", schema_name, e)
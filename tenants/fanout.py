@@ -0,0 +1,193 @@
+"""
+Cross-tenant fan-out queries.
+
+Runs one per-tenant SQL aggregate across many schemas as a single
+``UNION ALL`` statement (split into batches for very large tenant counts)
+instead of entering ``schema_context`` once per tenant from Python.
+
+The per-tenant SQL is a template whose tables are qualified with
+``{schema}``::
+
+    rows = fan_out(
+        "SELECT COUNT(*) AS total FROM {schema}.product_product",
+        schemas,
+        requires=["product_product"],
+    )
+
+Every row comes back tagged with ``schema_name``. Schemas missing any of
+the ``requires`` tables (e.g. a half-migrated tenant) are skipped rather
+than failing the whole statement.
+"""
+
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, is_dataclass
+
+from django.db import OperationalError, connection, connections, transaction
+
+SCHEMA_NAME_RE = re.compile(r"^[A-Za-z0-9_\-]{1,63}$")
+QUERY_CANCELED = "57014"
+
+
+class FanOutTimeout(Exception):
+    """The fan-out query did not finish within its timeout."""
+
+
+def _quote_schema(schema_name):
+    if not SCHEMA_NAME_RE.match(schema_name):
+        raise ValueError(f"Invalid schema name: {schema_name!r}")
+    return connection.ops.quote_name(schema_name)
+
+
+def schemas_with_tables(schemas, tables, using="default"):
+    """Return the subset of ``schemas`` that contain every table in ``tables``."""
+    schemas = list(schemas)
+    tables = list(tables)
+    if not schemas or not tables:
+        return schemas
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT table_schema
+            FROM information_schema.tables
+            WHERE table_schema = ANY(%s) AND table_name = ANY(%s)
+            GROUP BY table_schema
+            HAVING COUNT(DISTINCT table_name) = %s
+            """,
+            [schemas, tables, len(tables)],
+        )
+        present = {row[0] for row in cursor.fetchall()}
+
+    return [schema for schema in schemas if schema in present]
+
+
+def build_union(sql, schemas, params=None):
+    """Build the ``UNION ALL`` statement and its flattened parameters."""
+    params = list(params or [])
+    branches = []
+    all_params = []
+
+    for schema in schemas:
+        branch = sql.format(schema=_quote_schema(schema))
+        branches.append(f"SELECT %s AS schema_name, t.* FROM ({branch}) AS t")
+        all_params.append(schema)
+        all_params.extend(params)
+
+    return "\nUNION ALL\n".join(branches), all_params
+
+
+def _make_rows(cursor, row_type):
+    columns = [col[0] for col in cursor.description]
+
+    if row_type is None:
+        row_type = namedtuple("FanOutRow", columns)
+        return [row_type(*row) for row in cursor.fetchall()]
+
+    if is_dataclass(row_type):
+        accepted = {f.name for f in fields(row_type)}
+        columns_kept = [c for c in columns if c in accepted]
+        indexes = [columns.index(c) for c in columns_kept]
+        return [
+            row_type(**{c: row[i] for c, i in zip(columns_kept, indexes)})
+            for row in cursor.fetchall()
+        ]
+
+    return [row_type(**dict(zip(columns, row))) for row in cursor.fetchall()]
+
+
+def _run_batch(statement, params, row_type, timeout_ms, using):
+    conn = connections[using]
+    try:
+        with transaction.atomic(using=using), conn.cursor() as cursor:
+            if timeout_ms is not None:
+                cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, true)",
+                    [str(max(1, int(timeout_ms)))],
+                )
+            cursor.execute(statement, params)
+            return _make_rows(cursor, row_type)
+    except OperationalError as e:
+        if getattr(e.__cause__, "pgcode", None) == QUERY_CANCELED:
+            raise FanOutTimeout(str(e)) from e
+        raise
+
+
+def _run_batch_in_thread(statement, params, row_type, timeout_ms, using):
+    try:
+        return _run_batch(statement, params, row_type, timeout_ms, using)
+    finally:
+        connections[using].close()
+
+
+def fan_out(
+    sql,
+    schemas,
+    params=None,
+    row_type=None,
+    requires=(),
+    timeout=10,
+    batch_size=200,
+    max_workers=1,
+    using="default",
+):
+    """
+    Run ``sql`` once per schema and return the combined, schema-tagged rows.
+
+    :param sql: per-tenant SELECT with tables written as ``{schema}.table``.
+    :param schemas: schema names to query.
+    :param params: parameters for one branch; repeated for every schema.
+    :param row_type: dataclass (or any callable taking column kwargs) used to
+        build each row; it must accept ``schema_name``. Defaults to a
+        namedtuple of the selected columns.
+    :param requires: tables that must exist in a schema for it to be queried.
+    :param timeout: overall budget in seconds for the whole call.
+    :param batch_size: schemas per ``UNION ALL`` statement.
+    :param max_workers: >1 runs batches in parallel on separate connections.
+    """
+    schemas = [s for s in schemas if s]
+    if requires:
+        schemas = schemas_with_tables(schemas, requires, using=using)
+    if not schemas:
+        return []
+
+    batches = [
+        build_union(sql, schemas[i : i + batch_size], params)
+        for i in range(0, len(schemas), batch_size)
+    ]
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def remaining_ms():
+        if deadline is None:
+            return None
+        left = (deadline - time.monotonic()) * 1000
+        if left <= 0:
+            raise FanOutTimeout("Fan-out query exceeded its timeout")
+        return left
+
+    rows = []
+    if max_workers <= 1 or len(batches) == 1:
+        for statement, batch_params in batches:
+            rows.extend(
+                _run_batch(statement, batch_params, row_type, remaining_ms(), using)
+            )
+        return rows
+
+    def run_in_thread(statement, batch_params):
+        # What is left of the budget when the batch starts, not when it
+        # was queued behind the others.
+        return _run_batch_in_thread(
+            statement, batch_params, row_type, remaining_ms(), using
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(run_in_thread, statement, batch_params)
+            for statement, batch_params in batches
+        ]
+        for future in futures:
+            rows.extend(future.result())
+
+    return rows
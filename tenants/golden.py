@@ -0,0 +1,137 @@
+"""
+Golden-schema provisioning.
+
+With ``TENANT_CREATION_FAKES_MIGRATIONS`` on, django-tenants creates a new
+tenant by cloning ``TENANT_BASE_SCHEMA`` (tables, sequences and rows) and
+then only fakes the migration records, instead of running every tenant
+migration during signup.
+
+A clone is only correct while the golden schema is at the current
+migration head, so ``ensure_golden_schema`` checks it before every clone
+and migrates (or rebuilds from scratch) when it has drifted.
+"""
+
+import logging
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django_tenants.utils import get_tenant_base_schema, schema_context, schema_exists
+
+from tenants.schema_migrations import applied_migrations, migration_targets
+
+logger = logging.getLogger(__name__)
+
+REBUILD_LOCK_KEY = "golden_schema:rebuild"
+REBUILD_LOCK_TIMEOUT = 30 * 60
+
+
+def golden_schema_name():
+    return get_tenant_base_schema()
+
+
+def clone_provisioning_enabled():
+    return bool(
+        getattr(settings, "TENANT_CREATION_FAKES_MIGRATIONS", False)
+        and golden_schema_name()
+    )
+
+
+def golden_schema_status():
+    """
+    Return ``(state, details)`` where state is ``"ready"``, ``"missing"``,
+    ``"behind"`` (pending migrations) or ``"stale"`` (applied migrations
+    that no longer exist on disk).
+    """
+    schema_name = golden_schema_name()
+    if not schema_exists(schema_name):
+        return "missing", []
+
+    _, tenant_target = migration_targets()
+    applied = applied_migrations([schema_name])[schema_name]
+
+    unknown = tenant_target.unknown(applied)
+    if unknown:
+        return "stale", unknown
+
+    pending = tenant_target.pending(applied)
+    if pending:
+        return "behind", pending
+
+    return "ready", []
+
+
+@contextmanager
+def _rebuild_lock():
+    # Only one process rebuilds; the others wait and then re-check.
+    try:
+        lock = cache.lock(REBUILD_LOCK_KEY, timeout=REBUILD_LOCK_TIMEOUT)
+    except AttributeError:
+        # Cache backend without locks (e.g. local memory in tests).
+        yield
+        return
+
+    with lock:
+        yield
+
+
+def seed_golden_schema(schema_name):
+    """Create the singleton rows every new tenant starts with."""
+    from sms.models import SMSSetting
+    from website.models import SiteConfig
+
+    with schema_context(schema_name):
+        SiteConfig.objects.get_or_create(pk=1)
+        SMSSetting.objects.get_or_create(pk=1)
+
+
+def rebuild_golden_schema(drop=False):
+    schema_name = golden_schema_name()
+
+    if drop and schema_exists(schema_name):
+        logger.info("Dropping golden schema %s", schema_name)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP SCHEMA "{schema_name}" CASCADE')
+
+    if not schema_exists(schema_name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE SCHEMA "{schema_name}"')
+
+    logger.info("Migrating golden schema %s", schema_name)
+    call_command(
+        "migrate_schemas",
+        schema_name=schema_name,
+        interactive=False,
+        verbosity=0,
+    )
+    seed_golden_schema(schema_name)
+
+
+def ensure_golden_schema(force=False):
+    """
+    Make sure the golden schema exists and matches the current migrations.
+
+    Returns the state found before any rebuild.
+    """
+    state, details = golden_schema_status()
+    if state == "ready" and not force:
+        return state
+
+    with _rebuild_lock():
+        # Another process may have finished the rebuild while we waited.
+        state, details = golden_schema_status()
+        if state == "ready" and not force:
+            return state
+
+        if details:
+            logger.warning(
+                "Golden schema is %s (%d migrations): %s",
+                state,
+                len(details),
+                ", ".join(f"{app}.{name}" for app, name in details[:10]),
+            )
+        rebuild_golden_schema(drop=force or state == "stale")
+
+    return state
@@ -0,0 +1,397 @@
+"""
+Run a maintenance function over many tenant schemas.
+
+``run_per_tenant`` calls ``func(schema_name, dry_run=...)`` once per schema
+(inside ``schema_context`` unless ``enter_schema=False``) on a bounded
+thread pool, so one slow tenant no longer holds up the others::
+
+    def backfill(schema_name, dry_run=False):
+        ...
+        return updated
+
+    report = run_per_tenant(backfill, name="backfill", max_workers=8)
+    print(report.as_dict())
+
+Each tenant is retried with exponential backoff, starts can be throttled
+with ``rate_limit`` (tenants per second), and progress can be checkpointed
+so a rerun with ``resume=True`` skips tenants that already succeeded.
+
+With ``dry_run=True`` the function is told not to write, and every tenant
+runs inside a transaction that is rolled back as a safety net.
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from tenants.schema_migrations import Checkpoint
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+
+@dataclass
+class TenantResult:
+    schema_name: str
+    status: str
+    attempts: int = 0
+    duration: float = 0.0
+    result: Any = None
+    error: str | None = None
+
+
+@dataclass
+class JobReport:
+    name: str
+    dry_run: bool
+    results: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self):
+        return [r for r in self.results if r.status == STATUS_OK]
+
+    @property
+    def failed(self):
+        return [r for r in self.results if r.status == STATUS_FAILED]
+
+    @property
+    def skipped(self):
+        return [r for r in self.results if r.status == STATUS_SKIPPED]
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "dry_run": self.dry_run,
+            "total": len(self.results),
+            "succeeded": len(self.succeeded),
+            "failed": len(self.failed),
+            "skipped": len(self.skipped),
+            "elapsed": round(self.elapsed, 3),
+            "tenants": [asdict(r) for r in self.results],
+        }
+
+
+class _RateLimit:
+    """Spaces tenant starts at least ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class _DryRunRollback(Exception):
+    pass
+
+
+def all_tenant_schemas():
+    from tenants.models import Client
+
+    return list(
+        Client.objects.exclude(schema_name=get_public_schema_name())
+        .order_by("id")
+        .values_list("schema_name", flat=True)
+    )
+
+
+def _call(func, schema_name, dry_run, enter_schema):
+    if not dry_run:
+        if enter_schema:
+            with schema_context(schema_name):
+                return func(schema_name, dry_run=False)
+        return func(schema_name, dry_run=False)
+
+    # Roll back anything a dry run writes, even if func forgets to check.
+    outcome = {}
+    try:
+        with transaction.atomic():
+            if enter_schema:
+                with schema_context(schema_name):
+                    outcome["result"] = func(schema_name, dry_run=True)
+            else:
+                outcome["result"] = func(schema_name, dry_run=True)
+            raise _DryRunRollback
+    except _DryRunRollback:
+        pass
+    return outcome.get("result")
+
+
+def run_tenant(
+    func,
+    schema_name,
+    dry_run=False,
+    retries=2,
+    retry_backoff=1.0,
+    retry_on=(Exception,),
+    enter_schema=True,
+    rate_limit=None,
+    close_connection=True,
+):
+    """Run ``func`` for one schema with retries; never raises."""
+    started = time.monotonic()
+    attempts = 0
+    error = None
+
+    while attempts <= retries:
+        attempts += 1
+        if rate_limit is not None:
+            rate_limit.wait()
+        try:
+            result = _call(func, schema_name, dry_run, enter_schema)
+            return TenantResult(
+                schema_name=schema_name,
+                status=STATUS_OK,
+                attempts=attempts,
+                duration=round(time.monotonic() - started, 3),
+                result=result,
+            )
+        except retry_on as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.warning(
+                "Tenant %s attempt %d failed: %s", schema_name, attempts, error
+            )
+            if attempts <= retries:
+                time.sleep(retry_backoff * 2 ** (attempts - 1))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            break
+        finally:
+            # Each tenant starts from a fresh connection on this thread.
+            if close_connection:
+                connection.close()
+
+    return TenantResult(
+        schema_name=schema_name,
+        status=STATUS_FAILED,
+        attempts=attempts,
+        duration=round(time.monotonic() - started, 3),
+        error=error,
+    )
+
+
+def run_per_tenant(
+    func,
+    schemas=None,
+    name=None,
+    max_workers=4,
+    retries=2,
+    retry_backoff=1.0,
+    retry_on=(Exception,),
+    rate_limit=None,
+    checkpoint=None,
+    resume=False,
+    dry_run=False,
+    enter_schema=True,
+    progress=None,
+):
+    """
+    Run ``func`` for every schema and return a ``JobReport``.
+
+    :param schemas: schema names; defaults to every non-public tenant.
+    :param max_workers: tenants processed at the same time.
+    :param retries: extra attempts per tenant after a failure.
+    :param rate_limit: maximum tenant starts per second (None = unlimited).
+    :param checkpoint: JSON file recording per-tenant outcomes.
+    :param resume: skip tenants the checkpoint recorded as succeeded.
+    :param enter_schema: run ``func`` inside ``schema_context``.
+    :param progress: callable ``(done, total, TenantResult)``.
+    """
+    name = name or getattr(func, "__name__", "tenant_job")
+    started = time.monotonic()
+    schemas = list(all_tenant_schemas() if schemas is None else schemas)
+    report = JobReport(name=name, dry_run=dry_run)
+
+    # Dry runs never touch the checkpoint, so a real run still does everything.
+    store = None
+    if checkpoint and not dry_run:
+        if resume:
+            store = Checkpoint.load(checkpoint, name, done_statuses=(STATUS_OK,))
+        else:
+            store = Checkpoint(checkpoint, name, done_statuses=(STATUS_OK,))
+
+    todo = []
+    for schema_name in schemas:
+        if store is not None and store.is_done(schema_name):
+            report.results.append(
+                TenantResult(schema_name=schema_name, status=STATUS_SKIPPED)
+            )
+        else:
+            todo.append(schema_name)
+
+    limiter = _RateLimit(rate_limit) if rate_limit else None
+    total = len(schemas)
+
+    def finished(result):
+        report.results.append(result)
+        if store is not None:
+            store.record(
+                result.schema_name,
+                status=result.status,
+                attempts=result.attempts,
+                duration=result.duration,
+                error=result.error,
+            )
+        if progress is not None:
+            progress(len(report.results), total, result)
+
+    kwargs = {
+        "dry_run": dry_run,
+        "retries": retries,
+        "retry_backoff": retry_backoff,
+        "retry_on": retry_on,
+        "enter_schema": enter_schema,
+        "rate_limit": limiter,
+    }
+
+    if max_workers <= 1:
+        # Runs on the caller's thread; leave its connection alone.
+        for schema_name in todo:
+            finished(run_tenant(func, schema_name, close_connection=False, **kwargs))
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(run_tenant, func, schema_name, **kwargs)
+                for schema_name in todo
+            ]
+            for future in as_completed(futures):
+                finished(future.result())
+
+    report.elapsed = time.monotonic() - started
+    logger.info(
+        "Tenant job %s: %d ok, %d failed, %d skipped in %.1fs%s",
+        name,
+        len(report.succeeded),
+        len(report.failed),
+        len(report.skipped),
+        report.elapsed,
+        " (dry run)" if dry_run else "",
+    )
+    return report
+
+
+class TenantJobCommand(BaseCommand):
+    """
+    Base for management commands that run ``run_for_tenant`` over tenants.
+
+    Subclasses set ``job_name`` and implement
+    ``run_for_tenant(schema_name, dry_run=False)``; the usual options
+    (workers, retries, rate limit, checkpoint, dry run, JSON report) and
+    progress output come for free.
+    """
+
+    job_name = None
+    default_workers = 4
+    default_rate_limit = None
+    enter_schema = True
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--schema",
+            action="append",
+            dest="schemas",
+            help="Only run for this schema (repeatable; default: every tenant)",
+        )
+        parser.add_argument("--workers", type=int, default=self.default_workers)
+        parser.add_argument("--retries", type=int, default=2)
+        parser.add_argument(
+            "--rate-limit",
+            type=float,
+            default=self.default_rate_limit,
+            help="Maximum tenants started per second",
+        )
+        parser.add_argument("--checkpoint", help="JSON file recording progress")
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip tenants the checkpoint recorded as done",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing",
+        )
+        parser.add_argument("--report", help="Write the JSON report to this file")
+
+    def get_schemas(self, options):
+        return options["schemas"]
+
+    def run_for_tenant(self, schema_name, dry_run=False):
+        raise NotImplementedError
+
+    def describe(self, result):
+        return result.result
+
+    def handle(self, *args, **options):
+        report = run_per_tenant(
+            self.run_for_tenant,
+            schemas=self.get_schemas(options),
+            name=self.job_name,
+            max_workers=options["workers"],
+            retries=options["retries"],
+            rate_limit=options["rate_limit"],
+            checkpoint=options["checkpoint"],
+            resume=options["resume"],
+            dry_run=options["dry_run"],
+            enter_schema=self.enter_schema,
+            progress=self.progress,
+        )
+
+        summary = report.as_dict()
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(summary, f, indent=2, default=str)
+
+        style = self.style.ERROR if report.failed else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f"\n{report.name}: {len(report.succeeded)} ok, "
+                f"{len(report.failed)} failed, {len(report.skipped)} skipped "
+                f"in {report.elapsed:.1f}s"
+                + (" (dry run)" if report.dry_run else "")
+            )
+        )
+        self.summarize(report)
+
+        if report.failed:
+            raise CommandError(f"{len(report.failed)} tenant(s) failed.")
+
+    def summarize(self, report):
+        pass
+
+    def progress(self, done, total, result):
+        if result.status == STATUS_FAILED:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"[{done}/{total}] {result.schema_name}: FAILED after "
+                    f"{result.attempts} attempt(s): {result.error}"
+                )
+            )
+        elif result.status == STATUS_SKIPPED:
+            self.stdout.write(f"[{done}/{total}] {result.schema_name}: skipped")
+        else:
+            self.stdout.write(
+                f"[{done}/{total}] {result.schema_name}: "
+                f"{self.describe(result)} ({result.duration}s)"
+            )
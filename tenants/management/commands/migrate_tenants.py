@@ -0,0 +1,238 @@
+import io
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django_tenants.utils import get_public_schema_name
+
+from tenants.golden import clone_provisioning_enabled, ensure_golden_schema
+from tenants.models import Client
+from tenants.schema_migrations import (
+    Checkpoint,
+    applied_migrations,
+    migration_targets,
+    target_for,
+)
+
+_timeouts = {}
+
+
+def _set_timeouts(sender, connection, **kwargs):
+    with connection.cursor() as cursor:
+        for setting, value in _timeouts.items():
+            cursor.execute(f"SET {setting} = %s", [f"{int(value)}ms"])
+
+
+def _init_worker(lock_timeout, statement_timeout):
+    _timeouts["lock_timeout"] = lock_timeout
+    _timeouts["statement_timeout"] = statement_timeout
+    connection_created.connect(_set_timeouts)
+
+
+def _migrate_schema(schema_name):
+    """Run migrate_schemas for one schema inside a worker process."""
+    output = io.StringIO()
+    started = time.monotonic()
+    try:
+        call_command(
+            "migrate_schemas",
+            schema_name=schema_name,
+            interactive=False,
+            stdout=output,
+            stderr=output,
+        )
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        # Timeouts were set per session; never hand them back to the pool.
+        connections.close_all()
+
+    return {
+        "schema": schema_name,
+        "duration": round(time.monotonic() - started, 3),
+        "error": error,
+        "output": output.getvalue()[-2000:] if error else "",
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Migrate every tenant schema in parallel, skipping schemas already "
+        "at head and checkpointing progress so a failed run can resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "schemas",
+            nargs="*",
+            help="Schema names to migrate (default: every tenant)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of schemas migrated at the same time",
+        )
+        parser.add_argument(
+            "--lock-timeout",
+            type=int,
+            default=5000,
+            help="Per-statement lock wait in ms before a schema fails",
+        )
+        parser.add_argument(
+            "--statement-timeout",
+            type=int,
+            default=600000,
+            help="Per-statement runtime limit in ms (0 disables it)",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default="tenant_migrations.checkpoint.json",
+            help="File recording per-schema progress",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip schemas the checkpoint already recorded as done",
+        )
+        parser.add_argument(
+            "--summary",
+            help="Also write the JSON summary to this file",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report which schemas have pending migrations",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        public = get_public_schema_name()
+
+        schemas = list(
+            Client.objects.order_by("id").values_list("schema_name", flat=True)
+        )
+        if options["schemas"]:
+            wanted = set(options["schemas"])
+            unknown = wanted - set(schemas)
+            if unknown:
+                raise CommandError(f"Unknown schemas: {', '.join(sorted(unknown))}")
+            schemas = [s for s in schemas if s in wanted]
+
+        shared_target, tenant_target = migration_targets()
+        head = f"{shared_target.fingerprint}-{tenant_target.fingerprint}"
+
+        if options["resume"]:
+            checkpoint = Checkpoint.load(options["checkpoint"], head)
+        else:
+            checkpoint = Checkpoint(options["checkpoint"], head)
+
+        resumed = [s for s in schemas if checkpoint.is_done(s)]
+        schemas = [s for s in schemas if not checkpoint.is_done(s)]
+
+        # One batched query instead of a migrate_schemas run per schema.
+        applied = applied_migrations(schemas)
+        pending = {}
+        up_to_date = []
+        for schema in schemas:
+            target = target_for(schema, shared_target, tenant_target)
+            missing = target.pending(applied[schema])
+            if missing:
+                pending[schema] = missing
+            else:
+                up_to_date.append(schema)
+
+        summary = {
+            "head": head,
+            "total": len(schemas) + len(resumed),
+            "resumed": resumed,
+            "up_to_date": up_to_date,
+            "pending": {s: len(m) for s, m in pending.items()},
+            "migrated": [],
+            "failed": [],
+        }
+
+        if options["check"]:
+            summary["elapsed"] = round(time.monotonic() - started, 3)
+            self.write_summary(summary, options["summary"])
+            return
+
+        for schema in up_to_date:
+            checkpoint.schemas[schema] = {"status": "up_to_date", "duration": 0}
+        checkpoint.save()
+
+        # The connection the planning queries opened has no timeouts; the
+        # next one, used for the shared schema, gets them on creation.
+        connections.close_all()
+        _init_worker(options["lock_timeout"], options["statement_timeout"])
+
+        # Shared tables first: tenant migrations may reference them.
+        if public in pending:
+            self.record(_migrate_schema(public), checkpoint, summary)
+            del pending[public]
+
+        if pending:
+            self.run_pool(list(pending), options, checkpoint, summary)
+
+        # Bring the clone source to the new head now rather than on the
+        # first signup after the deploy.
+        if clone_provisioning_enabled() and not summary["failed"]:
+            try:
+                summary["golden_schema"] = ensure_golden_schema()
+            except Exception as e:
+                summary["golden_schema"] = f"error: {e}"
+
+        summary["elapsed"] = round(time.monotonic() - started, 3)
+        self.write_summary(summary, options["summary"])
+
+        if summary["failed"]:
+            raise CommandError(
+                f"{len(summary['failed'])} schema(s) failed to migrate; "
+                "rerun with --resume to continue."
+            )
+
+    def run_pool(self, schemas, options, checkpoint, summary):
+        # Forked workers must not share the parent's connections.
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=max(1, options["workers"]),
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(options["lock_timeout"], options["statement_timeout"]),
+        ) as executor:
+            futures = [executor.submit(_migrate_schema, s) for s in schemas]
+            for future in as_completed(futures):
+                self.record(future.result(), checkpoint, summary)
+
+    def record(self, result, checkpoint, summary):
+        schema = result["schema"]
+        if result["error"]:
+            checkpoint.record(
+                schema,
+                status="failed",
+                duration=result["duration"],
+                error=result["error"],
+            )
+            summary["failed"].append(result)
+            self.stderr.write(
+                f"FAILED {schema} ({result['duration']}s): {result['error']}"
+            )
+        else:
+            checkpoint.record(schema, status="migrated", duration=result["duration"])
+            summary["migrated"].append(
+                {"schema": schema, "duration": result["duration"]}
+            )
+            self.stderr.write(f"Migrated {schema} ({result['duration']}s)")
+
+    def write_summary(self, summary, path):
+        payload = json.dumps(summary, indent=2)
+        if path:
+            with open(path, "w") as f:
+                f.write(payload)
+        self.stdout.write(payload)
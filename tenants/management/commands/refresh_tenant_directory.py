@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from tenants.directory import refresh_tenant_directory
+
+
+class Command(BaseCommand):
+    help = "Rebuild TenantDirectory rows from tenant schemas (run after migrating)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "schemas",
+            nargs="*",
+            help="Schema names to refresh (default: every tenant)",
+        )
+
+    def handle(self, *args, **options):
+        written = refresh_tenant_directory(options["schemas"] or None)
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed {written} directory row(s).")
+        )
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-16 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0017_client_sidebar_config'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantDirectory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('store_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('store_description', models.TextField(blank=True, null=True)),
+                ('store_logo', models.URLField(blank=True, max_length=500, null=True)),
+                ('seller_location', models.CharField(blank=True, max_length=255, null=True)),
+                ('enable_pasalbiz', models.BooleanField(default=False)),
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('payment_enabled', models.BooleanField(default=False)),
+                ('last_catalog_change', models.DateTimeField(blank=True, null=True)),
+                ('primary_domain', models.CharField(blank=True, max_length=253, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='directory', to='tenants.client')),
+            ],
+            options={
+                'verbose_name_plural': 'Tenant directory',
+                'indexes': [models.Index(fields=['enable_pasalbiz', 'product_count'], name='tenants_ten_enable__499e42_idx'), models.Index(fields=['payment_enabled'], name='tenants_ten_payment_0f3cff_idx')],
+            },
+        ),
+    ]
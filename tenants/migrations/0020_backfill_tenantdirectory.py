@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-16 14:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The directory is derived from every tenant schema by live code
+    # (tenants.directory), which a migration cannot pin to a historical
+    # shape. Deploys fill it instead with, after migrating:
+    #
+    #     python manage.py refresh_tenant_directory
+    #
+    # and the hourly reconcile keeps it in sync from then on.
+
+    dependencies = [
+        ('tenants', '0019_tenantprovisioning_warmschema'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, migrations.RunPython.noop),
+    ]
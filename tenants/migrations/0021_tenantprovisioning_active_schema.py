@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0020_backfill_tenantdirectory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenantprovisioning',
+            name='tokens_issued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='tenantprovisioning',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'failed'), _negated=True), fields=('schema_name',), name='tenants_provisioning_active_schema'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 11:00
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0021_tenantprovisioning_active_schema'),
+    ]
+
+    # tenants is a shared app, so this runs once, in public, which is on
+    # every tenant's search_path. Tenant migrations that need pg_trgm
+    # (product search) depend on this instead of creating it per schema.
+    operations = [
+        TrigramExtension(),
+    ]
@@ -116,6 +116,19 @@ class Client(TenantMixin):
                 self.paid_until = date.today() + timedelta(days=duration_days)
         self.save()
 
+    def create_schema(self, check_if_exists=False, sync_schema=True, verbosity=1):
+        from tenants.golden import clone_provisioning_enabled, ensure_golden_schema
+
+        # The new schema is cloned from the golden one, so it must be at
+        # head first; otherwise the faked migrations would hide gaps.
+        if sync_schema and clone_provisioning_enabled():
+            ensure_golden_schema()
+        return super().create_schema(
+            check_if_exists=check_if_exists,
+            sync_schema=sync_schema,
+            verbosity=verbosity,
+        )
+
     def __str__(self):
         return f"{self.name} ({self.pricing_plan or 'No Plan'})"
 
@@ -135,3 +148,109 @@ class FacebookPageTenantMap(models.Model):
 
     class Meta:
         db_table = "public_facebook_page_map"  # Explicit table name is helpful
+
+
+class TenantDirectory(models.Model):
+    """
+    Denormalized public-schema summary of a tenant's storefront.
+
+    Kept in sync by tenant-side signals and the reconcile_tenant_directory
+    task so listings never have to enter each tenant schema.
+    """
+
+    tenant = models.OneToOneField(
+        Client, on_delete=models.CASCADE, related_name="directory"
+    )
+    store_name = models.CharField(max_length=255, null=True, blank=True)
+    store_description = models.TextField(null=True, blank=True)
+    store_logo = models.URLField(max_length=500, null=True, blank=True)
+    seller_location = models.CharField(max_length=255, null=True, blank=True)
+    enable_pasalbiz = models.BooleanField(default=False)
+    product_count = models.PositiveIntegerField(default=0)
+    payment_enabled = models.BooleanField(default=False)
+    last_catalog_change = models.DateTimeField(null=True, blank=True)
+    primary_domain = models.CharField(max_length=253, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Tenant directory"
+        indexes = [
+            models.Index(fields=["enable_pasalbiz", "product_count"]),
+            models.Index(fields=["payment_enabled"]),
+        ]
+
+    def __str__(self):
+        return self.store_name or str(self.tenant)
+
+
+class TenantProvisioning(models.Model):
+    """
+    Tracks the background job that creates a store's schema after signup.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_PROVISIONING = "provisioning"
+    STATUS_READY = "ready"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, "Pending"),
+        (STATUS_PROVISIONING, "Provisioning"),
+        (STATUS_READY, "Ready"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tenant_provisionings",
+    )
+    store_name = models.CharField(max_length=255)
+    schema_name = models.CharField(max_length=63, db_index=True)
+    is_template_account = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    error = models.TextField(null=True, blank=True)
+    tenant = models.ForeignKey(
+        Client,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="provisionings",
+    )
+    used_warm_schema = models.BooleanField(default=False)
+    # When the status endpoint handed out tokens with the tenant's claims.
+    tokens_issued_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    ACTIVE_SCHEMA_CONSTRAINT = "tenants_provisioning_active_schema"
+
+    class Meta:
+        constraints = [
+            # One live claim per store name; failed jobs release theirs.
+            models.UniqueConstraint(
+                fields=["schema_name"],
+                condition=~models.Q(status="failed"),
+                name="tenants_provisioning_active_schema",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.schema_name} ({self.status})"
+
+
+class WarmSchema(models.Model):
+    """
+    A pre-provisioned, unassigned tenant schema waiting to be claimed.
+
+    ``head`` is the tenant migration fingerprint the schema was built at;
+    schemas from an older head are discarded instead of claimed.
+    """
+
+    schema_name = models.CharField(max_length=63, unique=True)
+    head = models.CharField(max_length=32, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.schema_name
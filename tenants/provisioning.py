@@ -0,0 +1,205 @@
+"""
+Background tenant provisioning for signups.
+
+``provision_tenant`` turns a pending ``TenantProvisioning`` job into a live
+``Client`` + ``Domain``. When a ``WarmSchema`` built at the current
+migration head is available it is claimed by renaming it, which takes
+milliseconds; otherwise the schema is created the normal way (cloned from
+the golden schema when that is enabled).
+
+``replenish_warm_pool`` keeps ``TENANT_WARM_POOL_SIZE`` schemas ready.
+"""
+
+import logging
+import os
+import uuid
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+from django_tenants.clone import CloneSchema
+from django_tenants.utils import schema_context, schema_exists
+
+from pricing.models import Pricing
+from tenants.golden import (
+    clone_provisioning_enabled,
+    ensure_golden_schema,
+    golden_schema_name,
+    seed_golden_schema,
+)
+from tenants.models import Client, Domain, TenantProvisioning, WarmSchema
+from tenants.schema_migrations import migration_targets
+
+logger = logging.getLogger(__name__)
+
+WARM_SCHEMA_PREFIX = "warm_"
+
+
+def warm_pool_size():
+    return getattr(settings, "TENANT_WARM_POOL_SIZE", 0)
+
+
+def current_head():
+    _, tenant_target = migration_targets()
+    return tenant_target.fingerprint
+
+
+def claim_warm_schema(schema_name):
+    """
+    Rename a warm schema to ``schema_name``; returns False if none is free.
+
+    Must run inside a transaction so the rename and the claim commit (or
+    roll back) together.
+    """
+    warm = (
+        WarmSchema.objects.select_for_update(skip_locked=True)
+        .filter(head=current_head())
+        .order_by("created_at")
+        .first()
+    )
+    if warm is None:
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'ALTER SCHEMA "{warm.schema_name}" RENAME TO "{schema_name}"'
+        )
+    warm.delete()
+    return True
+
+
+def provision_tenant(job):
+    """Create the tenant for ``job`` and mark it ready (or failed)."""
+    backend_url = os.getenv("BACKEND_URL")
+
+    TenantProvisioning.objects.filter(pk=job.pk).update(
+        status=TenantProvisioning.STATUS_PROVISIONING
+    )
+
+    try:
+        with transaction.atomic():
+            plan = Pricing.objects.filter(plan_type="free").first()
+            paid_until = date.today() + timedelta(days=30)
+
+            # Template accounts get a premium plan with no expiration
+            if job.is_template_account:
+                premium_plan = Pricing.objects.filter(plan_type="premium").first()
+                if premium_plan:
+                    plan, paid_until = premium_plan, None
+
+            tenant = Client(
+                schema_name=job.schema_name,
+                name=job.schema_name,
+                owner=job.owner,
+                is_template_account=job.is_template_account,
+                pricing_plan=plan,
+                paid_until=paid_until,
+            )
+
+            used_warm_schema = claim_warm_schema(job.schema_name)
+            if used_warm_schema:
+                # The schema already exists; skip django-tenants' creation.
+                tenant.auto_create_schema = False
+            tenant.save()
+
+            Domain.objects.create(
+                domain=f"{job.schema_name}.{backend_url}",
+                tenant=tenant,
+                is_primary=True,
+            )
+
+            # Initialise singletons for the new tenant schema
+            from sms.models import SMSSetting  # noqa: PLC0415
+
+            with schema_context(job.schema_name):
+                SMSSetting.objects.get_or_create(pk=1)
+
+            job.tenant = tenant
+            job.used_warm_schema = used_warm_schema
+            job.status = TenantProvisioning.STATUS_READY
+            job.error = None
+            job.save(
+                update_fields=[
+                    "tenant",
+                    "used_warm_schema",
+                    "status",
+                    "error",
+                    "updated_at",
+                ]
+            )
+    except Exception as e:
+        logger.exception("Provisioning %s failed", job.schema_name)
+        job.status = TenantProvisioning.STATUS_FAILED
+        job.error = str(e)
+        job.save(update_fields=["status", "error", "updated_at"])
+        return job
+
+    send_signup_email(job.owner)
+    return job
+
+
+def send_signup_email(user):
+    from allauth.account.models import EmailAddress
+
+    email_address = EmailAddress.objects.filter(user=user, email=user.email).first()
+    if email_address and email_address.verified:
+        return
+
+    try:
+        if email_address is None:
+            email_address = EmailAddress.objects.create(
+                user=user, email=user.email, primary=True, verified=False
+            )
+        # allauth builds the link from the Sites framework without a request.
+        email_address.send_confirmation(request=None, signup=True)
+    except Exception as e:
+        logger.warning("Could not send signup email to %s: %s", user.email, e)
+
+
+def create_warm_schema():
+    """Build one unassigned schema at the current head and register it."""
+    schema_name = f"{WARM_SCHEMA_PREFIX}{uuid.uuid4().hex[:16]}"
+
+    if clone_provisioning_enabled():
+        ensure_golden_schema()
+        CloneSchema().clone_schema(golden_schema_name(), schema_name)
+    else:
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE SCHEMA "{schema_name}"')
+        call_command(
+            "migrate_schemas",
+            schema_name=schema_name,
+            interactive=False,
+            verbosity=0,
+        )
+        seed_golden_schema(schema_name)
+
+    connection.set_schema_to_public()
+    WarmSchema.objects.create(schema_name=schema_name, head=current_head())
+    return schema_name
+
+
+def drop_stale_warm_schemas():
+    """Discard warm schemas built for an older migration head."""
+    dropped = 0
+    for warm in WarmSchema.objects.exclude(head=current_head()):
+        with transaction.atomic():
+            if schema_exists(warm.schema_name):
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP SCHEMA "{warm.schema_name}" CASCADE')
+            warm.delete()
+        dropped += 1
+    return dropped
+
+
+def replenish_warm_pool():
+    """Top the warm pool up to ``TENANT_WARM_POOL_SIZE``; returns schemas built."""
+    drop_stale_warm_schemas()
+
+    missing = warm_pool_size() - WarmSchema.objects.filter(head=current_head()).count()
+    built = 0
+    for _ in range(max(0, missing)):
+        create_warm_schema()
+        built += 1
+    return built
@@ -0,0 +1,163 @@
+"""
+Helpers for migrating many tenant schemas quickly.
+
+``migration_targets`` describes the head state a schema should be at,
+``applied_migrations`` reads every schema's ``django_migrations`` table in
+one fan-out query, and ``Checkpoint`` records per-schema progress so an
+interrupted run can resume where it stopped.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+from django.apps import apps
+from django.conf import settings
+from django.db.migrations.loader import MigrationLoader
+from django_tenants.utils import get_public_schema_name
+
+from tenants.fanout import fan_out
+
+
+@dataclass
+class MigrationTarget:
+    """The migrations a schema must have applied to be at head."""
+
+    nodes: frozenset
+    replacements: dict = field(default_factory=dict)
+    labels: frozenset = frozenset()
+
+    @property
+    def fingerprint(self):
+        digest = hashlib.sha1()
+        for app_label, name in sorted(self.nodes):
+            digest.update(f"{app_label}.{name}\n".encode())
+        return digest.hexdigest()[:12]
+
+    def pending(self, applied):
+        """Return the sorted head migrations missing from ``applied``."""
+        applied = set(applied)
+        # A squashed migration counts as applied once all it replaces is.
+        for key, migration in self.replacements.items():
+            if all(tuple(r) in applied for r in migration.replaces):
+                applied.add(key)
+        return sorted(self.nodes - applied)
+
+    def unknown(self, applied):
+        """
+        Return applied migrations of the target's apps that no longer exist
+        on disk (deleted, renamed or squashed away).
+        """
+        known = set(self.nodes) | set(self.replacements)
+        for migration in self.replacements.values():
+            known.update(tuple(r) for r in migration.replaces)
+        return sorted(
+            key for key in applied if key[0] in self.labels and key not in known
+        )
+
+
+def _app_labels(app_list):
+    # Same membership rule as django_tenants' TenantSyncRouter.
+    labels = set()
+    for config in apps.get_app_configs():
+        full_name = f"{config.__module__}.{config.__class__.__name__}"
+        if config.name in app_list or full_name in app_list:
+            labels.add(config.label)
+    return labels
+
+
+@functools.lru_cache(maxsize=None)
+def migration_targets():
+    """
+    Return ``(shared_target, tenant_target)`` from the migration files.
+
+    Migration files do not change while a process runs, so the graph is
+    only loaded once.
+    """
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    nodes = set(loader.graph.nodes)
+
+    def target(app_list):
+        labels = _app_labels(app_list)
+        return MigrationTarget(
+            nodes=frozenset(n for n in nodes if n[0] in labels),
+            replacements={
+                k: m for k, m in loader.replacements.items() if k[0] in labels
+            },
+            labels=frozenset(labels),
+        )
+
+    return target(settings.SHARED_APPS), target(settings.TENANT_APPS)
+
+
+def target_for(schema_name, shared_target, tenant_target):
+    if schema_name == get_public_schema_name():
+        return shared_target
+    return tenant_target
+
+
+def applied_migrations(schemas, timeout=60):
+    """
+    Map every schema to the set of ``(app, name)`` recorded as applied.
+
+    Schemas without a ``django_migrations`` table map to an empty set.
+    """
+    applied = {schema: set() for schema in schemas}
+    rows = fan_out(
+        "SELECT array_agg(app) AS apps, array_agg(name) AS names "
+        "FROM {schema}.django_migrations",
+        schemas,
+        requires=["django_migrations"],
+        timeout=timeout,
+    )
+    for row in rows:
+        applied[row.schema_name] = set(zip(row.apps or [], row.names or []))
+    return applied
+
+
+class Checkpoint:
+    """
+    Per-schema progress stored as JSON next to the deploy.
+
+    Entries are only trusted while ``head`` matches (the migration
+    fingerprint, or the job name for tenant jobs), so a checkpoint from an
+    older release is ignored.
+    """
+
+    def __init__(self, path, head, done_statuses=("migrated", "up_to_date")):
+        self.path = path
+        self.head = head
+        self.done_statuses = tuple(done_statuses)
+        self.schemas = {}
+
+    @classmethod
+    def load(cls, path, head, **kwargs):
+        checkpoint = cls(path, head, **kwargs)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return checkpoint
+
+        if data.get("head") == head:
+            checkpoint.schemas = data.get("schemas", {})
+        return checkpoint
+
+    def is_done(self, schema_name):
+        entry = self.schemas.get(schema_name)
+        return bool(entry) and entry.get("status") in self.done_statuses
+
+    def record(self, schema_name, **entry):
+        self.schemas[schema_name] = entry
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        # Write then rename so a crash never leaves a truncated file.
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"head": self.head, "schemas": self.schemas}, f, indent=2)
+        os.replace(tmp_path, self.path)
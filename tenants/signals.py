@@ -1,10 +1,17 @@
 # tenants/signals.py
 from datetime import date
 
-from django.db.models.signals import post_save
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from django_tenants.utils import get_public_schema_name, get_tenant_base_schema
 
-from tenants.models import Client
+from payment_gateway.models import Payment
+from product.models import Product
+from tenants.cache import invalidate_tenant
+from tenants.directory import schedule_directory_refresh
+from tenants.models import Client, Domain
+from website.models import SiteConfig
 
 
 @receiver(post_save, sender=Client)
@@ -16,3 +23,74 @@ def deactivate_if_expired(sender, instance, **kwargs):
         if instance.pricing_plan is not None:
             instance.pricing_plan = None
             instance.save(update_fields=["pricing_plan"])
+
+
+# =====================================================
+# TENANT RESOLUTION CACHE INVALIDATION
+# =====================================================
+
+
+def _schedule_invalidation(tenant_id, hostnames):
+    hostnames = list(hostnames)
+    transaction.on_commit(lambda: invalidate_tenant(tenant_id, hostnames))
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_client_cache(sender, instance, **kwargs):
+    hostnames = Domain.objects.filter(tenant_id=instance.pk).values_list(
+        "domain", flat=True
+    )
+    _schedule_invalidation(instance.pk, hostnames)
+
+
+@receiver(pre_save, sender=Domain)
+def remember_previous_domain(sender, instance, **kwargs):
+    """Keep the old hostname/tenant so a rename or move evicts them too."""
+    previous = None
+    if instance.pk:
+        previous = (
+            Domain.objects.filter(pk=instance.pk)
+            .values_list("domain", "tenant_id")
+            .first()
+        )
+    instance._previous_domain = previous
+
+
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def invalidate_domain_cache(sender, instance, **kwargs):
+    hostnames = [instance.domain]
+    previous = getattr(instance, "_previous_domain", None)
+
+    if previous:
+        previous_domain, previous_tenant_id = previous
+        hostnames.append(previous_domain)
+        if previous_tenant_id != instance.tenant_id:
+            _schedule_invalidation(previous_tenant_id, hostnames)
+
+    _schedule_invalidation(instance.tenant_id, hostnames)
+
+    # The storefront's primary domain lives in the tenant directory.
+    tenant = Client.objects.filter(pk=instance.tenant_id).only("schema_name").first()
+    if tenant and tenant.schema_name != get_public_schema_name():
+        schema_name = tenant.schema_name
+        transaction.on_commit(lambda: schedule_directory_refresh(schema_name))
+
+
+# =====================================================
+# TENANT DIRECTORY SYNC
+# =====================================================
+
+
+@receiver(post_save, sender=SiteConfig)
+@receiver(post_delete, sender=SiteConfig)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def refresh_directory_on_tenant_change(sender, instance, **kwargs):
+    schema_name = connection.schema_name
+    if schema_name in (get_public_schema_name(), get_tenant_base_schema()):
+        return
+    transaction.on_commit(lambda: schedule_directory_refresh(schema_name))
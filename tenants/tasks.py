@@ -0,0 +1,88 @@
+import logging
+
+from celery import shared_task
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .directory import refresh_tenant_directory
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_tenant_directory_task(schema_name):
+    """
+    Refresh the TenantDirectory row of one tenant after a catalog change.
+    """
+    close_old_connections()
+    try:
+        # Clear the debounce flag first so writes made while this runs
+        # schedule another refresh.
+        cache.delete(f"tenant_directory:pending:{schema_name}")
+        refresh_tenant_directory([schema_name])
+    finally:
+        close_old_connections()
+
+
+@shared_task
+def reconcile_tenant_directory():
+    """
+    Rebuild every TenantDirectory row, catching changes no signal saw
+    (bulk updates, raw SQL, lost tasks).
+    """
+    close_old_connections()
+    try:
+        count = refresh_tenant_directory()
+        logger.info(f"Reconciled {count} tenant directory rows.")
+        return f"Reconciled {count} tenant directory rows."
+    finally:
+        close_old_connections()
+
+
+@shared_task
+def provision_tenant_task(job_id):
+    """
+    Create the schema, domain and singletons for a signup in the background.
+    """
+    from .models import TenantProvisioning
+    from .provisioning import provision_tenant
+
+    close_old_connections()
+    try:
+        job = (
+            TenantProvisioning.objects.select_related("owner")
+            .filter(pk=job_id, status=TenantProvisioning.STATUS_PENDING)
+            .first()
+        )
+        if job is None:
+            return f"Provisioning job {job_id} is not pending."
+
+        job = provision_tenant(job)
+
+        # Refill the warm pool in the background if this signup used one.
+        if job.used_warm_schema:
+            replenish_warm_pool_task.delay()
+        return f"Provisioning job {job_id}: {job.status}"
+    finally:
+        close_old_connections()
+
+
+@shared_task
+def replenish_warm_pool_task():
+    """
+    Keep TENANT_WARM_POOL_SIZE pre-provisioned schemas ready to be claimed.
+    """
+    from .provisioning import replenish_warm_pool
+
+    # A single replenisher at a time; concurrent ones would overfill.
+    if not cache.add("tenant_warm_pool:replenishing", True, timeout=30 * 60):
+        return "Warm pool replenish already running."
+
+    close_old_connections()
+    try:
+        built = replenish_warm_pool()
+        logger.info(f"Built {built} warm tenant schemas.")
+        return f"Built {built} warm tenant schemas."
+    finally:
+        cache.delete("tenant_warm_pool:replenishing")
+        close_old_connections()
@@ -1,3 +1,305 @@
-from django.test import TestCase
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
 
-# Create your tests here.
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+
+from tenants.cache import LocalTenantCache, _handle_invalidation
+from tenants.fanout import build_union, fan_out
+from tenants.jobs import STATUS_FAILED, STATUS_OK, STATUS_SKIPPED, run_per_tenant
+from tenants.schema_migrations import Checkpoint, MigrationTarget
+
+
+class LocalTenantCacheTests(SimpleTestCase):
+    def test_returns_copy_of_cached_tenant(self):
+        local = LocalTenantCache()
+        tenant = SimpleNamespace(pk=1, schema_name="acme")
+        local.set("acme.nepdora.com", tenant)
+
+        cached = local.get("acme.nepdora.com")
+        cached.schema_name = "mutated"
+
+        self.assertEqual(local.get("acme.nepdora.com").schema_name, "acme")
+
+    def test_evicts_least_recently_used(self):
+        local = LocalTenantCache(max_size=2)
+        local.set("a", SimpleNamespace(pk=1))
+        local.set("b", SimpleNamespace(pk=2))
+        local.get("a")
+        local.set("c", SimpleNamespace(pk=3))
+
+        self.assertIsNotNone(local.get("a"))
+        self.assertIsNone(local.get("b"))
+        self.assertIsNotNone(local.get("c"))
+
+    def test_entries_expire(self):
+        local = LocalTenantCache(ttl=10)
+        with patch("tenants.cache.time.monotonic", return_value=100):
+            local.set("a", SimpleNamespace(pk=1))
+        with patch("tenants.cache.time.monotonic", return_value=111):
+            self.assertIsNone(local.get("a"))
+
+    def test_evict_tenant_drops_every_hostname(self):
+        local = LocalTenantCache()
+        local.set("acme.nepdora.com", SimpleNamespace(pk=1))
+        local.set("acme.com", SimpleNamespace(pk=1))
+        local.set("other.com", SimpleNamespace(pk=2))
+
+        local.evict_tenant("1")
+
+        self.assertIsNone(local.get("acme.nepdora.com"))
+        self.assertIsNone(local.get("acme.com"))
+        self.assertIsNotNone(local.get("other.com"))
+
+    def test_pubsub_message_evicts_tenant(self):
+        with patch("tenants.cache.local_tenant_cache", LocalTenantCache()) as local:
+            local.set("acme.com", SimpleNamespace(pk=7))
+            _handle_invalidation({"data": b"7"})
+            self.assertIsNone(local.get("acme.com"))
+
+
+class FanOutTests(SimpleTestCase):
+    def test_build_union_tags_each_branch_with_schema(self):
+        statement, params = build_union(
+            "SELECT COUNT(*) AS total FROM {schema}.product_product WHERE status = %s",
+            ["acme", "globex"],
+            params=["active"],
+        )
+
+        self.assertEqual(statement.count("UNION ALL"), 1)
+        self.assertIn('"acme".product_product', statement)
+        self.assertIn('"globex".product_product', statement)
+        self.assertEqual(params, ["acme", "active", "globex", "active"])
+
+    def test_build_union_rejects_unsafe_schema_names(self):
+        with self.assertRaises(ValueError):
+            build_union("SELECT 1 FROM {schema}.t", ['acme"; DROP SCHEMA x; --'])
+
+    def test_queued_batches_get_what_is_left_of_the_timeout(self):
+        budgets = []
+
+        def run_batch(statement, params, row_type, timeout_ms, using):
+            budgets.append(timeout_ms)
+            time.sleep(0.2)
+            return []
+
+        with patch("tenants.fanout._run_batch_in_thread", side_effect=run_batch):
+            fan_out(
+                "SELECT 1 FROM {schema}.t",
+                ["a", "b", "c", "d"],
+                timeout=1,
+                batch_size=1,
+                max_workers=2,
+            )
+
+        budgets.sort(reverse=True)
+        # The last two batches start after the first two have slept.
+        self.assertLess(budgets[2], budgets[0] - 150)
+        self.assertLess(budgets[3], budgets[1] - 150)
+
+
+class MigrationTargetTests(SimpleTestCase):
+    def test_pending_lists_missing_migrations(self):
+        target = MigrationTarget(
+            nodes=frozenset({("product", "0001_initial"), ("product", "0002_x")})
+        )
+
+        self.assertEqual(
+            target.pending({("product", "0001_initial")}),
+            [("product", "0002_x")],
+        )
+        self.assertEqual(
+            target.pending({("product", "0001_initial"), ("product", "0002_x")}),
+            [],
+        )
+
+    def test_squashed_migration_counts_when_replaced_ones_applied(self):
+        squashed = SimpleNamespace(
+            replaces=[("order", "0001_initial"), ("order", "0002_x")]
+        )
+        target = MigrationTarget(
+            nodes=frozenset({("order", "0001_squashed_0002")}),
+            replacements={("order", "0001_squashed_0002"): squashed},
+        )
+
+        self.assertEqual(
+            target.pending({("order", "0001_initial"), ("order", "0002_x")}), []
+        )
+        self.assertEqual(
+            target.pending({("order", "0001_initial")}),
+            [("order", "0001_squashed_0002")],
+        )
+
+    def test_unknown_reports_migrations_removed_from_disk(self):
+        target = MigrationTarget(
+            nodes=frozenset({("product", "0001_initial")}),
+            labels=frozenset({"product"}),
+        )
+        applied = {
+            ("product", "0001_initial"),
+            ("product", "0002_deleted"),
+            ("auth", "0001_initial"),
+        }
+
+        self.assertEqual(target.unknown(applied), [("product", "0002_deleted")])
+
+
+class CheckpointTests(SimpleTestCase):
+    def test_resume_only_trusts_matching_head(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "checkpoint.json")
+            checkpoint = Checkpoint(path, head="abc")
+            checkpoint.record("acme", status="migrated", duration=1.2)
+            checkpoint.record("beta", status="failed", duration=0.4, error="boom")
+
+            resumed = Checkpoint.load(path, head="abc")
+            self.assertTrue(resumed.is_done("acme"))
+            self.assertFalse(resumed.is_done("beta"))
+
+            self.assertFalse(Checkpoint.load(path, head="def").is_done("acme"))
+
+
+class RunPerTenantTests(SimpleTestCase):
+    def run_job(self, func, schemas, **kwargs):
+        kwargs.setdefault("enter_schema", False)
+        kwargs.setdefault("retry_backoff", 0)
+        return run_per_tenant(func, schemas=schemas, **kwargs)
+
+    def test_runs_every_schema_and_collects_results(self):
+        report = self.run_job(
+            lambda schema, dry_run=False: schema.upper(),
+            ["a", "b", "c"],
+            max_workers=3,
+        )
+
+        self.assertEqual(
+            sorted(r.result for r in report.succeeded), ["A", "B", "C"]
+        )
+        self.assertEqual(report.as_dict()["failed"], 0)
+
+    def test_retries_then_reports_failure(self):
+        calls = []
+
+        def flaky(schema, dry_run=False):
+            calls.append(schema)
+            if schema == "bad" or calls.count(schema) < 2:
+                raise RuntimeError("boom")
+            return "done"
+
+        report = self.run_job(flaky, ["good", "bad"], retries=2, max_workers=1)
+        by_schema = {r.schema_name: r for r in report.results}
+
+        self.assertEqual(by_schema["good"].status, STATUS_OK)
+        self.assertEqual(by_schema["good"].attempts, 2)
+        self.assertEqual(by_schema["bad"].status, STATUS_FAILED)
+        self.assertEqual(by_schema["bad"].attempts, 3)
+        self.assertIn("boom", by_schema["bad"].error)
+
+    def test_resume_skips_tenants_already_done(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "job.json")
+
+            def fails_on_b(schema, dry_run=False):
+                if schema == "b":
+                    raise RuntimeError("boom")
+
+            self.run_job(fails_on_b, ["a", "b"], checkpoint=path, retries=0)
+
+            seen = []
+            report = self.run_job(
+                lambda schema, dry_run=False: seen.append(schema),
+                ["a", "b"],
+                name="fails_on_b",
+                checkpoint=path,
+                resume=True,
+            )
+
+        self.assertEqual(seen, ["b"])
+        self.assertEqual([r.schema_name for r in report.skipped], ["a"])
+        self.assertEqual(report.skipped[0].status, STATUS_SKIPPED)
+
+    def test_rate_limit_spaces_tenant_starts(self):
+        starts = []
+        with patch("tenants.jobs.time.sleep") as sleep:
+            self.run_job(
+                lambda schema, dry_run=False: starts.append(schema),
+                ["a", "b", "c"],
+                rate_limit=10,
+                max_workers=1,
+            )
+
+        self.assertEqual(len(starts), 3)
+        self.assertGreaterEqual(sleep.call_count, 1)
+
+
+class LocalSchemasTestCase(TransactionTestCase):
+    """
+    Harness creating a handful of throwaway schemas for tenant job tests.
+
+    Each schema gets a ``job_probe`` table holding ``rows_per_schema`` rows.
+    """
+
+    schema_names = ["job_test_a", "job_test_b", "job_test_c"]
+    rows_per_schema = 2
+
+    def setUp(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("Tenant schemas need PostgreSQL")
+        with connection.cursor() as cursor:
+            for schema in self.schema_names:
+                cursor.execute(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+                cursor.execute(f'CREATE SCHEMA "{schema}"')
+                cursor.execute(f'CREATE TABLE "{schema}".job_probe (id serial)')
+                cursor.execute(
+                    f'INSERT INTO "{schema}".job_probe '
+                    "SELECT FROM generate_series(1, %s)",
+                    [self.rows_per_schema],
+                )
+
+    def tearDown(self):
+        connection.set_schema_to_public()
+        with connection.cursor() as cursor:
+            for schema in self.schema_names:
+                cursor.execute(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+    def probe_count(self, schema):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM "{schema}".job_probe')
+            return cursor.fetchone()[0]
+
+
+class TenantJobSchemaTests(LocalSchemasTestCase):
+    @staticmethod
+    def add_probe_row(schema_name, dry_run=False):
+        # Unqualified table: resolves through the schema_context search_path.
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO job_probe DEFAULT VALUES")
+            cursor.execute("SELECT COUNT(*) FROM job_probe")
+            return cursor.fetchone()[0]
+
+    def test_runs_inside_each_schema_in_parallel(self):
+        report = run_per_tenant(
+            self.add_probe_row, schemas=self.schema_names, max_workers=3
+        )
+
+        self.assertEqual(len(report.succeeded), len(self.schema_names))
+        for schema in self.schema_names:
+            self.assertEqual(self.probe_count(schema), self.rows_per_schema + 1)
+
+    def test_dry_run_rolls_back_writes(self):
+        report = run_per_tenant(
+            self.add_probe_row,
+            schemas=self.schema_names,
+            max_workers=3,
+            dry_run=True,
+        )
+
+        self.assertEqual(
+            [r.result for r in report.succeeded],
+            [self.rows_per_schema + 1] * len(self.schema_names),
+        )
+        for schema in self.schema_names:
+            self.assertEqual(self.probe_count(schema), self.rows_per_schema)
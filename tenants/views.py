@@ -27,7 +27,6 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from accounts.models import CustomUser
-from payment_gateway.models import Payment
 from tenants.models import (
     Client,
     Domain,
@@ -115,23 +114,10 @@ class DomainFilter(django_filters.FilterSet):
         if not value:
             return queryset
 
-        enabled_tenant_ids = []
-        # Get all clients except public
-        clients = Client.objects.exclude(schema_name="public")
-
-        for client in clients:
-            try:
-                with schema_context(client.schema_name):
-                    # Check if any payment gateway is enabled for this tenant
-                    if Payment.objects.filter(is_enabled=True).exists():
-                        enabled_tenant_ids.append(client.id)
-            finally:
-                close_old_connections()
-
         if value.lower() == "enabled":
-            return queryset.filter(tenant_id__in=enabled_tenant_ids)
+            return queryset.filter(tenant__directory__payment_enabled=True)
         elif value.lower() == "disabled":
-            return queryset.exclude(tenant_id__in=enabled_tenant_ids)
+            return queryset.exclude(tenant__directory__payment_enabled=True)
 
         return queryset
 
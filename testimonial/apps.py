@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TestimonialConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'testimonial'
+
+    def ready(self):
+        from sales_crm.response_cache import track_content_changes
+
+        track_content_changes(self)
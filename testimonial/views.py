@@ -8,6 +8,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from sales_crm.authentication import TenantJWTAuthentication
+from sales_crm.response_cache import CachedResponseMixin
 
 from .models import Testimonial
 from .serializers import (
@@ -18,7 +19,7 @@ from .serializers import (
 # Create your views here.
 
 
-class TestimonialListCreateView(generics.ListCreateAPIView):
+class TestimonialListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     queryset = Testimonial.objects.all()
     serializer_class = TestimonialSerializer
 
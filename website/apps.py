@@ -7,3 +7,6 @@ class WebsiteConfig(AppConfig):
     
     def ready(self):
         import website.signals
+        from sales_crm.response_cache import track_content_changes
+
+        track_content_changes(self)
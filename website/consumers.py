@@ -7,6 +7,7 @@ from django.db import models, transaction
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 
+from sales_crm.response_cache import schedule_content_version_bump
 from tenants.models import Client
 
 from .models import Page, PageComponent, SiteConfig, Theme
@@ -636,6 +637,8 @@ class WebsiteConsumer(AsyncWebsocketConsumer):
                 PageComponent.objects.filter(
                     page=page, component_id=component_id, status="draft"
                 ).update(order=new_order)
+            # update() sends no post_save.
+            schedule_content_version_bump("website")
         qs = (
             PageComponent.objects
             .filter(page=page)
@@ -19,6 +19,7 @@ from rest_framework.views import APIView
 from collection.models import Collection
 from collection.serializers import CollectionDataSerializer
 from sales_crm.authentication import TenantJWTAuthentication
+from sales_crm.response_cache import CachedResponseMixin, ConditionalGetMixin
 from tenants.models import Client
 
 from .models import Page, PageComponent, SiteConfig, Theme
@@ -37,7 +38,7 @@ from .utils import (
 )
 
 
-class SiteConfigListCreateView(generics.ListCreateAPIView):
+class SiteConfigListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     serializer_class = SiteConfigSerializer
     queryset = SiteConfig.objects.all()
 
@@ -62,7 +63,9 @@ class SiteConfigRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView)
 # ------------------------------
 # 🌈 THEME VIEWS
 # ------------------------------
-class ThemeListCreateView(generics.ListCreateAPIView):
+class ThemeListCreateView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView
+):
     serializer_class = ThemeSerializer
     queryset = Theme.objects.all()
 
@@ -109,7 +112,9 @@ class ThemePublishView(APIView):
 # ------------------------------
 # 📄 PAGE VIEWS
 # ------------------------------
-class PageListCreateView(generics.ListCreateAPIView):
+class PageListCreateView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView
+):
     queryset = Page.objects.all()
 
     def get_authenticators(self):
@@ -137,7 +142,9 @@ class PageListCreateView(generics.ListCreateAPIView):
         serializer.save(status="draft")
 
 
-class PageRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class PageRetrieveUpdateDestroyView(
+    ConditionalGetMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView
+):
     serializer_class = PageSerializer
     queryset = Page.objects.all()
     lookup_field = "slug"
@@ -187,7 +194,9 @@ class PagePublishView(APIView):
 # ------------------------------
 # 🧩 PAGE COMPONENT VIEWS
 # ------------------------------
-class PageComponentListCreateView(generics.ListCreateAPIView):
+class PageComponentListCreateView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView
+):
     serializer_class = PageComponentSerializer
 
     def get_authenticators(self):
@@ -383,7 +392,7 @@ class ReplaceComponentByIDView(APIView):
 # ------------------------------
 
 
-class NavbarView(APIView):
+class NavbarView(ConditionalGetMixin, CachedResponseMixin, APIView):
     """
     GET:
       /api/navbar/                 → published navbar
@@ -400,7 +409,7 @@ class NavbarView(APIView):
             return [IsAuthenticated()]
         return []
 
-    def get(self, request):
+    def uncached_get(self, request):
         status_param = request.query_params.get("status", "published")
 
         qs = PageComponent.objects.filter(component_type="navbar")
@@ -547,7 +556,7 @@ class ReplaceNavbarView(APIView):
 # ------------------------------
 # 🦶 FOOTER VIEWS
 # ------------------------------
-class FooterView(APIView):
+class FooterView(ConditionalGetMixin, CachedResponseMixin, APIView):
     """
     GET:
       /api/footer/                → published footer
@@ -564,7 +573,7 @@ class FooterView(APIView):
             return [IsAuthenticated()]
         return super().get_permissions()
 
-    def get(self, request):
+    def uncached_get(self, request):
         status_param = request.query_params.get("status", "live")
 
         qs = PageComponent.objects.filter(component_type="footer")